@@ -0,0 +1,99 @@
+import os
+import sys
+import subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+SUPPORT = os.path.join(ROOT, "support")
+sys.path.insert(0, SUPPORT) # stage modules live in support/ and import each other flat
+
+# subcommand -> (script run as __main__, help); nothing heavy is imported until a script runs
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    "pipeline": (os.path.join(ROOT, "run_pipeline.py"), "Parse, featurize and rank, skipping unchanged stages."),
+    "parse": (os.path.join(SUPPORT, "parse_resume.py"), "Parse resumes into structured JSON."),
+    "features": (os.path.join(SUPPORT, "feature_extraction.py"), "Build the sparse feature store."),
+    "match": (os.path.join(SUPPORT, "match_and_rank.py"), "Rank resumes against job descriptions."),
+    "ingest": (os.path.join(SUPPORT, "ingest_daemon.py"), "Watch the resume folder and ingest continuously."),
+    "ann": (os.path.join(SUPPORT, "ann_index.py"), "Build the IVF index and measure its recall."),
+    "shards": (os.path.join(SUPPORT, "sharded_index.py"), "Shard the index and measure scaling over workers."),
+    "benchmark": (os.path.join(SUPPORT, "benchmark.py"), "Benchmark stages on a synthetic corpus, or CLI startup."),
+}
+DASHBOARD = os.path.join(SUPPORT, "dashboard_streamlit.py")
+USAGE = "resume-screen [--cold] <command> [args...]"
+
+
+def run_command(argv: List[str]) -> int:
+    """Run one subcommand in this process and return its exit code."""
+    import runpy
+
+    name, args = argv[0], argv[1:]
+    if name == "dashboard":
+        return subprocess.call([sys.executable, "-m", "streamlit", "run", DASHBOARD, *args])
+    script = COMMANDS[name][0]
+    sys.argv = [script, *args]
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e: # the scripts end with exit() / parser.error()
+        if e.code is None or isinstance(e.code, int):
+            return e.code or 0
+        print(e.code, file=sys.stderr)
+        return 1
+    return 0
+
+
+def print_usage() -> None:
+    print(f"usage: {USAGE}\n\ncommands:")
+    for name, (_, help_text) in COMMANDS.items():
+        print(f"  {name:<11} {help_text}")
+    print(f"  {'dashboard':<11} Launch the Streamlit dashboard.")
+    print(f"  {'serve':<11} Keep libraries and models loaded; later commands run in it (--stop, --status).")
+    print("\nRun `resume-screen <command> --help` for a command's options. Commands go through the warm server")
+    print("when one is running; --cold runs them in this process regardless.")
+
+
+def serve(args: List[str]) -> int:
+    import argparse
+    import warm_server
+
+    parser = argparse.ArgumentParser(prog="resume-screen serve", description="Keep a warm process to run commands in.")
+    parser.add_argument("--socket", type=str, default=warm_server.SOCKET_PATH, help="Unix socket to listen on.")
+    parser.add_argument("--index_dir", type=str, default=None, help="Resume index to keep loaded.")
+    parser.add_argument("--stop", action="store_true", help="Stop a running warm server.")
+    parser.add_argument("--status", action="store_true", help="Report whether a warm server is running.")
+    args = parser.parse_args(args)
+    if args.stop or args.status:
+        running = warm_server.stop(args.socket) if args.stop else warm_server.ping(args.socket)
+        print(f"Warm server {'stopped' if args.stop and running else 'running' if running else 'not running'} ({args.socket})")
+        return 0 if running else 1
+    warm_server.serve(run_command, args.socket, args.index_dir)
+    return 0
+
+
+def main(argv: List[str]) -> int:
+    cold = "--cold" in argv[:1]
+    argv = argv[1:] if cold else argv
+    if not argv or argv[0] in ("-h", "--help"):
+        print_usage()
+        return 0
+    if argv[0] == "serve":
+        return serve(argv[1:])
+    if argv[0] not in COMMANDS and argv[0] != "dashboard":
+        print(f"❌ Unknown command: {argv[0]}")
+        print_usage()
+        return 2
+    if not cold and argv[0] != "dashboard":
+        import warm_server
+
+        code = warm_server.request(argv)
+        if code is not None:
+            return code
+    return run_command(argv)
+
+
+def cli() -> None:
+    """Console-script entry point (`resume-screen`, declared in pyproject.toml)."""
+    sys.exit(main(sys.argv[1:]))
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,4 +1,19 @@
+import os
+import sys
+import json
+import time
+import hashlib
 import subprocess
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT, "support")) # stage modules live in support/ and import each other flat
+
+import instrument
+from utils import peak_rss_mb
+
+STATE_FILE = os.path.join("data", ".pipeline_state.json") # fingerprints of the last successful run of each stage
+
 
 def run_command(command):
     print(f"\n👉 Running: {command}")
@@ -7,30 +22,233 @@ def run_command(command):
         print(f"❌ Command failed: {command}")
         exit(1)
 
+
+# -------------------- FINGERPRINTS --------------------
+def file_fingerprint(path: str) -> str:
+    """Cheap identity of a file: size + mtime, no content read."""
+    st = os.stat(path)
+    return f"{path}:{st.st_size}:{st.st_mtime_ns}"
+
+def dir_fingerprint(path: str, extensions) -> str:
+    entries = []
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if entry.is_file() and entry.name.lower().endswith(extensions):
+            st = entry.stat()
+            entries.append(f"{entry.name}:{st.st_size}:{st.st_mtime_ns}")
+    return "\n".join(entries)
+
+def digest(*parts: str) -> str:
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+# -------------------- ORCHESTRATOR --------------------
+class Stage:
+    """One pipeline step.
+
+    fingerprint(config) describes the stage's own inputs; the orchestrator mixes in
+    the fingerprints of its dependencies. run(config, *dep_values) computes the
+    stage output (and writes its artifacts); load(config) reads those artifacts
+    back when the stage is skipped but a downstream stage needs its value.
+    """
+
+    def __init__(self, name: str, deps: List[str], fingerprint: Callable[[Dict], str],
+                 run: Callable[..., Any], load: Callable[[Dict], Any], outputs: Callable[[Dict], List[str]]):
+        self.name = name
+        self.deps = deps
+        self.fingerprint = fingerprint
+        self.run = run
+        self.load = load
+        self.outputs = outputs
+
+
+class Pipeline:
+    """Runs stages in dependency order in one process, passing values in memory.
+
+    A stage is skipped when its fingerprint matches the last successful run and its
+    output artifacts still exist; its value is only loaded from disk if a later
+    stage that does run asks for it.
+    """
+
+    def __init__(self, stages: List[Stage], config: Dict[str, Any], state_file: str = STATE_FILE):
+        self.stages = {s.name: s for s in stages}
+        self.order = self._toposort(stages)
+        self.config = config
+        self.state_file = state_file
+        self._values: Dict[str, Any] = {}
+        self.report: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def _toposort(stages: List[Stage]) -> List[str]:
+        by_name = {s.name: s for s in stages}
+        order, visiting = [], set()
+
+        def visit(name):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Cycle in pipeline at stage {name}")
+            visiting.add(name)
+            for dep in by_name[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            order.append(name)
+
+        for s in stages:
+            visit(s.name)
+        return order
+
+    def _load_state(self) -> Dict[str, str]:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (ValueError, OSError):
+            return {}
+
+    def _save_state(self, state: Dict[str, str]) -> None:
+        os.makedirs(os.path.dirname(self.state_file) or ".", exist_ok=True)
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+
+    def value(self, name: str) -> Any:
+        if name not in self._values:
+            self._values[name] = self.stages[name].load(self.config)
+        return self._values[name]
+
+    def run(self, force: bool = False) -> Dict[str, Any]:
+        state = self._load_state()
+        fingerprints: Dict[str, str] = {}
+        for name in self.order:
+            stage = self.stages[name]
+            fingerprints[name] = digest(stage.fingerprint(self.config), *(fingerprints[d] for d in stage.deps))
+            outputs_exist = all(os.path.exists(p) for p in stage.outputs(self.config))
+            upstream_ran = any(r["status"] == "ran" for r in self.report if r["stage"] in stage.deps)
+
+            start = time.perf_counter()
+            if not force and not upstream_ran and outputs_exist and state.get(name) == fingerprints[name]:
+                status = "skipped"
+            else:
+                with instrument.span(f"stage.{name}"):
+                    self._values[name] = stage.run(self.config, *(self.value(d) for d in stage.deps))
+                instrument.memory(f"after {name}")
+                state[name] = fingerprints[name]
+                self._save_state(state) # persist per stage so a later failure keeps earlier progress
+                status = "ran"
+            self.report.append({"stage": name, "status": status,
+                                "seconds": time.perf_counter() - start, "peak_rss_mb": peak_rss_mb()})
+        return self._values
+
+    def print_report(self) -> None:
+        print("\nStage        Status    Seconds   Peak RSS (MB)")
+        for r in self.report:
+            rss = f"{r['peak_rss_mb']:.1f}" if r["peak_rss_mb"] is not None else "n/a"
+            print(f"{r['stage']:<12} {r['status']:<9} {r['seconds']:>7.3f}   {rss}")
+
+
+# -------------------- STAGES --------------------
+def parse_fingerprint(cfg):
+    from parse_resume import PARSER_VERSION, RESUME_EXTENSIONS
+    return digest(PARSER_VERSION, cfg["parsed_dir"], dir_fingerprint(cfg["resume_dir"], RESUME_EXTENSIONS))
+
+def parse_run(cfg):
+    from parse_resume import parse_resumes_batch
+    return parse_resumes_batch(cfg["resume_dir"], cfg["parsed_dir"], workers=cfg["workers"])
+
+def parse_load(cfg):
+    from feature_extraction import load_parsed_resumes
+    return load_parsed_resumes(cfg["parsed_dir"])
+
+def parse_outputs(cfg):
+    return [os.path.join(cfg["parsed_dir"], "all_parsed.json")]
+
+
+def features_run(cfg, parsed):
+    from feature_store import build_feature_store, save_feature_store
+    from feature_extraction import build_metadata_frame
+
+    store = build_feature_store(parsed)
+    save_feature_store(store, cfg["features_dir"])
+    build_metadata_frame(store).to_csv(os.path.join(cfg["features_dir"], "resume_features.csv"), index=False)
+    print(f"Features extracted for {len(store)} resumes")
+    return store
+
+def features_load(cfg):
+    from feature_store import load_feature_store
+    return load_feature_store(cfg["features_dir"])
+
+def features_outputs(cfg):
+    from feature_store import META_FILE
+    return [os.path.join(cfg["features_dir"], META_FILE)]
+
+
+def match_fingerprint(cfg):
+    scoring = file_fingerprint(cfg["scoring_config"]) if cfg.get("scoring_config") else "default"
+    return digest(file_fingerprint(cfg["job_description"]), cfg["index_dir"], cfg["results_dir"], scoring)
+
+def match_run(cfg, parsed, store):
+    from feature_extraction import build_metadata_frame
+    from match_and_rank import read_job_description, rank_hybrid, join_with_features, jd_id_of, save_ranked, is_rankable
+    from resume_index import load_or_build_index
+    from scoring import ScoringConfig, extract_job_profile
+
+    jd_text = read_job_description(cfg["job_description"])
+    index = load_or_build_index([r for r in parsed if is_rankable(r)], cfg["index_dir"]) # same set match_and_rank.py indexes
+    config, profile = ScoringConfig.load(cfg.get("scoring_config")), extract_job_profile(jd_text)
+    ranked = join_with_features(rank_hybrid(jd_text, index, store, config, profile), build_metadata_frame(store))
+    run_id = save_ranked(ranked, jd_id_of(cfg["job_description"]), cfg["results_dir"], config, profile)
+    print(f"Matching and ranking complete. Results saved as run {run_id} in {cfg['results_dir']}")
+    return ranked
+
+def match_load(cfg):
+    from result_store import read_results
+    return read_results(cfg["results_dir"]).to_dict(orient="records")
+
+def match_outputs(cfg):
+    return [cfg["results_dir"]]
+
+
+def build_pipeline(config: Dict[str, Any]) -> Pipeline:
+    return Pipeline([
+        Stage("parse", [], parse_fingerprint, parse_run, parse_load, parse_outputs),
+        Stage("features", ["parse"], lambda cfg: cfg["features_dir"], features_run, features_load, features_outputs),
+        Stage("match", ["parse", "features"], match_fingerprint, match_run, match_load, match_outputs),
+    ], config)
+
+
 def main():
-    # 1. Parse resumes
-    run_command(
-        "python support/parse_resume.py "
-        "--resume_dir data/resumes "
-        "--output_dir data/parsed"
-    )
-     
-    run_command(
-    "python support/feature_extraction.py "
-    "--parsed_dir data/parsed "
-    "--output_dir data/features"
-    )
-    # 2. Match and rank
-    run_command(
-    "python support/match_and_rank.py "
-    "--job_description data/job_description.txt "
-    "--parsed_dir data/parsed "
-    "--output_json data/results.json"
-)
-
-    # 3. Launch dashboard
-    print("\n✅ Pipeline finished. Launching dashboard...")
-    run_command("streamlit run support/dashboard_streamlit.py")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parse, featurize and rank resumes, then launch the dashboard.")
+    parser.add_argument("--resume_dir", default=os.path.join("data", "resumes"))
+    parser.add_argument("--parsed_dir", default=os.path.join("data", "parsed"))
+    parser.add_argument("--features_dir", default=os.path.join("data", "features"))
+    parser.add_argument("--index_dir", default=os.path.join("data", "index"))
+    parser.add_argument("--job_description", default=os.path.join("data", "job_description.txt"))
+    parser.add_argument("--results_dir", default=os.path.join("data", "results"), help="Columnar result store runs are appended to.")
+    parser.add_argument("--scoring_config", default=None, help="JSON file with scoring weights and bucket thresholds.")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count).")
+    parser.add_argument("--force", action="store_true", help="Run every stage even if its inputs are unchanged.")
+    parser.add_argument("--no_dashboard", action="store_true", help="Do not launch the Streamlit dashboard.")
+    instrument.add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.profile is not None:
+        instrument.enable(slowest=args.profile)
+
+    pipeline = build_pipeline(vars(args))
+    pipeline.run(force=args.force)
+    pipeline.print_report()
+    if args.profile is not None:
+        from parse_resume import reprofile_parse
+        instrument.finish("pipeline", args.profile_dir, reprofile=reprofile_parse)
+
+    if not args.no_dashboard:
+        print("\n✅ Pipeline finished. Launching dashboard...")
+        run_command("streamlit run support/dashboard_streamlit.py")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,232 @@
+import os
+import time
+import hashlib
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+
+IVF_FILE = "ivf.npz" #stored next to the ResumeIndex files
+
+
+def exact_top_k(matrix, q, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Reference path: score every row, keep the k best (argpartition, then sort k)."""
+    scores = np.asarray((matrix @ q.T).todense()).ravel()
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=scores.dtype)
+    top = np.argpartition(-scores, k - 1)[:k]
+    order = np.argsort(-scores[top], kind="stable")
+    return top[order], scores[top[order]]
+
+
+def _normalize_rows(a: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(a, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return a / norms
+
+
+def sparse_projection(vocab: int, dim: int, rng: np.random.Generator) -> sparse.csr_matrix:
+    """Very sparse random projection (Li, Hastie & Church, 2006), vocab x dim.
+
+    With s = sqrt(vocab), each entry is +-sqrt(s / dim) with probability 1/s and 0
+    otherwise, so about dim * sqrt(vocab) entries are stored instead of a dense
+    vocab x dim matrix, and distances are preserved as well as with a Gaussian one.
+    """
+    s = max(1.0, np.sqrt(vocab))
+    counts = rng.binomial(vocab, 1.0 / s, size=dim)
+    rows = np.concatenate([rng.choice(vocab, n, replace=False) for n in counts]) if vocab else np.empty(0, dtype=np.int64)
+    cols = np.repeat(np.arange(dim), counts)
+    data = (rng.choice(np.array([-1.0, 1.0], dtype=np.float32), len(rows)) * np.float32(np.sqrt(s / dim)))
+    return sparse.csr_matrix((data, (rows, cols)), shape=(vocab, dim), dtype=np.float32)
+
+
+def _project(x, projection) -> np.ndarray:
+    out = x @ projection
+    return np.asarray(out.toarray() if sparse.issparse(out) else out, dtype=np.float32)
+
+
+class IVFIndex:
+    """Inverted-file (cluster) index over TF-IDF rows for approximate top-k retrieval.
+
+    Rows are projected to a small dense space with a very sparse random projection
+    (see sparse_projection; its size grows with the square root of the vocabulary)
+    and grouped by spherical k-means. A query is compared with the centroids only,
+    the rows of the nprobe closest clusters are gathered, and just those candidates
+    are scored exactly against the sparse TF-IDF matrix.
+    """
+
+    def __init__(self, projection: np.ndarray, centroids: np.ndarray, offsets: np.ndarray,
+                 members: np.ndarray, signature: str = ""):
+        self.projection = projection #vocab x dim, sparse (older saved indexes: dense)
+        self.centroids = centroids #n_lists x dim, unit rows
+        self.offsets = offsets #members[offsets[c]:offsets[c + 1]] are the rows of cluster c
+        self.members = members
+        self.signature = signature
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, matrix, n_lists: Optional[int] = None, dim: int = 128, n_iter: int = 10,
+              seed: int = 0, signature: str = "", chunk_size: int = 65536) -> "IVFIndex":
+        matrix = sparse.csr_matrix(matrix)
+        n_rows, vocab = matrix.shape
+        rng = np.random.default_rng(seed)
+        n_lists = n_lists or max(1, int(np.sqrt(n_rows)))
+        n_lists = min(n_lists, n_rows)
+
+        projection = sparse_projection(vocab, dim, rng)
+        reduced = _normalize_rows(_project(matrix, projection))
+        if n_lists == 0: #empty corpus: nothing to cluster, every search returns no rows
+            return cls(projection, np.empty((0, dim), dtype=np.float32), np.zeros(1, dtype=np.int64),
+                       np.empty(0, dtype=np.int64), signature)
+
+        centroids = reduced[rng.choice(n_rows, n_lists, replace=False)]
+        for _ in range(n_iter):
+            assign = cls._assign(reduced, centroids, chunk_size)
+            onehot = sparse.csr_matrix((np.ones(n_rows, dtype=np.float32), (assign, np.arange(n_rows))),
+                                       shape=(n_lists, n_rows))
+            sums = np.asarray(onehot @ reduced)
+            counts = np.bincount(assign, minlength=n_lists)
+            empty = counts == 0
+            if empty.any(): #re-seed empty clusters with random rows
+                sums[empty] = reduced[rng.choice(n_rows, int(empty.sum()), replace=False)]
+            centroids = _normalize_rows(sums)
+        assign = cls._assign(reduced, centroids, chunk_size)
+
+        members = np.argsort(assign, kind="stable").astype(np.int64)
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=n_lists), out=offsets[1:])
+        return cls(projection, centroids.astype(np.float32), offsets, members, signature)
+
+    @staticmethod
+    def _assign(reduced: np.ndarray, centroids: np.ndarray, chunk_size: int) -> np.ndarray:
+        out = np.empty(len(reduced), dtype=np.int64)
+        for start in range(0, len(reduced), chunk_size):
+            out[start:start + chunk_size] = np.argmax(reduced[start:start + chunk_size] @ centroids.T, axis=1)
+        return out
+
+    def candidates(self, q, nprobe: int) -> np.ndarray:
+        """Row ids in the nprobe clusters whose centroids are closest to q."""
+        nprobe = min(nprobe, self.n_lists)
+        if nprobe <= 0:
+            return np.empty(0, dtype=np.int64)
+        q_red = _project(q, self.projection).ravel()
+        sims = self.centroids @ q_red
+        probe = np.argpartition(-sims, nprobe - 1)[:nprobe]
+        return np.concatenate([self.members[self.offsets[c]:self.offsets[c + 1]] for c in probe])
+
+    def search(self, matrix, q, k: int, nprobe: int = 8) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate top-k rows of matrix for query q (1 x vocab sparse), best first."""
+        rows = self.candidates(q, nprobe)
+        k = min(k, len(rows))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = np.asarray((matrix[rows] @ q.T).todense()).ravel()
+        top = np.argpartition(-scores, k - 1)[:k]
+        order = np.argsort(-scores[top], kind="stable")
+        return rows[top[order]], scores[top[order]]
+
+    def save(self, index_dir: str) -> None:
+        os.makedirs(index_dir, exist_ok=True)
+        projection = sparse.csr_matrix(self.projection)
+        np.savez(os.path.join(index_dir, IVF_FILE), projection_data=projection.data,
+                 projection_indices=projection.indices, projection_indptr=projection.indptr,
+                 projection_shape=np.array(projection.shape), centroids=self.centroids,
+                 offsets=self.offsets, members=self.members, signature=np.array(self.signature))
+
+    @classmethod
+    def load(cls, index_dir: str) -> "IVFIndex":
+        with np.load(os.path.join(index_dir, IVF_FILE)) as data:
+            if "projection" in data.files: #written before the projection was sparse
+                projection = data["projection"]
+            else:
+                projection = sparse.csr_matrix((data["projection_data"], data["projection_indices"],
+                                                data["projection_indptr"]), shape=tuple(data["projection_shape"]))
+            return cls(projection, data["centroids"], data["offsets"], data["members"], str(data["signature"]))
+
+
+def index_signature(index) -> str:
+    """Identity of a ResumeIndex's rows; the IVF lists are only valid for the same rows."""
+    h = hashlib.sha1()
+    for name, doc_hash in zip(index.file_names, index.doc_hashes):
+        h.update(f"{name}:{doc_hash}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_or_build_ivf(index, index_dir: str, n_lists: Optional[int] = None) -> IVFIndex:
+    """Load the saved IVF for this ResumeIndex, rebuilding it if the indexed rows changed."""
+    signature = index_signature(index)
+    path = os.path.join(index_dir, IVF_FILE)
+    if os.path.exists(path):
+        ivf = IVFIndex.load(index_dir)
+        if ivf.signature == signature and (n_lists is None or ivf.n_lists == n_lists):
+            return ivf
+    ivf = IVFIndex.build(index.matrix, n_lists=n_lists, signature=signature)
+    ivf.save(index_dir)
+    return ivf
+
+
+def benchmark_recall(matrix, ivf: IVFIndex, queries, k: int = 50,
+                     nprobe_values=(1, 2, 4, 8, 16, 32)) -> List[Dict[str, Any]]:
+    """Recall@k and latency of IVF search against exact_top_k for each nprobe."""
+    queries = sparse.csr_matrix(queries)
+    exact, exact_ms = [], 0.0
+    for i in range(queries.shape[0]):
+        start = time.perf_counter()
+        rows, _ = exact_top_k(matrix, queries[i], k)
+        exact_ms += (time.perf_counter() - start) * 1000
+        exact.append(set(rows.tolist()))
+
+    report = []
+    for nprobe in nprobe_values:
+        if nprobe > ivf.n_lists:
+            break
+        hits, total, ann_ms, scanned = 0, 0, 0.0, 0
+        for i, truth in enumerate(exact):
+            start = time.perf_counter()
+            rows, _ = ivf.search(matrix, queries[i], k, nprobe)
+            ann_ms += (time.perf_counter() - start) * 1000
+            scanned += len(ivf.candidates(queries[i], nprobe))
+            hits += len(truth.intersection(rows.tolist()))
+            total += len(truth)
+        n = max(1, len(exact))
+        report.append({
+            "nprobe": nprobe,
+            "recall": hits / total if total else 1.0,
+            "ann_ms_per_query": ann_ms / n,
+            "exact_ms_per_query": exact_ms / n,
+            "fraction_scored": scanned / n / matrix.shape[0],
+        })
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    from resume_index import INDEX_DIR, ResumeIndex
+
+    parser = argparse.ArgumentParser(description="Build the IVF index and compare its recall with exact ranking.")
+    parser.add_argument("--index_dir", type=str, default=INDEX_DIR, help="Directory of the persisted TF-IDF resume index.")
+    parser.add_argument("--n_lists", type=int, default=None, help="Number of clusters (default: sqrt of corpus size).")
+    parser.add_argument("--jd_dir", type=str, help="Job descriptions to use as queries (default: sample of resumes).")
+    parser.add_argument("--n_queries", type=int, default=100, help="Resumes sampled as queries when no --jd_dir is given.")
+    parser.add_argument("--top_k", type=int, default=50)
+    args = parser.parse_args()
+
+    if not ResumeIndex.exists(args.index_dir):
+        print("No resume index found. Run match_and_rank.py first.")
+        exit(1)
+    index = ResumeIndex.load(args.index_dir)
+    ivf = load_or_build_ivf(index, args.index_dir, args.n_lists)
+
+    if args.jd_dir:
+        from match_and_rank import load_job_descriptions
+        queries = index.vectorizer.transform(load_job_descriptions(args.jd_dir)[1])
+    else:
+        rng = np.random.default_rng(0)
+        queries = index.matrix[rng.choice(len(index), min(args.n_queries, len(index)), replace=False)]
+
+    report = benchmark_recall(index.matrix, ivf, queries, k=args.top_k)
+    print(json.dumps({"n_resumes": len(index), "n_lists": ivf.n_lists, "k": args.top_k, "results": report}, indent=2))
@@ -0,0 +1,399 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from instrument import current_rss_mb
+from utils import SALESFORCE_SKILLS
+
+BENCH_DIR = os.path.join("data", "bench") #generated corpora, one sub-directory per size
+CORPUS_META = "corpus.json"
+FORMATS = ("txt", "docx", "pdf")
+
+# Vocabulary for synthetic resumes, modelled on the samples in data/resumes
+FIRST_NAMES = ["Aarav", "Vihaan", "Aditi", "Anaya", "Ishaan", "Kavya", "Rohan", "Meera", "Arjun", "Diya",
+               "Kabir", "Saanvi", "Reyansh", "Myra", "Vivaan", "Priya", "Neha", "Rahul", "Sara", "Dev"]
+LAST_NAMES = ["Sharma", "Chopra", "Mehta", "Patel", "Iyer", "Reddy", "Nair", "Gupta", "Singh", "Kapoor",
+              "Bose", "Joshi", "Verma", "Rao", "Das"]
+TITLES = ["Salesforce Engineer", "Salesforce Developer", "Salesforce Consultant", "CRM Developer",
+          "Salesforce Administrator", "Platform Engineer"]
+EXTRA_SKILLS = ["Java", "JavaScript", "Python", "SQL", "Tableau", "AWS", "Docker", "Agile", "Scrum", "Excel"]
+EXPERIENCE_LINES = [
+    "- Built Lightning Web Components (LWC) and Apex classes for Sales Cloud and Service Cloud.",
+    "- Implemented integrations using REST API and OAuth; deployed via SFDX and CI/CD.",
+    "- Wrote test classes with >85% coverage; used Git and Jira for DevOps workflows.",
+    "- Designed Flows and Process Builder automation replacing legacy Workflow rules.",
+    "- Migrated 2M records with Data Loader and tuned SOQL queries for large data volumes.",
+    "- Configured profiles, permission sets and sharing rules for a 500-user org.",
+    "- Maintained MuleSoft APIs connecting Salesforce to the ERP and billing systems.",
+    "- Delivered Experience Cloud portals and Einstein dashboards for partner teams.",
+]
+CERTIFICATIONS = ["Salesforce Admin", "Platform Developer I", "Platform Developer II", "App Builder",
+                  "Sales Cloud Consultant", "Service Cloud Consultant"]
+EDUCATION = ["B.Tech in Computer Science", "B.E. in Information Technology", "MCA", "M.Sc in Computer Science"]
+
+
+# -------------------- CORPUS GENERATOR --------------------
+def synthetic_resume(i: int, seed: int = 0) -> List[str]:
+    """Lines of one synthetic resume; deterministic for (i, seed)."""
+    rng = np.random.default_rng([seed, i])
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    years = int(rng.integers(1, 16))
+    skill_pool = SALESFORCE_SKILLS + EXTRA_SKILLS
+    skills = [skill_pool[j].title() for j in rng.choice(len(skill_pool), int(rng.integers(6, 20)), replace=False)]
+    experience = [EXPERIENCE_LINES[j] for j in rng.choice(len(EXPERIENCE_LINES), int(rng.integers(2, 6)), replace=False)]
+    lines = [
+        f"{first} {last}",
+        f"Email: {first.lower()}.{last.lower()}{i}@example.com | Phone: +91-9{int(rng.integers(100000000, 999999999))}",
+        "",
+        "Profile Summary",
+        f"{rng.choice(TITLES)} with {years} years of experience building scalable solutions on the Salesforce platform. "
+        f"Hands-on with {', '.join(skills[:6])}.",
+        "Experience",
+        *experience,
+        "Education",
+        f"- {rng.choice(EDUCATION)}",
+        "Skills",
+        *(f"- {s}" for s in skills),
+        "Certifications",
+        *(f"- {c}" for c in rng.choice(CERTIFICATIONS, int(rng.integers(0, 3)), replace=False)),
+    ]
+    return lines
+
+
+def _escape_pdf(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def write_pdf(path: str, lines: List[str], lines_per_page: int = 50) -> None:
+    """Minimal text-only PDF (Helvetica, one content stream per page), enough for pdfminer."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        stream = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({_escape_pdf(l)}) Tj T*" for l in page) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for n, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{n} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode("ascii")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def write_docx(path: str, lines: List[str]) -> None:
+    import docx
+
+    doc = docx.Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def write_txt(path: str, lines: List[str]) -> None:
+    # The sample .txt resumes keep real newlines in the header and literal "\n" further down; so do these
+    head, body = lines[:5], lines[5:]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(head) + "\\n" + "\\n".join(body))
+
+
+WRITERS: Dict[str, Callable[[str, List[str]], None]] = {"txt": write_txt, "docx": write_docx, "pdf": write_pdf}
+
+
+def _write_range(out_dir: str, start: int, formats: Sequence[str], seed: int) -> None: # runs in a worker process
+    for i, fmt in enumerate(formats, start):
+        WRITERS[fmt](os.path.join(out_dir, f"resume_{i:07d}.{fmt}"), synthetic_resume(i, seed))
+
+
+def generate_corpus(out_dir: str, n: int, mix: Sequence[float] = (0.8, 0.1, 0.1), seed: int = 0,
+                    workers: Optional[int] = None, chunk: int = 2000) -> List[str]:
+    """Write n synthetic resumes to out_dir with txt/docx/pdf in the given proportions.
+
+    A corpus.json marker records what was generated, so an identical request reuses
+    the files instead of writing them again. Returns the file paths.
+    """
+    meta = {"n": n, "mix": list(mix), "seed": seed}
+    meta_path = os.path.join(out_dir, CORPUS_META)
+    formats = np.random.default_rng(seed).choice(FORMATS, size=n, p=np.asarray(mix) / np.sum(mix)).tolist()
+    paths = [os.path.join(out_dir, f"resume_{i:07d}.{fmt}") for i, fmt in enumerate(formats)]
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            if json.load(f) == meta:
+                return paths
+
+    os.makedirs(out_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_write_range, out_dir, start, formats[start:start + chunk], seed)
+                   for start in range(0, n, chunk)]
+        for fut in futures:
+            fut.result()
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return paths
+
+
+# -------------------- STAGE TIMING --------------------
+def _reset_peak_rss() -> bool:
+    """Reset this process's RSS high-water mark (Linux 4.0+); False where that is not possible."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _vm_hwm_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/status", "r") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024 #kB
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class stage_memory:
+    """Memory of one stage: `with stage_memory() as mem: ...`, then mem.result.
+
+    rss_delta_mb is the RSS the stage added (negative if it freed memory).
+    stage_peak_rss_mb is the highest RSS reached during the stage. It is only
+    reported where the high-water mark can be reset first (Linux; this also
+    resets getrusage's ru_maxrss). Elsewhere it is None, because the
+    process-wide peak would include earlier stages.
+    """
+
+    def __enter__(self):
+        self.before = current_rss_mb()
+        self.reset = _reset_peak_rss()
+        self.result: Dict[str, Optional[float]] = {"rss_delta_mb": None, "stage_peak_rss_mb": None}
+        return self
+
+    def __exit__(self, *exc):
+        after = current_rss_mb()
+        if after is not None and self.before is not None:
+            self.result["rss_delta_mb"] = after - self.before
+        if self.reset:
+            self.result["stage_peak_rss_mb"] = _vm_hwm_mb()
+        return False
+
+
+def summarize(name: str, seconds: float, n_docs: int, latencies_ms: Optional[np.ndarray] = None,
+              memory: Optional[Dict[str, Optional[float]]] = None) -> Dict[str, Any]:
+    result = {
+        "stage": name,
+        "docs": n_docs,
+        "seconds": seconds,
+        "docs_per_sec": n_docs / seconds if seconds > 0 else None,
+        "p50_ms": None,
+        "p99_ms": None,
+        "rss_delta_mb": None,
+        "stage_peak_rss_mb": None,
+        **(memory or {}),
+    }
+    if latencies_ms is not None and len(latencies_ms):
+        result["p50_ms"], result["p99_ms"] = (float(v) for v in np.percentile(latencies_ms, [50, 99]))
+    return result
+
+
+def time_per_doc(func: Callable[[Any], Any], items: Sequence[Any]):
+    """Call func on every item; returns (outputs, total seconds, per-item latency in ms)."""
+    outputs, latencies = [], np.empty(len(items), dtype=np.float64)
+    start = time.perf_counter()
+    for i, item in enumerate(items):
+        t0 = time.perf_counter()
+        outputs.append(func(item))
+        latencies[i] = (time.perf_counter() - t0) * 1000
+    return outputs, time.perf_counter() - start, latencies
+
+
+def run_benchmark(paths: List[str], jd_text: str, stages: Sequence[str] = ("parse", "features", "similarity", "join")):
+    """Time each requested stage (and the stages it needs) over one corpus.
+
+    parse and features are timed per document. compute_similarity and
+    join_with_features work on the whole corpus at once, so they report
+    throughput only (their p50/p99 are null).
+    """
+    import pandas as pd
+    from parse_resume import parse_resume
+    from feature_extraction import build_feature_vector
+    from match_and_rank import compute_similarity, join_with_features
+
+    report = []
+    with stage_memory() as mem:
+        parsed, seconds, lat = time_per_doc(lambda p: parse_resume(p, cache_dir=None), paths) #no text cache: measure extraction
+    report.append(summarize("parse_resume", seconds, len(paths), lat, mem.result))
+    parsed = [r for r in parsed if "error" not in r]
+    failed = len(paths) - len(parsed)
+    if failed:
+        print(f"⚠️ {failed} synthetic resumes failed to parse")
+
+    if "features" in stages or "join" in stages:
+        with stage_memory() as mem:
+            features, seconds, lat = time_per_doc(build_feature_vector, parsed)
+        report.append(summarize("build_feature_vector", seconds, len(parsed), lat, mem.result))
+
+    if "similarity" in stages or "join" in stages:
+        with stage_memory() as mem:
+            start = time.perf_counter()
+            sim_rows = compute_similarity(jd_text, parsed)
+            seconds = time.perf_counter() - start
+        report.append(summarize("compute_similarity", seconds, len(parsed), memory=mem.result))
+
+    if "join" in stages:
+        features_df = pd.DataFrame(features)
+        with stage_memory() as mem:
+            start = time.perf_counter()
+            join_with_features(sim_rows, features_df)
+            seconds = time.perf_counter() - start
+        report.append(summarize("join_with_features", seconds, len(parsed), memory=mem.result))
+    return report
+
+
+# -------------------- STARTUP TIMING --------------------
+CLI = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resume_screen.py")
+STARTUP_COMMANDS = ("pipeline", "parse", "features", "match", "ingest", "ann", "shards", "benchmark")
+
+
+def startup_benchmark(commands: Sequence[str] = STARTUP_COMMANDS, repeat: int = 5, warm: bool = False) -> List[Dict[str, Any]]:
+    """Wall time of `resume_screen.py <command> --help` in a fresh interpreter.
+
+    --help returns right after argument parsing, so this is import and module
+    set-up cost. warm=True goes through a running warm server instead of --cold.
+    The bare interpreter start is reported as "python" for reference.
+    """
+    results = []
+    for command in ("python",) + tuple(commands):
+        argv = [sys.executable, "-c", "pass"] if command == "python" else \
+            [sys.executable, CLI, *([] if warm else ["--cold"]), command, "--help"]
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            times.append((time.perf_counter() - start) * 1000)
+        results.append({"command": command, "mode": "warm" if warm else "cold",
+                        "median_ms": float(np.median(times)), "min_ms": float(np.min(times))})
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.10) -> List[str]:
+    """Lines describing stages whose throughput dropped by more than tolerance versus baseline."""
+    base = {(run["n"], s["stage"]): s for run in baseline.get("runs", []) for s in run["stages"]}
+    lines = []
+    for run in current["runs"]:
+        for s in run["stages"]:
+            old = base.get((run["n"], s["stage"]))
+            if not old or not old.get("docs_per_sec") or not s.get("docs_per_sec"):
+                continue
+            change = s["docs_per_sec"] / old["docs_per_sec"] - 1
+            flag = "⚠️ " if change < -tolerance else ""
+            lines.append(f"{flag}{s['stage']:<22} n={run['n']:<8} {old['docs_per_sec']:>10.1f} -> {s['docs_per_sec']:>10.1f} docs/s ({change:+.1%})")
+    base = {(s["command"], s["mode"]): s for s in baseline.get("startup", [])}
+    for s in current.get("startup", []):
+        old = base.get((s["command"], s["mode"]))
+        if not old:
+            continue
+        change = s["median_ms"] / old["median_ms"] - 1
+        flag = "⚠️ " if change > tolerance else ""
+        lines.append(f"{flag}startup {s['command']:<14} {s['mode']:<5} {old['median_ms']:>8.0f} -> {s['median_ms']:>8.0f} ms ({change:+.1%})")
+    return lines
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark parsing, feature extraction and ranking on a synthetic corpus.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000], help="Corpus sizes to run, e.g. 1000 100000 1000000.")
+    parser.add_argument("--mix", type=float, nargs=3, default=[0.8, 0.1, 0.1], metavar=("TXT", "DOCX", "PDF"),
+                        help="Share of each file format in the corpus.")
+    parser.add_argument("--bench_dir", type=str, default=BENCH_DIR, help="Where generated corpora are kept between runs.")
+    parser.add_argument("--job_description", type=str, default=os.path.join("data", "job_description.txt"))
+    parser.add_argument("--stages", nargs="+", default=["parse", "features", "similarity", "join"],
+                        choices=["parse", "features", "similarity", "join"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="Processes used to generate the corpus.")
+    parser.add_argument("--startup", action="store_true",
+                        help="Time CLI cold start per subcommand (and warm start if a server runs) instead of the stages.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per subcommand in --startup mode.")
+    parser.add_argument("--output", type=str, default=None,
+                        help="JSON report path (default data/benchmark.json, or data/startup.json with --startup).")
+    parser.add_argument("--baseline", type=str, help="Earlier JSON report to compare throughput against.")
+    args = parser.parse_args()
+
+    if os.path.exists(args.job_description):
+        with open(args.job_description, "r", encoding="utf-8") as f:
+            jd_text = f.read()
+    else:
+        jd_text = "Salesforce Engineer with Apex, LWC, SOQL, integrations, OAuth, SFDX and CI/CD experience."
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "runs": [],
+    }
+    if args.startup:
+        import warm_server
+
+        report["startup"] = startup_benchmark(repeat=args.repeat)
+        if warm_server.ping():
+            report["startup"] += startup_benchmark(repeat=args.repeat, warm=True)
+        for s in report["startup"]:
+            print(f"  {s['command']:<12} {s['mode']:<5} median {s['median_ms']:>8.0f} ms  min {s['min_ms']:>8.0f} ms")
+    for n in ([] if args.startup else args.sizes):
+        corpus_dir = os.path.join(args.bench_dir, f"corpus_{n}")
+        start = time.perf_counter()
+        paths = generate_corpus(corpus_dir, n, args.mix, args.seed, args.workers)
+        print(f"Corpus of {n} resumes ready in {corpus_dir} ({time.perf_counter() - start:.1f}s)")
+        stages = run_benchmark(paths, jd_text, args.stages)
+        report["runs"].append({"n": n, "mix": args.mix, "stages": stages})
+        for s in stages:
+            p50 = f"{s['p50_ms']:.3f}" if s["p50_ms"] is not None else "-"
+            p99 = f"{s['p99_ms']:.3f}" if s["p99_ms"] is not None else "-"
+            peak = f"{s['stage_peak_rss_mb']:.0f}" if s["stage_peak_rss_mb"] is not None else "-"
+            delta = f"{s['rss_delta_mb']:+.0f}" if s["rss_delta_mb"] is not None else "-"
+            print(f"  {s['stage']:<22} {s['docs_per_sec']:>10.1f} docs/s  p50 {p50:>8} ms  p99 {p99:>8} ms  "
+                  f"stage peak RSS {peak:>5} MB ({delta} MB)")
+
+    output = args.output or os.path.join("data", "startup.json" if args.startup else "benchmark.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark report saved to {output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            for line in compare(report, json.load(f)):
+                print(line)
+
+if __name__ == "__main__":
+    main()
@@ -2,42 +2,128 @@ import streamlit as st
 import pandas as pd
 import json
 import os
+import sys
 import subprocess
+import instrument
+from feature_store import FEATURES_DIR
+from result_query import QUERY_DB, ResultQuery, ensure_result_db
+from result_store import RESULTS_DIR, latest_full_run, run_metadata
+from scoring import BUCKETS, COMPONENTS, ScoringConfig, bucketize_array
 
 # ---------- CONFIG ----------
-RESULTS_FILE = "data/results.json"      # JSON file containing ranked results
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) # repository root, where run_pipeline.py lives
 PARSED_DIR = "data/parsed"              # Parsed JSON resumes directory
 
 
-def load_results():
-    """Load ranked results JSON (resume similarity scores)."""
-    if os.path.exists(RESULTS_FILE):
-        with open(RESULTS_FILE, "r") as f:
-            data = json.load(f)
-        df = pd.DataFrame(data)
+# ---------- DATA LAYER ----------
+# Streamlit reruns this script on every widget interaction. Loaders are cached and
+# take the source file's mtime (or the result run id) as an argument, so a rerun is
+# a cache hit until the pipeline writes a new version.
+def file_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
 
-        # Map resume_index -> filename (from parsed dir)
-        parsed_files = sorted([f for f in os.listdir(PARSED_DIR) if f.endswith(".json")])
-        df["file"] = df["resume_index"].apply(
-            lambda i: parsed_files[i] if i < len(parsed_files) else f"unknown_{i}"
-        )
-        return df
-    else:
-        return pd.DataFrame()
+
+def parsed_json_name(file_name):
+    return f"{os.path.splitext(file_name)[0]}.json"
+
+
+@st.cache_data(show_spinner=False)
+def _load_resume_details(filepath, mtime):
+    with open(filepath, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    # ✅ Handle both list & dict JSON
+    if isinstance(data, list) and len(data) > 0:
+        return data[0]
+    elif isinstance(data, dict):
+        return data
+    return {}
 
 
+@instrument.timed()
 def load_resume_details(filename):
     """Load parsed JSON details for a given resume."""
     filepath = os.path.join(PARSED_DIR, filename)
-    if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        # ✅ Handle both list & dict JSON
-        if isinstance(data, list) and len(data) > 0:
-            return data[0]
-        elif isinstance(data, dict):
-            return data
-    return {}
+    mtime = file_mtime(filepath)
+    if mtime is None:
+        return {}
+    return _load_resume_details(filepath, mtime)
+
+
+@st.cache_resource(show_spinner=False)
+def _open_query(db_path, mtime):
+    return ResultQuery(db_path)
+
+
+@instrument.timed()
+def open_query():
+    """Indexed query layer over the results, rebuilt only when a new run lands in the result store."""
+    if latest_full_run(RESULTS_DIR) is None:
+        return None
+    ensure_result_db(RESULTS_DIR, FEATURES_DIR, QUERY_DB)
+    return _open_query(QUERY_DB, file_mtime(QUERY_DB))
+
+
+@st.cache_data(show_spinner=False)
+def _skill_options(db_path, mtime):
+    return _open_query(db_path, mtime).all_skills()
+
+
+@st.cache_data(show_spinner=False)
+def _skill_counts(db_path, mtime, filters):
+    return _open_query(db_path, mtime).skill_counts(**filters)
+
+
+@instrument.timed()
+def skill_counts(filters):
+    """Skill -> number of candidates matching filters that have it, aggregated over the whole filtered set."""
+    mtime = file_mtime(QUERY_DB)
+    if mtime is None:
+        return pd.Series(dtype="int64")
+    return pd.Series(dict(_skill_counts(QUERY_DB, mtime, filters)), dtype="int64")
+
+
+@st.cache_data(show_spinner=False)
+def _has_components(db_path, mtime):
+    return _open_query(db_path, mtime).has_components()
+
+
+@st.cache_data(show_spinner=False)
+def _run_scoring(results_dir, run_id):
+    return run_metadata(run_id, results_dir).get("scoring") or ScoringConfig().to_dict()
+
+
+def run_scoring():
+    """Weights and bucket thresholds the latest full run was scored with."""
+    run_id = latest_full_run(RESULTS_DIR)
+    return _run_scoring(RESULTS_DIR, run_id) if run_id else ScoringConfig().to_dict()
+
+
+@st.cache_data(show_spinner=False)
+def _run_job_profile(results_dir, run_id):
+    return run_metadata(run_id, results_dir).get("job_profile") or {}
+
+
+def run_job_profile():
+    """Required/preferred skills and minimum years the latest full run read from the job description."""
+    run_id = latest_full_run(RESULTS_DIR)
+    return _run_job_profile(RESULTS_DIR, run_id) if run_id else {}
+
+
+@st.cache_data(show_spinner=False)
+def _load_explanation(db_path, mtime, file_name):
+    return _open_query(db_path, mtime).explanation(file_name)
+
+
+@instrument.timed()
+def load_explanation(file_name):
+    """Why a candidate scored as it did: precomputed at ranking time, fetched by key."""
+    mtime = file_mtime(QUERY_DB)
+    if mtime is None:
+        return None
+    return _load_explanation(QUERY_DB, mtime, file_name)
 
 
 # ---------- STREAMLIT UI ----------
@@ -47,41 +133,80 @@ st.markdown("Easily explore parsed resumes and their relevance to the Salesforce
 
 
 # Sidebar filters
+query = open_query()
 st.sidebar.header("🔎 Filters")
-top_n = st.sidebar.slider("Number of top resumes to view:", 5, 50, 20)
-threshold = st.sidebar.slider("Minimum similarity score:", 0.0, 1.0, 0.3, 0.01)
-
-# One-click automation: Parse + Match + Rank
-if st.sidebar.button("🚀 Re-parse & Rank Resumes"):
-    from parse_resume import parse_resumes_batch
+page_size = st.sidebar.selectbox("Resumes per page:", [10, 25, 50, 100], index=1)
+score_range = st.sidebar.slider("Score range:", 0.0, 1.0, (0.3, 1.0), 0.01)
+years_range = st.sidebar.slider("Years of experience:", 0, 40, (0, 40))
+skill_options = _skill_options(QUERY_DB, file_mtime(QUERY_DB)) if query is not None else []
+required_skills = st.sidebar.multiselect("Required skills:", skill_options)
+sort_by = st.sidebar.selectbox("Sort by:", ["score", "similarity", "years_experience"])
+descending = st.sidebar.checkbox("Descending", value=True)
 
-    try:
-        # Step 1: Re-parse resumes
-        parse_resumes_batch("data/resumes", "data/parsed")
-        st.success("✅ Resumes re-parsed successfully.")
+# Re-weighting only changes the SQL sort expression; nothing is re-vectorized
+scoring = run_scoring()
+weights = None
+if query is not None and _has_components(QUERY_DB, file_mtime(QUERY_DB)):
+    with st.sidebar.expander("⚖️ Scoring weights"):
+        chosen = {c: st.slider(c.replace("_", " ").capitalize(), 0.0, 1.0, float(scoring["weights"][c]), 0.05)
+                  for c in COMPONENTS}
+    if chosen != scoring["weights"]:
+        weights = chosen
 
-        # Step 2: Run matching & ranking
-        subprocess.run(["python", "match_and_rank.py"], check=True)
-        st.success("✅ Matching & ranking complete!")
+# One-click automation: Parse + Match + Rank, in the background so the UI stays responsive.
+# For continuous intake, run support/ingest_daemon.py instead; results refresh on their own.
+if st.sidebar.button("🚀 Re-parse & Rank Resumes"):
+    job = st.session_state.get("pipeline_job")
+    if job is not None and job.poll() is None:
+        st.sidebar.info("⏳ Pipeline is already running.")
+    else:
+        try:
+            st.session_state["pipeline_job"] = subprocess.Popen(
+                [sys.executable, os.path.join(ROOT_DIR, "run_pipeline.py"), "--no_dashboard"])
+            st.sidebar.success("✅ Pipeline started. Results appear here when it finishes.")
+        except Exception as e:
+            st.sidebar.error(f"❌ Automation failed: {e}")
 
-        # Step 3: Reload results
-        results = load_results()
-        st.experimental_rerun()  # 🔄 Refresh dashboard with new results
-    except Exception as e:
-        st.error(f"❌ Automation failed: {e}")
+job = st.session_state.get("pipeline_job")
+if job is not None and job.poll() is not None:
+    if job.returncode != 0:
+        st.sidebar.error(f"❌ Pipeline exited with code {job.returncode}")
+    st.session_state["pipeline_job"] = None
 
 
-# Load results
-results = load_results()
+selected_file = None
 
-if results.empty:
+if query is None:
     st.warning("⚠️ No results found. Please run the automation button in the sidebar.")
 else:
-    # Filter results
-    filtered = results[results["similarity"] >= threshold].sort_values("similarity", ascending=False).head(top_n)
+    filters = dict(min_score=score_range[0], max_score=score_range[1],
+                   min_years=years_range[0], max_years=None if years_range[1] >= 40 else years_range[1],
+                   required_skills=tuple(required_skills), weights=weights)
+
+    # Keyset pagination: keep the cursor that starts each visited page, reset when filters change
+    signature = (repr(filters), sort_by, descending, page_size, file_mtime(QUERY_DB))
+    if st.session_state.get("page_signature") != signature:
+        st.session_state["page_signature"] = signature
+        st.session_state["page_cursors"] = [None]
+    cursors = st.session_state["page_cursors"]
+
+    rows, next_cursor = query.page(page_size=page_size, cursor=cursors[-1], sort_by=sort_by, descending=descending, **filters)
+    filtered = pd.DataFrame(rows, columns=["id", "file_name", "name", "email", "phone", "score", *COMPONENTS, "years_experience"])
+    filtered["file"] = filtered["file_name"].map(parsed_json_name)
+    filtered["bucket"] = [BUCKETS[b] for b in bucketize_array(filtered["score"].to_numpy(), scoring["thresholds"])]
 
     st.subheader("🏆 Top Matching Resumes")
-    st.dataframe(filtered[["file", "similarity"]])
+    st.dataframe(filtered[["file", "score", "bucket", "similarity", "required_overlap", "experience_fit", "years_experience"]],
+                 hide_index=True)
+
+    prev_col, page_col, next_col = st.columns([1, 2, 1])
+    if prev_col.button("⬅️ Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    page_col.markdown(f"Page {len(cursors)}")
+    if next_col.button("Next ➡️", disabled=next_cursor is None):
+        cursors.append(next_cursor)
+        st.rerun()
 
     # Resume details
     st.subheader("📄 Resume Details")
@@ -110,7 +235,7 @@ if selected_file:
 
         # Education
         st.markdown("**Education:**")
-        st.write(details.get("education", "N/A"))
+        st.write("; ".join(details.get("education") or []) or "N/A")
 
         # Experience
         st.markdown("**Experience:**")
@@ -118,23 +243,49 @@ if selected_file:
 
         # Certifications
         st.markdown("**Certifications:**")
-        st.write(", ".join(details.get("certifications", [])))
+        st.write(", ".join(details.get("certifications") or []) or "N/A")
     else:
         st.error("❌ No details found for this resume.")
 
+    # Why this score: looked up, never recomputed
+    selected = filtered[filtered["file"] == selected_file].iloc[0]
+    explanation = load_explanation(selected["file_name"])
+    st.subheader("🔍 Why this score")
+    if explanation is None:
+        st.info("No explanation stored for this run. Re-rank with the feature store in place to add one.")
+    else:
+        parts = st.columns(len(COMPONENTS))
+        for col, c in zip(parts, COMPONENTS):
+            col.metric(f"{c.replace('_', ' ').capitalize()} (×{scoring['weights'][c]:.2f})", f"{selected[c]:.2f}")
+
+        terms_col, skills_col = st.columns(2)
+        with terms_col:
+            st.markdown("**Top matching terms:**")
+            if explanation["terms"]:
+                st.bar_chart(pd.DataFrame(explanation["terms"], columns=["Term", "Contribution"]).set_index("Term"))
+            else:
+                st.write("No terms in common with the job description.")
+        with skills_col:
+            required = set(run_job_profile().get("required") or [])
+            for title, key in (("✅ Matched skills", "matched"), ("❌ Missing skills", "missing")):
+                skills = [f"{s} (required)" if s in required else s for s in explanation[key]]
+                st.markdown(f"**{title}:** {', '.join(skills) or 'none'}")
+            delta = explanation["experience_delta"]
+            if delta is not None:
+                st.markdown(f"**Experience:** {selected['years_experience']:g} years "
+                            f"({delta:+g} vs the {run_job_profile().get('min_years'):g} asked for)")
+
     # Visualization
     st.subheader("📊 Skill Distribution")
-    all_skills = []
-    for f in filtered["file"].tolist():
-        det = load_resume_details(f)
-        if det:
-            skills = det.get("skills", [])
-            if isinstance(skills, list):
-                all_skills.extend(skills)
-
-    if all_skills:
-        skills_df = pd.Series(all_skills).value_counts().reset_index()
-        skills_df.columns = ["Skill", "Count"]
+    skills_df = skill_counts(filters).sort_values(ascending=False)
+
+    if not skills_df.empty:
+        skills_df = skills_df.rename_axis("Skill").reset_index(name="Count")
         st.bar_chart(skills_df.set_index("Skill"))
     else:
         st.info("No skills extracted to display.")
+
+# Set RESUME_SCREEN_PROFILE=1 before `streamlit run` to record loader timings; the file accumulates across reruns
+if instrument.is_enabled():
+    instrument.dump_json(os.path.join(instrument.PROFILE_DIR, "dashboard.json"), {"entry": "dashboard"})
+    instrument.dump_collapsed(os.path.join(instrument.PROFILE_DIR, "dashboard.collapsed"))
@@ -0,0 +1,93 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from scoring import align_rows
+
+TOP_TERMS = 8 #contributing TF-IDF terms kept per candidate
+EXPLANATION_COLUMNS = ("top_terms", "term_weights", "matched_skills", "missing_skills", "experience_delta")
+
+
+def top_term_contributions(matrix, q, k: int = TOP_TERMS,
+                           exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The k terms adding most to each row's cosine similarity with q, skipping
+    the term ids where the boolean mask exclude is set.
+
+    matrix.multiply(q) is the elementwise product of every resume vector with the
+    JD vector: it keeps only the terms both share, and row i sums to the
+    similarity of resume i. One lexsort then orders every row's terms at once.
+    Returns (offsets, term ids, contributions), where row i's terms are
+    ids[offsets[i]:offsets[i + 1]], largest first.
+    """
+    if exclude is not None: #zeroing them in q drops them from every row at once
+        q = sparse.csr_matrix(q, copy=True)
+        q.data[exclude[q.indices]] = 0
+    contrib = sparse.csr_matrix(matrix.multiply(q), dtype=np.float32)
+    contrib.eliminate_zeros()
+    counts = np.diff(contrib.indptr)
+    rows = np.repeat(np.arange(contrib.shape[0]), counts)
+    order = np.lexsort((-contrib.data, rows)) #by row, then by contribution descending
+    rank = np.arange(len(order)) - contrib.indptr[rows] #position within the row (rows is already sorted)
+    keep = order[rank < k]
+    offsets = np.concatenate([[0], np.cumsum(np.minimum(counts, k))])
+    return offsets, contrib.indices[keep], contrib.data[keep]
+
+
+def skill_matches(rows: np.ndarray, store, jd_skills: Sequence[str]) -> Tuple[List[List[str]], List[List[str]]]:
+    """JD skills each candidate (feature store row, -1 if absent) has and lacks.
+
+    Candidates missing from the store, and JD skills outside its vocabulary,
+    count as missing.
+    """
+    n = len(rows)
+    jd_skills = sorted(set(jd_skills))
+    if store is None or not jd_skills:
+        return [[] for _ in range(n)], [list(jd_skills) for _ in range(n)]
+    ids = store.skill_ids(jd_skills)
+    names = [store.vocabulary[i] for i in ids]
+    unknown = sorted(set(jd_skills) - set(names))
+    known = rows >= 0
+    has = np.zeros((n, len(ids)), dtype=bool) #candidates x JD skills, small and dense
+    if len(ids) and known.any():
+        has[known] = store.skills[rows[known]][:, ids].toarray() > 0
+    matched = [[names[j] for j in np.flatnonzero(h)] for h in has]
+    missing = [[names[j] for j in np.flatnonzero(~h)] + unknown for h in has]
+    return matched, missing
+
+
+def stop_word_mask(feature_names: np.ndarray) -> np.ndarray:
+    """True for the vocabulary terms that are English stop words ("and", "with", ...)."""
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+    return np.isin(feature_names, list(ENGLISH_STOP_WORDS))
+
+
+def explain_candidates(matrix, q, feature_names: np.ndarray, file_names: Sequence[str], store, profile,
+                       k: int = TOP_TERMS) -> Dict[str, List[Any]]:
+    """Explanation columns (EXPLANATION_COLUMNS), one entry per row of matrix / file name.
+
+    Computed in the ranking pass so readers only ever look them up:
+    top_terms/term_weights are the TF-IDF terms behind the text similarity
+    (stop words still count towards the score but are not shown),
+    matched_skills/missing_skills cover the JD's required and preferred skills,
+    and experience_delta is years of experience minus the JD minimum (None when
+    the JD states no minimum or the candidate is not in the feature store).
+    """
+    offsets, term_ids, weights = top_term_contributions(matrix, q, k, stop_word_mask(feature_names))
+    terms, weights = feature_names[term_ids].tolist(), weights.tolist()
+    spans = list(zip(offsets[:-1].tolist(), offsets[1:].tolist()))
+    rows = align_rows(store, file_names) if store is not None else np.full(len(file_names), -1, dtype=np.int64)
+    matched, missing = skill_matches(rows, store, list(profile.required) + list(profile.preferred))
+
+    delta: List[Optional[float]] = [None] * len(file_names)
+    if profile.min_years and store is not None:
+        years = np.asarray(store.years_experience, dtype=np.float32)
+        delta = [None if r < 0 else round(float(years[r]) - profile.min_years, 1) for r in rows.tolist()]
+    return {
+        "top_terms": [terms[a:b] for a, b in spans],
+        "term_weights": [weights[a:b] for a, b in spans],
+        "matched_skills": matched,
+        "missing_skills": missing,
+        "experience_delta": delta,
+    }
@@ -1,16 +1,15 @@
 import os
 import json
 from typing import Dict, Any, List
-import pandas as pd
 from utils import SALESFORCE_SKILLS
+from feature_store import build_feature_store, save_feature_store
+import instrument
 
 PARSED_DIR = os.path.join("data", "parsed") #directory where parsed resumes are stored
 OUTPUT_DIR = os.path.join("data", "features") #directory where extracted features will be stored
 
-os.makedirs(OUTPUT_DIR, exist_ok=True) #make output directory if it doesn't exist
-
-def load_parsed_resumes() -> List[Dict[str, Any]]: #load parsed resumes from JSON file
-    path = os.path.join(PARSED_DIR, "all_parsed.json") #path to the JSON file
+def load_parsed_resumes(parsed_dir: str = PARSED_DIR) -> List[Dict[str, Any]]: #load parsed resumes from JSON file
+    path = os.path.join(parsed_dir, "all_parsed.json") #path to the JSON file
     if not os.path.exists(path): #check if the file exists
         raise FileNotFoundError("Run parse_resumes.py first to generate parsed resumes.") #raise error if file doesn't exist
     with open(path, "r", encoding="utf-8") as f: #open the file for reading
@@ -33,22 +32,37 @@ def build_feature_vector(parsed: Dict[str, Any]) -> Dict[str, Any]:
 
     return features #return the feature dictionary
 
+def build_metadata_frame(store) -> "pd.DataFrame":
+    """Per-resume metadata columns only; skills live in the sparse store."""
+    import pandas as pd
+
+    return pd.DataFrame({column: store.metadata[column] for column in ("file_name", "name", "email", "phone", "years_experience")})
+
 def main():
-    parsed_resumes = load_parsed_resumes() #load parsed resumes
-    feature_vectors = [build_feature_vector(r) for r in parsed_resumes] #build feature vectors for each parsed resume
+    import argparse
 
-    df = pd.DataFrame(feature_vectors) #create a DataFrame from the feature vectors
+    parser = argparse.ArgumentParser(description="Extract resume features into the sparse feature store.")
+    parser.add_argument("--parsed_dir", type=str, default=PARSED_DIR, help="Directory containing all_parsed.json.")
+    parser.add_argument("--output_dir", type=str, default=OUTPUT_DIR, help="Directory to write the feature store.")
+    instrument.add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.profile is not None:
+        instrument.enable(slowest=args.profile)
 
-    # Save as CSV + JSON
-    csv_path = os.path.join(OUTPUT_DIR, "resume_features.csv") #path to save CSV file
-    json_path = os.path.join(OUTPUT_DIR, "resume_features.json") #path to save JSON file
+    parsed_resumes = load_parsed_resumes(args.parsed_dir) #load parsed resumes
+    store = build_feature_store(parsed_resumes) #binary skill matrix + metadata columns
+    save_feature_store(store, args.output_dir) #raw .npy arrays, memory-mappable
 
-    df.to_csv(csv_path, index=False) #save DataFrame as CSV
-    df.to_json(json_path, orient="records", indent=2) #save DataFrame as JSON
+    # Metadata CSV (no per-skill columns) for the ranking join and quick inspection
+    csv_path = os.path.join(args.output_dir, "resume_features.csv") #path to save CSV file
+    build_metadata_frame(store).to_csv(csv_path, index=False) #save DataFrame as CSV
 
-    print(f"Features extracted for {len(df)} resumes")
+    print(f"Features extracted for {len(store)} resumes ({store.skills.nnz} skill entries, {len(store.vocabulary)} skills)")
+    print(f"Saved feature store: {args.output_dir}")
     print(f"Saved CSV: {csv_path}")
-    print(f"Saved JSON: {json_path}")
+    if args.profile is not None:
+        instrument.memory("after features")
+        instrument.finish("feature_extraction", args.profile_dir)
 
 if __name__ == "__main__":
     main()
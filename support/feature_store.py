@@ -0,0 +1,211 @@
+import os
+import json
+import time
+from typing import Dict, Any, List, Iterable, Optional
+import numpy as np
+from scipy import sparse
+from utils import SALESFORCE_SKILLS
+from instrument import timed
+
+FEATURES_DIR = os.path.join("data", "features") #directory where the feature store is written
+
+META_FILE = "store.json"
+INDPTR_FILE = "skills_indptr.npy"
+INDICES_FILE = "skills_indices.npy"
+METADATA_COLUMNS = ("file_name", "name", "email", "phone") #string columns, one .npy each
+YEARS_FILE = "years_experience.npy"
+GENERATION_PREFIX = "gen-" #one directory of arrays per save; store.json names the current one
+
+
+class FeatureStore:
+    """Binary skill matrix (CSR, resumes x skills) plus a columnar metadata table.
+
+    Row i of the skill matrix and element i of every metadata column describe the
+    same resume. Skill queries are sparse column slices and row sums rather than
+    scans over one DataFrame column per skill.
+    """
+
+    def __init__(self, skills, vocabulary: List[str], metadata: Dict[str, np.ndarray]):
+        self.skills = sparse.csr_matrix(skills)
+        self.vocabulary = list(vocabulary)
+        self.metadata = metadata
+        self._skill_ids = {s: i for i, s in enumerate(self.vocabulary)}
+        self._rows = None
+
+    def __len__(self) -> int:
+        return self.skills.shape[0]
+
+    @property
+    def file_names(self) -> np.ndarray:
+        return self.metadata["file_name"]
+
+    @property
+    def years_experience(self) -> np.ndarray:
+        return self.metadata["years_experience"]
+
+    def row(self, file_name: str) -> Optional[int]:
+        if self._rows is None:
+            self._rows = {name: i for i, name in enumerate(self.file_names.tolist())}
+        return self._rows.get(file_name)
+
+    def skill_ids(self, skills: Iterable[str]) -> np.ndarray:
+        """Column ids of the given skills; skills outside the vocabulary are ignored."""
+        ids = {self._skill_ids[s] for s in skills if s in self._skill_ids}
+        return np.fromiter(sorted(ids), dtype=np.int32, count=len(ids))
+
+    def skill_vector(self, skills: Iterable[str]) -> np.ndarray:
+        vec = np.zeros(len(self.vocabulary), dtype=np.float32)
+        vec[self.skill_ids(skills)] = 1.0
+        return vec
+
+    def skill_overlap(self, skills: Iterable[str]) -> np.ndarray:
+        """Number of the given skills each resume has (one sparse mat-vec)."""
+        return self.skills @ self.skill_vector(skills)
+
+    def has_all_skills(self, skills: Iterable[str]) -> np.ndarray:
+        skills = set(skills)
+        ids = self.skill_ids(skills)
+        if len(ids) < len(skills): #a required skill nobody in the vocabulary can have
+            return np.zeros(len(self), dtype=bool)
+        return np.asarray(self.skills[:, ids].sum(axis=1)).ravel() == len(ids)
+
+    def filter(self, required_skills: Iterable[str] = (), min_years: Optional[float] = None) -> np.ndarray:
+        """Row indices of resumes having every required skill and at least min_years."""
+        mask = np.ones(len(self), dtype=bool)
+        required_skills = list(required_skills)
+        if required_skills:
+            mask &= self.has_all_skills(required_skills)
+        if min_years is not None:
+            mask &= self.years_experience >= min_years
+        return np.flatnonzero(mask)
+
+    def skill_counts(self, rows: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """How many of the selected resumes (default: all) have each skill."""
+        matrix = self.skills if rows is None else self.skills[rows]
+        counts = np.asarray(matrix.sum(axis=0)).ravel()
+        return {self.vocabulary[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+    def skills_of(self, row: int) -> List[str]:
+        start, end = self.skills.indptr[row], self.skills.indptr[row + 1]
+        return [self.vocabulary[i] for i in self.skills.indices[start:end]]
+
+    def upsert(self, parsed_resumes: List[Dict[str, Any]]) -> int:
+        """Append rows for new resumes and replace changed ones; only the given resumes are vectorized."""
+        if not parsed_resumes:
+            return 0
+        self.remove([r.get("file_name") for r in parsed_resumes])
+        batch = build_feature_store(parsed_resumes, self.vocabulary)
+        if len(batch.vocabulary) > len(self.vocabulary): #new skills are appended, so existing column ids stay valid
+            self.skills = sparse.csr_matrix((self.skills.data, self.skills.indices, self.skills.indptr),
+                                            shape=(len(self), len(batch.vocabulary)))
+            self.vocabulary = batch.vocabulary
+            self._skill_ids = {s: i for i, s in enumerate(self.vocabulary)}
+        self.skills = sparse.vstack([self.skills, batch.skills], format="csr")
+        self.metadata = {column: np.concatenate([self.metadata[column], batch.metadata[column]]) for column in self.metadata}
+        self._rows = None
+        return len(parsed_resumes)
+
+    def remove(self, file_names: Iterable[str]) -> int:
+        """Drop the given resumes. Returns how many were present."""
+        drop = {row for row in map(self.row, file_names) if row is not None}
+        if not drop:
+            return 0
+        keep = np.setdiff1d(np.arange(len(self)), np.fromiter(drop, dtype=np.int64, count=len(drop)))
+        self.skills = self.skills[keep]
+        self.metadata = {column: np.asarray(values)[keep] for column, values in self.metadata.items()}
+        self._rows = None
+        return len(drop)
+
+
+@timed()
+def build_feature_store(parsed_resumes: List[Dict[str, Any]], vocabulary: Optional[List[str]] = None) -> FeatureStore:
+    """Vectorize parsed resumes into a FeatureStore.
+
+    Skills found in resumes but missing from the vocabulary (e.g. from a custom
+    taxonomy) are appended so no extracted skill is dropped.
+    """
+    vocabulary = list(vocabulary or SALESFORCE_SKILLS)
+    extra = sorted({s for r in parsed_resumes for s in r.get("skills", []) or []} - set(vocabulary))
+    vocabulary += extra
+    skill_ids = {s: i for i, s in enumerate(vocabulary)}
+
+    indptr = np.zeros(len(parsed_resumes) + 1, dtype=np.int64)
+    indices = []
+    for i, r in enumerate(parsed_resumes):
+        ids = sorted({skill_ids[s] for s in r.get("skills", []) or []})
+        indices.extend(ids)
+        indptr[i + 1] = len(indices)
+    indices = np.asarray(indices, dtype=np.int32)
+    skills = sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                               shape=(len(parsed_resumes), len(vocabulary)))
+
+    contacts = [r.get("contacts") or {} for r in parsed_resumes]
+    metadata = {
+        "file_name": np.array([r.get("file_name") or "" for r in parsed_resumes], dtype=str),
+        "name": np.array([r.get("name") or "" for r in parsed_resumes], dtype=str),
+        "email": np.array([c.get("email") or "" for c in contacts], dtype=str),
+        "phone": np.array([c.get("phone") or "" for c in contacts], dtype=str),
+        "years_experience": np.array([r.get("years_experience") or 0 for r in parsed_resumes], dtype=np.float32),
+    }
+    return FeatureStore(skills, vocabulary, metadata)
+
+
+def _generation_dirs(out_dir: str) -> List[str]:
+    """Array directories written by save_feature_store, oldest first."""
+    if not os.path.isdir(out_dir):
+        return []
+    return sorted(name for name in os.listdir(out_dir)
+                  if name.startswith(GENERATION_PREFIX) and os.path.isdir(os.path.join(out_dir, name)))
+
+
+def save_feature_store(store: FeatureStore, out_dir: str = FEATURES_DIR) -> None:
+    """Write every array as a raw .npy so load_feature_store can memory-map it.
+
+    The arrays of one save go into a fresh generation directory; store.json names
+    the generation and is swapped in with os.replace last, so a reader always pairs
+    a store.json with the arrays written for it. The previous generation is kept
+    for readers that read store.json just before the swap; older ones are removed.
+    """
+    import shutil
+
+    os.makedirs(out_dir, exist_ok=True)
+    generation = f"{GENERATION_PREFIX}{time.time_ns():020d}" #sorts by time
+    gen_dir = os.path.join(out_dir, generation)
+    os.makedirs(gen_dir)
+    index_dtype = np.int32 if store.skills.nnz < np.iinfo(np.int32).max else np.int64 #scipy copies if the two differ
+    np.save(os.path.join(gen_dir, INDPTR_FILE), store.skills.indptr.astype(index_dtype))
+    np.save(os.path.join(gen_dir, INDICES_FILE), store.skills.indices.astype(index_dtype))
+    for column in METADATA_COLUMNS:
+        np.save(os.path.join(gen_dir, f"{column}.npy"), store.metadata[column])
+    np.save(os.path.join(gen_dir, YEARS_FILE), store.metadata["years_experience"])
+
+    meta_path = os.path.join(out_dir, META_FILE)
+    with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"generation": generation, "n_resumes": len(store), "vocabulary": store.vocabulary}, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+    for old in _generation_dirs(out_dir)[:-2]: #mapped files stay readable after removal on POSIX
+        shutil.rmtree(os.path.join(out_dir, old), ignore_errors=True)
+    for name in (INDPTR_FILE, INDICES_FILE, YEARS_FILE) + tuple(f"{c}.npy" for c in METADATA_COLUMNS):
+        if os.path.exists(os.path.join(out_dir, name)): #arrays of the flat layout used before generations
+            os.remove(os.path.join(out_dir, name))
+
+
+@timed()
+def load_feature_store(out_dir: str = FEATURES_DIR, mmap: bool = True) -> FeatureStore:
+    """Load a saved FeatureStore; with mmap the arrays are paged in on demand."""
+    mode = "r" if mmap else None
+    with open(os.path.join(out_dir, META_FILE), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    array_dir = os.path.join(out_dir, meta.get("generation", "")) #stores saved before generations keep arrays beside store.json
+    indptr = np.load(os.path.join(array_dir, INDPTR_FILE), mmap_mode=mode)
+    indices = np.load(os.path.join(array_dir, INDICES_FILE), mmap_mode=mode)
+    skills = sparse.csr_matrix((np.ones(len(indices), dtype=np.float32), indices, indptr),
+                               shape=(meta["n_resumes"], len(meta["vocabulary"])), copy=False)
+    metadata = {column: np.load(os.path.join(array_dir, f"{column}.npy"), mmap_mode=mode) for column in METADATA_COLUMNS}
+    metadata["years_experience"] = np.load(os.path.join(array_dir, YEARS_FILE), mmap_mode=mode)
+    return FeatureStore(skills, meta["vocabulary"], metadata)
+
+
+def feature_store_exists(out_dir: str = FEATURES_DIR) -> bool:
+    return os.path.exists(os.path.join(out_dir, META_FILE))
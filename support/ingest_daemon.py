@@ -0,0 +1,322 @@
+import os
+import json
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from parse_resume import (INPUT_DIR, OUTPUT_DIR, COMBINED_NAME, PARSER_VERSION, RESUME_EXTENSIONS,
+                          parse_resume, parse_resumes_batch, parsed_output_path, load_manifest, save_manifest,
+                          manifest_entry)
+from result_store import RESULTS_DIR, prune_runs
+import instrument
+from utils import file_sha256
+
+FEATURES_DIR = os.path.join("data", "features")
+JOB_DESCRIPTION = os.path.join("data", "job_description.txt")
+
+Snapshot = Dict[str, Tuple[int, int]] # file name -> (size, mtime_ns)
+
+
+def take_snapshot(resume_dir: str) -> Snapshot:
+    snap = {}
+    for entry in os.scandir(resume_dir):
+        if entry.is_file() and entry.name.lower().endswith(RESUME_EXTENSIONS):
+            st = entry.stat()
+            snap[entry.name] = (st.st_size, st.st_mtime_ns)
+    return snap
+
+
+def _hash_and_parse(path: str) -> Tuple[Dict[str, Any], Dict[str, Any], Optional[Dict[str, Any]]]: # runs in a worker process
+    st = os.stat(path) #before hashing, so a write during the parse shows up as a change next time
+    content_hash = file_sha256(path)
+    record = parse_resume(path, content_hash=content_hash)
+    return manifest_entry(content_hash, st), record, instrument.drain() if instrument.is_enabled() else None
+
+
+class IngestDaemon:
+    """Watches the resume folder and folds new, changed and deleted resumes into
+    the parsed output, feature store, TF-IDF index and results.
+
+    A poller diffs mtime snapshots and puts file events on a bounded asyncio queue;
+    when the queue is full the poller waits, which is the backpressure. Parser tasks
+    run parse_resume in a process pool and hand results to a single committer,
+    which applies them in batches: a batch writes its parsed JSON and upserts its
+    rows into the in-memory TF-IDF index and feature store, so its cost follows the
+    batch size. Publishing (saving the index and feature store and writing a new
+    result run) happens once the batches since the last publish have been applied,
+    at most every publish_interval seconds and never more often than publish_backoff
+    times its own last duration, so a growing corpus publishes less often instead
+    of spending all its time writing. Only resumes changed since the last publish
+    are re-scored; the rest keep their scores from memory.
+    """
+
+    def __init__(self, resume_dir: str = INPUT_DIR, parsed_dir: str = OUTPUT_DIR,
+                 features_dir: str = FEATURES_DIR, index_dir: Optional[str] = None,
+                 job_description: str = JOB_DESCRIPTION, results_dir: str = RESULTS_DIR,
+                 workers: Optional[int] = None, queue_size: int = 256, poll_interval: float = 1.0,
+                 batch_size: int = 64, batch_wait: float = 0.5, keep_runs: int = 20,
+                 scoring_config: Optional[str] = None, publish_interval: float = 5.0,
+                 publish_backoff: float = 4.0):
+        from resume_index import INDEX_DIR
+
+        self.resume_dir = resume_dir
+        self.parsed_dir = parsed_dir
+        self.features_dir = features_dir
+        self.index_dir = index_dir or INDEX_DIR
+        self.job_description = job_description
+        self.results_dir = results_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.keep_runs = keep_runs # every publish appends a run; older ones are pruned
+        self.scoring_config = scoring_config
+        self.publish_interval = publish_interval
+        self.publish_backoff = publish_backoff
+
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self.index = None
+        self.store = None
+        self.dirty = False # batches applied since the last publish
+        self.last_publish = float("-inf")
+        self.publish_seconds = 0.0 # duration of the last publish
+        self.scored: Dict[str, Dict[str, Any]] = {} # file name -> ranked row for score_key
+        self.unscored: Set[str] = set() # upserted since they were last scored
+        self.score_key: Optional[Tuple[str, str]] = None # JD text and scoring config the cached rows are for
+        self.score_config = (None, None) # ScoringConfig and JobProfile for score_key
+
+    # ---------- startup ----------
+    def catch_up(self) -> Snapshot:
+        """Incrementally parse whatever changed while the daemon was down, then load state."""
+        from feature_store import build_feature_store
+        from resume_index import load_or_build_index
+
+        parsed = parse_resumes_batch(self.resume_dir, self.parsed_dir, workers=self.workers)
+        self.records = {r.get("file_name"): r for r in parsed}
+        self.manifest = load_manifest(self.parsed_dir)
+        self.index = load_or_build_index(self._rankable(), self.index_dir)
+        self.store = build_feature_store(self._rankable())
+        self.publish()
+        return take_snapshot(self.resume_dir)
+
+    def _rankable(self) -> List[Dict[str, Any]]:
+        return [r for r in self.records.values() if "error" not in r]
+
+    # ---------- pipeline tasks ----------
+    async def poll(self, queue: asyncio.Queue, snapshot: Snapshot) -> None:
+        pending: Snapshot = {} # changed files seen once; queued when unchanged on the next poll
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = await asyncio.get_running_loop().run_in_executor(None, take_snapshot, self.resume_dir)
+
+            for name in snapshot.keys() - current.keys():
+                await queue.put(("delete", name))
+                pending.pop(name, None)
+            for name, stat in current.items():
+                if snapshot.get(name) == stat:
+                    continue
+                if pending.get(name) == stat: # stable across two polls, so the copy is complete
+                    await queue.put(("upsert", name)) # blocks while the queue is full
+                    pending.pop(name)
+                else:
+                    pending[name] = stat
+            pending = {name: stat for name, stat in pending.items() if name in current}
+            previous, snapshot = snapshot, {name: stat for name, stat in current.items() if name not in pending}
+            for name in pending: # keep the old entry so a pending file still shows up as changed next poll
+                if name in previous:
+                    snapshot[name] = previous[name]
+
+    async def parse_worker(self, queue: asyncio.Queue, done: asyncio.Queue, pool: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            kind, name = await queue.get()
+            try:
+                if kind == "delete":
+                    await done.put(("delete", name, None, None))
+                    continue
+                path = os.path.join(self.resume_dir, name)
+                try:
+                    entry, record, stats = await loop.run_in_executor(pool, _hash_and_parse, path)
+                except FileNotFoundError: # deleted before we got to it; the poller reports the delete
+                    continue
+                except Exception as e: # unreadable file (permissions, a directory), or the pool failed: skip it, keep watching
+                    print(f"⚠️ Skipped {name}: {type(e).__name__}: {e}")
+                    continue
+                if stats is not None:
+                    instrument.merge(stats)
+                known = self.manifest.get(name)
+                if known and known.get("sha256") == entry["sha256"] and known.get("parser_version") == PARSER_VERSION:
+                    continue # touched but not changed
+                await done.put(("upsert", name, entry, record))
+            finally:
+                queue.task_done()
+
+    def publish_due(self) -> Optional[float]:
+        """Seconds until unpublished batches should be published (None if there are none)."""
+        if not self.dirty:
+            return None
+        interval = max(self.publish_interval, self.publish_backoff * self.publish_seconds)
+        return max(0.0, self.last_publish + interval - time.monotonic())
+
+    async def committer(self, done: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                batch = [await asyncio.wait_for(done.get(), self.publish_due())] # None waits indefinitely
+            except asyncio.TimeoutError: # quiet since the last batch: publish what was applied
+                await loop.run_in_executor(None, self.publish)
+                continue
+            deadline = loop.time() + self.batch_wait
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(done.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            await loop.run_in_executor(None, self.commit, batch) # file and index I/O off the event loop
+            if self.publish_due() == 0.0:
+                await loop.run_in_executor(None, self.publish)
+
+    # ---------- state updates ----------
+    @instrument.timed("ingest.commit")
+    def commit(self, batch: List[Tuple[str, str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]) -> None:
+        start = time.perf_counter()
+        upserts, deletes = [], []
+        for kind, name, entry, record in batch:
+            if kind == "delete":
+                out_path = parsed_output_path(self.parsed_dir, name)
+                if os.path.exists(out_path):
+                    os.remove(out_path)
+                self.records.pop(name, None)
+                self.manifest.pop(name, None)
+                self.scored.pop(name, None)
+                deletes.append(name)
+            else:
+                with open(parsed_output_path(self.parsed_dir, name), "w", encoding="utf-8") as f:
+                    json.dump(record, f, indent=2)
+                self.records[name] = record
+                if "error" in record: #not recorded as parsed, so the next catch-up retries it
+                    self.manifest.pop(name, None)
+                    self.scored.pop(name, None)
+                    deletes.append(name)
+                else:
+                    self.manifest[name] = entry
+                    self.unscored.add(name)
+                    upserts.append(record)
+
+        self.index.remove(deletes)
+        self.index.upsert(upserts) # transforms only this batch with the fitted vocabulary
+        self.store.remove(deletes)
+        self.store.upsert(upserts)
+        self.dirty = True
+        instrument.count("ingest.upserts", len(upserts))
+        instrument.count("ingest.deletes", len(deletes))
+        instrument.memory("after commit")
+        print(f"Ingested {len(upserts)} new/changed, {len(deletes)} removed in {time.perf_counter() - start:.2f}s")
+
+    @instrument.timed("ingest.publish")
+    def publish(self) -> None:
+        """Save the index, feature store and combined parsed output, then write a new
+        result run; the dashboard picks it up by its id.
+
+        Only resumes upserted since the last publish go through rank_hybrid; the
+        rest reuse their cached rows unless the JD or scoring config changed. The
+        saved stores and the run itself are still rewritten in full.
+        """
+        from feature_store import save_feature_store
+        from feature_extraction import build_metadata_frame
+        from match_and_rank import read_job_description, jd_id_of, parsed_dir_stamp, save_ranked
+
+        start = time.perf_counter()
+        self.dirty, self.last_publish = False, time.monotonic()
+        self.index.source_stamp = parsed_dir_stamp(self.parsed_dir) # lets `match` reuse the saved index as is
+        self.index.save(self.index_dir)
+        save_feature_store(self.store, self.features_dir)
+        build_metadata_frame(self.store).to_csv(os.path.join(self.features_dir, "resume_features.csv"), index=False)
+        combined_path = os.path.join(self.parsed_dir, COMBINED_NAME)
+        with open(combined_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump([self.records[name] for name in sorted(self.records)], f)
+        os.replace(combined_path + ".tmp", combined_path)
+        save_manifest(self.parsed_dir, self.manifest) # after the combined output it vouches for; a crash before this re-parses
+
+        if os.path.exists(self.job_description) and len(self.index) > 0:
+            ranked = self.rank(read_job_description(self.job_description))
+            save_ranked(ranked, jd_id_of(self.job_description), self.results_dir, *self.score_config) # written atomically
+            prune_runs(self.keep_runs, self.results_dir)
+        self.publish_seconds = time.perf_counter() - start
+
+    def rank(self, jd_text: str) -> List[Dict[str, Any]]:
+        """Ranked rows for every indexed resume, best first; only rows not scored
+        for this JD and scoring config since their last upsert go through rank_hybrid."""
+        from match_and_rank import rank_hybrid
+        from scoring import ScoringConfig, extract_job_profile
+
+        config = ScoringConfig.load(self.scoring_config)
+        key = (jd_text, json.dumps(config.to_dict(), sort_keys=True))
+        if key != self.score_key: # new JD or weights: every cached row is stale
+            self.scored, self.score_key = {}, key
+            self.score_config = (config, extract_job_profile(jd_text))
+        rows = [i for i, name in enumerate(self.index.file_names) if name in self.unscored or name not in self.scored]
+        if rows:
+            for row in rank_hybrid(jd_text, self.index, self.store, *self.score_config, rows=rows):
+                self.scored[row["file_name"]] = row
+        self.unscored.clear()
+        instrument.count("ingest.rescored", len(rows))
+        return sorted((self.scored[name] for name in self.index.file_names), key=lambda r: r["score"], reverse=True)
+
+    async def run(self) -> None:
+        snapshot = self.catch_up()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        done: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        print(f"Watching {self.resume_dir} ({len(self.records)} resumes, {self.workers} parser processes)")
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=instrument.worker_init,
+                                 initargs=(instrument.is_enabled(), instrument.STATE.slowest)) as pool:
+            tasks = [asyncio.create_task(self.poll(queue, snapshot)),
+                     asyncio.create_task(self.committer(done))]
+            tasks += [asyncio.create_task(self.parse_worker(queue, done, pool)) for _ in range(self.workers)]
+            await asyncio.gather(*tasks)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Watch the resume folder and ingest new resumes continuously.")
+    parser.add_argument("--resume_dir", type=str, default=INPUT_DIR, help="Directory to watch for resumes.")
+    parser.add_argument("--parsed_dir", type=str, default=OUTPUT_DIR, help="Directory to write parsed JSON files.")
+    parser.add_argument("--features_dir", type=str, default=FEATURES_DIR, help="Directory of the feature store.")
+    parser.add_argument("--index_dir", type=str, default=None, help="Directory of the TF-IDF resume index.")
+    parser.add_argument("--job_description", type=str, default=JOB_DESCRIPTION, help="Job description to rank against.")
+    parser.add_argument("--results_dir", type=str, default=RESULTS_DIR, help="Result store the dashboard reads.")
+    parser.add_argument("--keep_runs", type=int, default=20, help="Most recent result runs to keep.")
+    parser.add_argument("--scoring_config", type=str, default=None, help="JSON file with scoring weights and bucket thresholds.")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count).")
+    parser.add_argument("--queue_size", type=int, default=256, help="Maximum queued files before the watcher waits.")
+    parser.add_argument("--poll_interval", type=float, default=1.0, help="Seconds between folder snapshots.")
+    parser.add_argument("--publish_interval", type=float, default=5.0, help="Minimum seconds between re-ranked result runs.")
+    parser.add_argument("--publish_backoff", type=float, default=4.0,
+                        help="Wait at least this many times the last publish's duration before the next one.")
+    instrument.add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.profile is not None:
+        instrument.enable(slowest=args.profile)
+
+    daemon = IngestDaemon(args.resume_dir, args.parsed_dir, args.features_dir, args.index_dir,
+                          args.job_description, args.results_dir, workers=args.workers,
+                          queue_size=args.queue_size, poll_interval=args.poll_interval, keep_runs=args.keep_runs,
+                          scoring_config=args.scoring_config, publish_interval=args.publish_interval,
+                          publish_backoff=args.publish_backoff)
+    try:
+        asyncio.run(daemon.run())
+    except KeyboardInterrupt:
+        print("Stopped.")
+    if args.profile is not None: # covers everything ingested until the daemon was stopped
+        from parse_resume import reprofile_parse
+        instrument.finish("ingest_daemon", args.profile_dir, reprofile=reprofile_parse)
+
+if __name__ == "__main__":
+    main()
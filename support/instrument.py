@@ -0,0 +1,242 @@
+import os
+import json
+import time
+import heapq
+import threading
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional
+
+ENV_VAR = "RESUME_SCREEN_PROFILE" #set to 1 to instrument processes without a --profile flag (e.g. the dashboard)
+PROFILE_DIR = os.path.join("data", "profile")
+
+
+class _State:
+    """Process-wide instrumentation data.
+
+    Everything is off unless enable() is called (or ENV_VAR is set); a disabled
+    timer is one attribute check before calling straight through.
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+        self.slowest = 10 #documents kept for cProfile re-runs
+        self.reset()
+
+    def reset(self) -> None:
+        self.timers: Dict[str, List[float]] = {} #name -> [calls, total seconds, max seconds]
+        self.stacks: Dict[str, float] = {} #"outer;inner" -> self seconds, for flamegraphs
+        self.counters: Dict[str, int] = {}
+        self.memory: List[Dict[str, Any]] = []
+        self.docs: List[tuple] = [] #min-heap of (seconds, doc id) holding the slowest documents
+
+
+STATE = _State()
+_local = threading.local() #span stack per thread
+
+
+def enable(slowest: int = 10) -> None:
+    STATE.enabled = True
+    STATE.slowest = slowest
+
+
+def disable() -> None:
+    STATE.enabled = False
+
+
+def is_enabled() -> bool:
+    return STATE.enabled
+
+
+def current_rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError): # no procfs (macOS, Windows)
+        return None
+
+
+# -------------------- RECORDING --------------------
+class span:
+    """Time a block: `with span("name"): ...`. Nested spans build the flamegraph stacks."""
+
+    __slots__ = ("name", "frame")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.frame = None
+
+    def __enter__(self):
+        if STATE.enabled:
+            stack = getattr(_local, "stack", None)
+            if stack is None:
+                stack = _local.stack = []
+            self.frame = [self.name, time.perf_counter(), 0.0] #name, start, time spent in child spans
+            stack.append(self.frame)
+        return self
+
+    def __exit__(self, *exc):
+        frame = self.frame
+        if frame is None:
+            return False
+        self.frame = None
+        elapsed = time.perf_counter() - frame[1]
+        stack = _local.stack
+        key = ";".join(f[0] for f in stack)
+        stack.pop()
+        if stack:
+            stack[-1][2] += elapsed
+
+        timer = STATE.timers.get(self.name)
+        if timer is None:
+            STATE.timers[self.name] = [1, elapsed, elapsed]
+        else:
+            timer[0] += 1
+            timer[1] += elapsed
+            timer[2] = max(timer[2], elapsed)
+        STATE.stacks[key] = STATE.stacks.get(key, 0.0) + elapsed - frame[2]
+        return False
+
+
+def timed(name: Optional[str] = None, per_document: bool = False):
+    """Decorator form of span. per_document=True also records the first argument
+    (a file path) with its duration so the slowest documents can be re-profiled."""
+    def decorator(fn: Callable) -> Callable:
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not STATE.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            with span(label):
+                result = fn(*args, **kwargs)
+            if per_document and args:
+                record_document(str(args[0]), time.perf_counter() - start)
+            return result
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1) -> None:
+    if STATE.enabled:
+        STATE.counters[name] = STATE.counters.get(name, 0) + n
+
+
+def memory(label: str) -> None:
+    """Snapshot current and peak RSS with a label (e.g. after a pipeline stage)."""
+    if STATE.enabled:
+        from utils import peak_rss_mb
+
+        STATE.memory.append({"label": label, "time": time.time(), "pid": os.getpid(),
+                             "rss_mb": current_rss_mb(), "peak_rss_mb": peak_rss_mb()})
+
+
+def record_document(doc_id: str, seconds: float) -> None:
+    if STATE.slowest <= 0:
+        return
+    if len(STATE.docs) < STATE.slowest:
+        heapq.heappush(STATE.docs, (seconds, doc_id))
+    elif seconds > STATE.docs[0][0]:
+        heapq.heapreplace(STATE.docs, (seconds, doc_id))
+
+
+def slowest_documents() -> List[tuple]:
+    return sorted(STATE.docs, reverse=True)
+
+
+# -------------------- EXPORT / MERGE --------------------
+def export() -> Dict[str, Any]:
+    timers = {name: {"calls": int(calls), "total_s": total, "mean_ms": total / calls * 1000, "max_ms": peak * 1000}
+              for name, (calls, total, peak) in sorted(STATE.timers.items(), key=lambda kv: -kv[1][1])}
+    return {
+        "timers": timers,
+        "counters": dict(STATE.counters),
+        "memory": list(STATE.memory),
+        "stacks": dict(STATE.stacks),
+        "slowest_documents": [{"document": doc, "seconds": secs} for secs, doc in slowest_documents()],
+    }
+
+
+def drain() -> Dict[str, Any]:
+    """Export and clear; pool workers return this with each result for the parent to merge."""
+    data = export()
+    STATE.reset()
+    return data
+
+
+def merge(data: Dict[str, Any]) -> None:
+    for name, t in data.get("timers", {}).items():
+        timer = STATE.timers.setdefault(name, [0, 0.0, 0.0])
+        timer[0] += t["calls"]
+        timer[1] += t["total_s"]
+        timer[2] = max(timer[2], t["max_ms"] / 1000)
+    for key, secs in data.get("stacks", {}).items():
+        STATE.stacks[key] = STATE.stacks.get(key, 0.0) + secs
+    for name, n in data.get("counters", {}).items():
+        STATE.counters[name] = STATE.counters.get(name, 0) + n
+    STATE.memory.extend(data.get("memory", []))
+    for d in data.get("slowest_documents", []):
+        record_document(d["document"], d["seconds"])
+
+
+def worker_init(enabled: bool, slowest: int) -> None:
+    """ProcessPoolExecutor initializer carrying the parent's settings into workers."""
+    STATE.enabled = enabled
+    STATE.slowest = slowest
+
+
+def dump_json(path: str, extra: Optional[Dict[str, Any]] = None) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**export(), **(extra or {})}, f, indent=2)
+
+
+def dump_collapsed(path: str) -> None:
+    """Collapsed-stack lines ("outer;inner microseconds") for flamegraph.pl, speedscope or inferno."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for key, secs in sorted(STATE.stacks.items()):
+            if secs > 0:
+                f.write(f"{key} {int(secs * 1_000_000)}\n")
+
+
+def profile_documents(func: Callable[[str], Any], docs: List[str], prefix: str, top: int = 15) -> List[Dict[str, Any]]:
+    """Re-run func on each document under cProfile; writes <prefix>-slow<i>.prof and returns summaries."""
+    import cProfile
+    import io
+    import pstats
+
+    was_enabled, STATE.enabled = STATE.enabled, False # keep the re-runs out of the timers
+    summaries = []
+    try:
+        for i, doc in enumerate(docs, 1):
+            prof = cProfile.Profile()
+            prof.runcall(func, doc)
+            prof_path = f"{prefix}-slow{i}.prof"
+            prof.dump_stats(prof_path)
+            out = io.StringIO()
+            pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(top)
+            summaries.append({"document": doc, "prof_file": prof_path, "top_cumulative": out.getvalue()})
+    finally:
+        STATE.enabled = was_enabled
+    return summaries
+
+
+def finish(entry: str, out_dir: str = PROFILE_DIR, reprofile: Optional[Callable[[str], Any]] = None) -> str:
+    """Write this run's profile as <entry>-<time>.json and .collapsed; with reprofile,
+    cProfile the slowest recorded documents first. Returns the JSON path."""
+    prefix = os.path.join(out_dir, f"{entry}-{time.strftime('%Y%m%dT%H%M%S')}")
+    os.makedirs(out_dir, exist_ok=True)
+    extra = {"entry": entry}
+    if reprofile is not None and STATE.docs:
+        extra["cprofile"] = profile_documents(reprofile, [doc for _, doc in slowest_documents()], prefix)
+    dump_json(prefix + ".json", extra)
+    dump_collapsed(prefix + ".collapsed")
+    print(f"Profile saved to {prefix}.json (flamegraph stacks: {prefix}.collapsed)")
+    return prefix + ".json"
+
+
+def add_profile_arguments(parser) -> None:
+    parser.add_argument("--profile", type=int, nargs="?", const=10, default=None, metavar="N",
+                        help="Record timers, counters and memory, and cProfile the N slowest documents (default 10).")
+    parser.add_argument("--profile_dir", type=str, default=PROFILE_DIR, help="Where --profile writes its files.")
@@ -1,28 +1,128 @@
-import os, json, csv
-from typing import List, Dict
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity  
+import os, json, hashlib
+from typing import List, Dict, Tuple, Iterator, Iterable, Optional
+import numpy as np
+from resume_index import INDEX_DIR, ResumeIndex, load_or_build_index, load_vectorizer, resume_document
+from result_store import RESULTS_DIR, write_run
+from explain import EXPLANATION_COLUMNS, explain_candidates
+from sharded_index import SHARD_SIZE, ShardedIndex
+from scoring import BUCKETS, BUCKET_THRESHOLDS, COMPONENTS, ScoringConfig, bucketize_array, combine, extract_job_profile, score_components
+import instrument
+
+AGGREGATE_FILES = {'all_parsed.json'} # combined outputs in parsed_dir that are not single resumes
 
 def read_job_description(path: str) -> str:
     with open(path, 'r', encoding='utf-8') as f:
         return f.read()
 
-def load_parsed_texts(parsed_dir: str) -> List[Dict]:   # Load parsed JSON texts from a directory
-    rows = []
-    for fname in os.listdir(parsed_dir): # Iterate over files in the directory
-        if not fname.endswith('.json'): # Skip non-JSON files
+def load_job_descriptions(jd_dir: str) -> Tuple[List[str], List[str]]: # Load every .txt JD in a directory
+    jd_ids, texts = [], []
+    for fname in sorted(os.listdir(jd_dir)):
+        if not fname.endswith('.txt'):
             continue
-        with open(os.path.join(parsed_dir, fname), 'r', encoding='utf-8') as f: # Open each JSON file
-            rec = json.load(f) # Load JSON content
-        rows.append(rec) # Append the loaded record to the list
-    return rows  
+        jd_ids.append(os.path.splitext(fname)[0]) # JD id is the file name without extension
+        texts.append(read_job_description(os.path.join(jd_dir, fname)))
+    return jd_ids, texts
+
+def is_rankable(rec) -> bool: # Parsed resume that can be indexed: not an aggregate, not a failed parse
+    return isinstance(rec, dict) and 'error' not in rec
+
+def iter_parsed_records(parsed_dir: str) -> Iterator[Dict]: # Yield parsed resumes one file at a time
+    for entry in sorted(os.scandir(parsed_dir), key=lambda e: e.name): # Stable order across runs
+        if not entry.name.endswith('.json') or entry.name in AGGREGATE_FILES: # Skip non-JSON files and combined outputs
+            continue
+        with open(entry.path, 'r', encoding='utf-8') as f:
+            rec = json.load(f)
+        if is_rankable(rec):
+            yield rec
+
+def iter_parsed_texts(parsed_dir: str) -> Iterator[Tuple[str, str]]: # Yield (file_name, text to vectorize)
+    for rec in iter_parsed_records(parsed_dir):
+        yield rec.get('file_name'), resume_document(rec)
+
+def load_parsed_texts(parsed_dir: str) -> List[Dict]:   # Load parsed JSON texts from a directory
+    return list(iter_parsed_records(parsed_dir))
+
+def parsed_dir_stamp(parsed_dir: str) -> str: # Digest of every parsed resume's name, size and mtime; stats only, nothing is read
+    h = hashlib.sha1()
+    for entry in sorted(os.scandir(parsed_dir), key=lambda e: e.name):
+        if entry.name.endswith('.json') and entry.name not in AGGREGATE_FILES:
+            st = entry.stat()
+            h.update(f"{entry.name}:{st.st_size}:{st.st_mtime_ns}\n".encode('utf-8'))
+    return h.hexdigest()
+
+def load_index_for(parsed_dir: str, index_dir: str = INDEX_DIR, rebuild: bool = False) -> Optional[ResumeIndex]:
+    """The index of the resumes in parsed_dir, or None if there are none.
+
+    When the parsed files are unchanged since the index was last synced (same
+    parsed_dir_stamp), the saved index is returned without reading a single
+    resume; otherwise the resumes are loaded and only changed ones re-vectorized.
+    """
+    stamp = parsed_dir_stamp(parsed_dir)
+    if not rebuild and ResumeIndex.exists(index_dir):
+        index = ResumeIndex.load(index_dir)
+        if index.source_stamp == stamp:
+            return index if len(index) else None
+    resumes = load_parsed_texts(parsed_dir)
+    if not resumes:
+        return None
+    return load_or_build_index(resumes, index_dir, rebuild=rebuild, source_stamp=stamp)
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+@instrument.timed()
+def stream_similarity(jd_text: str, parsed_dir: str, vectorizer=None,
+                      chunk_size: int = 10000) -> Tuple[List[str], np.ndarray]:
+    """Score every parsed resume against the JD while holding one chunk of text at a time.
 
+    With a fitted vectorizer (e.g. from the persisted ResumeIndex) each chunk is just
+    transformed. Without one, a HashingVectorizer is used: a first pass counts document
+    frequencies into a fixed-size array, a second pass applies IDF, normalises and scores.
+    Memory is bounded by chunk_size and the hash space, not by the corpus size.
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+    from sklearn.preprocessing import normalize
+
+    names: List[str] = []
+    scores: List[np.ndarray] = []
+
+    if vectorizer is not None:
+        q = vectorizer.transform([jd_text])
+        for chunk in _chunks(iter_parsed_texts(parsed_dir), chunk_size):
+            names.extend(name for name, _ in chunk)
+            scores.append((vectorizer.transform([text for _, text in chunk]) @ q.T).toarray().ravel())
+    else:
+        hasher = HashingVectorizer(n_features=2 ** 20, alternate_sign=False, norm=None, dtype=np.float32)
+        df = np.zeros(hasher.n_features, dtype=np.int64)
+        n_docs = 0
+        for chunk in _chunks(iter_parsed_texts(parsed_dir), chunk_size):
+            counts = hasher.transform([text for _, text in chunk])
+            df += np.bincount(counts.indices, minlength=hasher.n_features) # every stored entry is a nonzero term
+            n_docs += len(chunk)
+        idf = (np.log((1 + n_docs) / (1 + df)) + 1).astype(np.float32) # same smoothing as TfidfVectorizer
+
+        q = normalize(hasher.transform([jd_text]).multiply(idf * (df > 0)).tocsr()) # drop JD terms no resume has, as a fitted vocabulary would
+        for chunk in _chunks(iter_parsed_texts(parsed_dir), chunk_size):
+            names.extend(name for name, _ in chunk)
+            docs = normalize(hasher.transform([text for _, text in chunk]).multiply(idf).tocsr())
+            scores.append((docs @ q.T).toarray().ravel())
+
+    return names, (np.concatenate(scores) if scores else np.empty(0)).astype(np.float32)
+
+@instrument.timed()
 def compute_similarity(jd_text, resumes):
     from sklearn.feature_extraction.text import TfidfVectorizer
     from sklearn.metrics.pairwise import cosine_similarity
 
     # Treat resumes as plain text
-    corpus = [jd_text] + [str(r) for r in resumes]
+    corpus = [jd_text] + [resume_document(r) for r in resumes]
 
     # TF-IDF Vectorization
     vectorizer = TfidfVectorizer()
@@ -32,75 +132,278 @@ def compute_similarity(jd_text, resumes):
     similarities = cosine_similarity(tfidf[0:1], tfidf[1:]).flatten()
 
     results = []
-    for i, sim in enumerate(similarities):
+    for i, (r, sim) in enumerate(zip(resumes, similarities)):
         results.append({
             "resume_index": i,
+            "file_name": r.get("file_name"),
             "similarity": float(sim)
         })
 
     return results
 
+@instrument.timed()
+def rank_with_index(jd_text, index):
+    """Score a job description against a prebuilt ResumeIndex (transform + one sparse product)."""
+    similarities = index.query(jd_text)
+    return [
+        {"resume_index": i, "file_name": name, "similarity": float(sim)}
+        for i, (name, sim) in enumerate(zip(index.file_names, similarities))
+    ]
+
+@instrument.timed()
+def rank_hybrid(jd_text, index, store, config: Optional[ScoringConfig] = None, profile=None,
+                rows: Optional[np.ndarray] = None):
+    """Score a job description with the weighted combination of text similarity,
+    required/preferred skill overlap and experience fit (see scoring.py).
+
+    Every component is computed for the whole corpus (or just the index rows
+    given) at once; rows carry the components so the score can be re-weighted
+    later without re-vectorizing, and the explanation fields (see explain.py)
+    the dashboard shows per candidate. A row's result depends only on that
+    resume, so scoring a subset matches the same rows of a full pass.
+    """
+    config = config or ScoringConfig()
+    profile = profile or extract_job_profile(jd_text)
+    matrix = index.matrix if rows is None else index.matrix[rows] # no copy of the whole matrix for a full pass
+    rows = np.arange(len(index)) if rows is None else np.asarray(rows, dtype=np.int64)
+    file_names = [index.file_names[i] for i in rows.tolist()]
+    q = index.transform_query(jd_text)
+    similarity = np.asarray((matrix @ q.T).todense()).ravel()
+    components = score_components(similarity, file_names, store, profile)
+    scores = combine(components, config.weights)
+    buckets = bucketize_array(scores, config.thresholds)
+    explanations = explain_candidates(matrix, q, index.vectorizer.get_feature_names_out(), file_names, store, profile)
+    return [
+        {"resume_index": int(row), "file_name": name, "score": float(scores[i]),
+         **{c: float(components[i, j]) for j, c in enumerate(COMPONENTS)}, "bucket": BUCKETS[buckets[i]],
+         **{c: explanations[c][i] for c in EXPLANATION_COLUMNS}}
+        for i, (row, name) in enumerate(zip(rows.tolist(), file_names))
+    ]
+
+def top_k_rows(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and values of the k best scores per row, best first.
+
+    argpartition selects the top k in O(M) per row; only those k get sorted.
+    """
+    k = min(k, scores.shape[1])
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+@instrument.timed()
+def rank_batch(jd_texts: List[str], index, top_k: int = 50, chunk_size: int = 64) -> Dict[str, np.ndarray]:
+    """Score N job descriptions against the whole index and keep the top k per JD.
+
+    JDs are processed in chunks so the dense score block stays at chunk_size x M.
+    Returns columnar arrays: jd, rank, resume (row in index.file_names), similarity.
+    """
+    jd_col, rank_col, resume_col, sim_col = [], [], [], []
+    for start in range(0, len(jd_texts), chunk_size):
+        block = index.query_batch(jd_texts[start:start + chunk_size]).toarray()
+        idx, vals = top_k_rows(block, top_k)
+        n, k = idx.shape
+        jd_col.append(np.repeat(np.arange(start, start + n, dtype=np.int32), k))
+        rank_col.append(np.tile(np.arange(1, k + 1, dtype=np.int32), n))
+        resume_col.append(idx.ravel().astype(np.int32))
+        sim_col.append(vals.ravel().astype(np.float32))
+
+    def cat(parts, dtype):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    return {
+        "jd": cat(jd_col, np.int32),
+        "rank": cat(rank_col, np.int32),
+        "resume": cat(resume_col, np.int32),
+        "similarity": cat(sim_col, np.float32),
+    }
+
+def save_batch_results(path: str, columns: Dict[str, np.ndarray], jd_ids: List[str], file_names: List[str]) -> None:
+    """Write batch results as typed columns plus the id dictionaries they index into."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez_compressed(path, jd_ids=np.array(jd_ids), file_names=np.array(file_names), **columns)
 
+def jd_id_of(path: str) -> str: # JD id is the file name without extension, as in load_job_descriptions
+    return os.path.splitext(os.path.basename(path))[0]
 
+def save_ranked(ranked: List[Dict], jd_id: str, results_dir: str = RESULTS_DIR,
+                config: Optional[ScoringConfig] = None, profile=None, mode: str = "full") -> str:
+    """Append ranked rows (best first) to the columnar result store as one run; returns the run id.
 
-def bucketize(score: float) -> str: # Categorize similarity score into buckets
-    if score >= 0.65:
-        return "Highly Relevant"
-    if score >= 0.45:
-        return "Moderate"
-    return "Irrelevant"     
+    Rows from rank_hybrid keep their score components and explanations; text-only rows are stored as similarity.
+    mode is "top_k" when only the best rows were scored, so the dashboard skips the run.
+    """
+    hybrid = bool(ranked) and "score" in ranked[0]
+    scores = np.array([r["score" if hybrid else "similarity"] for r in ranked], dtype=np.float32)
+    components = {c: np.array([r[c] for r in ranked], dtype=np.float32) for c in COMPONENTS} if hybrid else None
+    explanations = {c: [r[c] for r in ranked] for c in EXPLANATION_COLUMNS} if hybrid and "top_terms" in ranked[0] else None
+    metadata = {"jd_id": jd_id, "mode": mode, "scoring": config.to_dict() if config else None,
+                "job_profile": profile.to_dict() if profile else None}
+    return write_run([r["file_name"] for r in ranked], scores, jd_id, results_dir=results_dir, components=components,
+                     thresholds=config.thresholds if config else BUCKET_THRESHOLDS, metadata=metadata,
+                     explanations=explanations)
 
-def join_with_features(similarity_rows, features_csv):
+def save_batch_run(columns: Dict[str, np.ndarray], jd_ids: List[str], file_names: List[str],
+                   results_dir: str = RESULTS_DIR) -> str:
+    """Append rank_batch output to the result store, one run holding every JD."""
+    return write_run(np.asarray(file_names, dtype=object)[columns["resume"]], columns["similarity"],
+                     np.asarray(jd_ids, dtype=object)[columns["jd"]], ranks=columns["rank"], results_dir=results_dir,
+                     metadata={"jd_id": None, "mode": "batch"})
+
+def export_json(path: str, ranked: List[Dict]) -> None: # Compact JSON export; missing values are already null
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(ranked, f, allow_nan=False)
+
+def bucketize(score: float, thresholds=BUCKET_THRESHOLDS) -> str: # Categorize a score into buckets
+    return BUCKETS[bucketize_array(np.array([score]), thresholds)[0]]
+
+def report_key_mismatches(sim_keys, feature_keys, limit: int = 5, partial: bool = False) -> None: # Print resumes present on only one side of the join
+    for label, missing in (("without features", sim_keys.difference(feature_keys)),
+                           ("with features but no score", feature_keys.difference(sim_keys))):
+        if partial and label == "with features but no score": # only the top k were scored on purpose
+            continue
+        if len(missing):
+            sample = ", ".join(map(str, list(missing[:limit])))
+            print(f"⚠️ {len(missing)} resumes {label}: {sample}{' ...' if len(missing) > limit else ''}")
+
+@instrument.timed()
+def join_with_features(similarity_rows, features_csv, partial: bool = False):
+    """Merge similarity scores with the feature table on file_name and rank by similarity.
+
+    similarity_rows and features_csv may be lists of dicts / a CSV path or DataFrames.
+    Keys present on only one side are reported; scored resumes are always kept.
+    partial=True means similarity_rows is a top-k subset, so unscored features are expected.
+    """
     import pandas as pd
 
+    sim_df = similarity_rows if isinstance(similarity_rows, pd.DataFrame) else pd.DataFrame(similarity_rows)
     try:
-        features_df = pd.read_csv(features_csv)
+        features_df = features_csv if isinstance(features_csv, pd.DataFrame) else pd.read_csv(features_csv)
     except FileNotFoundError:
         print("⚠️ Features CSV not found, skipping join.")
-        return similarity_rows
+        features_df = None
 
-    results = []
-    for row in similarity_rows:
-        # Try matching on "file", else fallback to index
-        key = row.get('file', row['resume_index'])
+    if features_df is not None and ("file_name" not in sim_df.columns or "file_name" not in features_df.columns):
+        print("⚠️ file_name missing from similarity rows or features, skipping join.")
+        features_df = None
 
-        if 'file' in features_df.columns:
-            feature_row = features_df[features_df['file'] == key]
-        else:
-            feature_row = features_df.iloc[[row['resume_index']]] if row['resume_index'] < len(features_df) else None
+    if features_df is not None:
+        duplicated = features_df["file_name"].duplicated()
+        if duplicated.any():
+            print(f"⚠️ {int(duplicated.sum())} duplicate file_name rows in features, keeping the first.")
+            features_df = features_df[~duplicated]
+        report_key_mismatches(pd.Index(sim_df["file_name"]), pd.Index(features_df["file_name"]), partial=partial)
+        features_df = features_df.drop(columns=[c for c in features_df.columns if c != "file_name" and c in sim_df.columns])
+        sim_df = sim_df.merge(features_df, on="file_name", how="left", validate="many_to_one")
+
+    # Rank by the hybrid score when present, else by similarity
+    ranked = sim_df.sort_values("score" if "score" in sim_df.columns else "similarity", ascending=False, kind="stable")
+    ranked = ranked.astype(object).where(ranked.notna(), None) # NaN from unmatched rows is not valid JSON
+    return ranked.to_dict(orient="records")
+
+
+def rank_from_args(args) -> None:
+    """Run the ranking mode selected on the command line."""
+    if args.streaming and args.job_description:
+        jd_text = read_job_description(args.job_description)
+        vectorizer = load_vectorizer(args.index_dir) if ResumeIndex.exists(args.index_dir) else None # Pre-fit vocabulary if available, else hashing
+        names, scores = stream_similarity(jd_text, args.parsed_dir, vectorizer, chunk_size=args.chunk_size)
+        if not names:
+            print("No resumes found in the specified directory.")
+            exit(1)
+        idx, vals = top_k_rows(scores[None, :], args.top_k)
+        sim_rows = [{"resume_index": int(i), "file_name": names[i], "similarity": float(v)} for i, v in zip(idx[0], vals[0])]
+        ranked = join_with_features(sim_rows, args.features_csv, partial=True)
+        run_id = save_ranked(ranked, jd_id_of(args.job_description), args.results_dir, mode="top_k")
+        if args.output_json:
+            export_json(args.output_json, ranked)
+        print(f"Streaming ranking complete. {len(names)} resumes scored, top {len(ranked)} saved as run {run_id} in {args.results_dir}")
+        return
+
+    index = load_index_for(args.parsed_dir, args.index_dir, rebuild=args.rebuild_index) # Fit once, then only sync changed resumes
+    if index is None:
+        print("No resumes found in the specified directory.")
+        exit(1)
+
+    if args.jd_dir:
+        jd_ids, jd_texts = load_job_descriptions(args.jd_dir) # Read every job description
+        columns = rank_batch(jd_texts, index, top_k=args.top_k) # One sparse product per chunk of JDs
+        run_id = save_batch_run(columns, jd_ids, index.file_names, args.results_dir)
+        if args.output_npz:
+            save_batch_results(args.output_npz, columns, jd_ids, index.file_names)
+        print(f"Batch ranking complete. {len(jd_ids)} job descriptions x {len(index)} resumes, top {args.top_k} saved as run {run_id} in {args.results_dir}")
+        return
 
-        if feature_row is not None and not feature_row.empty:
-            merged = {**row, **feature_row.to_dict(orient="records")[0]}
+    jd_text = read_job_description(args.job_description) # Read job description text
+    if args.ann:
+        from ann_index import load_or_build_ivf
+
+        ivf = load_or_build_ivf(index, args.index_dir) # Rebuilt only when the indexed resumes change
+        rows, scores = ivf.search(index.matrix, index.transform_query(jd_text), args.top_k, args.nprobe)
+        sim_rows = [{"resume_index": int(i), "file_name": index.file_names[i], "similarity": float(v)} for i, v in zip(rows, scores)]
+        ranked = join_with_features(sim_rows, args.features_csv, partial=True)
+        config = profile = None
+        mode = "top_k"
+    elif args.sharded:
+        with ShardedIndex.sync(index, args.index_dir, args.shard_size, args.workers) as sharded: # Rewrites only shards whose resumes changed
+            hits = sharded.search(jd_text, args.top_k)
+        sim_rows = [{"resume_index": index.position(name), "file_name": name, "similarity": score} for score, name in hits]
+        ranked = join_with_features(sim_rows, args.features_csv, partial=True)
+        config = profile = None
+        mode = "top_k"
+    else:
+        from feature_store import feature_store_exists, load_feature_store
+
+        config, profile = ScoringConfig.load(args.scoring_config), extract_job_profile(jd_text)
+        if feature_store_exists(args.features_dir):
+            sim_rows = rank_hybrid(jd_text, index, load_feature_store(args.features_dir), config, profile) # Text + skills + experience
         else:
-            merged = row
+            print("⚠️ No feature store found, ranking on text similarity only.")
+            sim_rows, config, profile = rank_with_index(jd_text, index), None, None
+        ranked = join_with_features(sim_rows, args.features_csv) # Join with features and rank
+        mode = "full"
 
-        results.append(merged)
+    run_id = save_ranked(ranked, jd_id_of(args.job_description), args.results_dir, config, profile, mode) # Append to the columnar result store
+    if args.output_json:
+        export_json(args.output_json, ranked)
 
-    # Rank by similarity
-    results = sorted(results, key=lambda x: x['similarity'], reverse=True)
-    return results
+    print(f"Matching and ranking complete. Results saved as run {run_id} in {args.results_dir}")
 
 
-if __name__ == "__main__":
+def main():
     import argparse
 
     parser = argparse.ArgumentParser(description="Match and rank resumes against a job description.")
-    parser.add_argument("--job_description", type=str, required=True, help="Path to the job description text file.")
+    parser.add_argument("--job_description", type=str, help="Path to the job description text file.")
+    parser.add_argument("--jd_dir", type=str, help="Directory of job description .txt files to rank in one batch.")
+    parser.add_argument("--top_k", type=int, default=50, help="Resumes kept per job description in batch and streaming modes.")
+    parser.add_argument("--output_npz", type=str, default=None, help="Also write batch mode results to this .npz file.")
     parser.add_argument("--parsed_dir", type=str, default="data/parsed", help="Directory containing parsed resume JSON files.")
     parser.add_argument("--features_csv", type=str, default="data/features/resume_features.csv", help="Path to the CSV file with extracted features.")
-    parser.add_argument("--output_json", type=str, default="data/match_ranked.json", help="Output path for the ranked results JSON file.")
-
+    parser.add_argument("--features_dir", type=str, default="data/features", help="Feature store used for skill and experience scoring.")
+    parser.add_argument("--scoring_config", type=str, help="JSON file with scoring weights and bucket thresholds.")
+    parser.add_argument("--results_dir", type=str, default=RESULTS_DIR, help="Columnar result store each run is appended to.")
+    parser.add_argument("--output_json", type=str, default=None, help="Also export the ranked rows as JSON to this path.")
+    parser.add_argument("--index_dir", type=str, default=INDEX_DIR, help="Directory of the persisted TF-IDF resume index.")
+    parser.add_argument("--rebuild_index", action="store_true", help="Refit the TF-IDF index on the current corpus.")
+    parser.add_argument("--streaming", action="store_true", help="Score resumes chunk by chunk with bounded memory and keep the top_k.")
+    parser.add_argument("--chunk_size", type=int, default=10000, help="Resumes held in memory at once in streaming mode.")
+    parser.add_argument("--ann", action="store_true", help="Retrieve the top_k through the IVF cluster index instead of scoring every resume.")
+    parser.add_argument("--nprobe", type=int, default=8, help="Clusters searched per query in --ann mode.")
+    parser.add_argument("--sharded", action="store_true", help="Score index shards in a process pool and merge their top_k.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes used in --sharded mode (default: CPU count).")
+    parser.add_argument("--shard_size", type=int, default=SHARD_SIZE, help="Resumes per shard in --sharded mode.")
+    instrument.add_profile_arguments(parser)
     args = parser.parse_args()
+    if not args.job_description and not args.jd_dir:
+        parser.error("one of --job_description or --jd_dir is required")
+    if args.profile is not None:
+        instrument.enable(slowest=args.profile)
+    try:
+        rank_from_args(args)
+    finally: # also after exit() inside, so every mode writes its profile
+        if args.profile is not None:
+            instrument.finish("match_and_rank", args.profile_dir)
 
-    jd_text = read_job_description(args.job_description) # Read job description text
-    resumes = load_parsed_texts(args.parsed_dir) # Load parsed resume texts
-    sim_rows = compute_similarity(jd_text, resumes) # Compute similarity scores
-    ranked = join_with_features(sim_rows, args.features_csv) # Join with features and rank
-
-    with open(args.output_json, 'w', encoding='utf-8') as f: # Write results to output JSON file
-        json.dump(ranked, f, indent=2)
-
-    print(f"Matching and ranking complete. Results saved to {args.output_json}")
-    if not resumes:
-        print("No resumes found in the specified directory.")
-        exit(1)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -1,55 +1,204 @@
 import os
 import json
-from typing import Dict, Any
-from utils import (read_text_from_file, normalize_text, extract_contacts,
-                   guess_name, extract_years_experience, extract_skills)
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Dict, Any, List, Optional
+from utils import (read_text_from_file, Document, extract_fields, file_sha256,
+                   MAX_PAGES, MAX_CHARS, TEXT_CACHE_DIR)
+import instrument
 
 INPUT_DIR = os.path.join("data", "resumes") #directory where resumes are stored
 OUTPUT_DIR = os.path.join("data", "parsed") #directory where parsed resumes will be stored
+MANIFEST_NAME = ".manifest" #manifest of content hashes, no .json suffix so loaders never treat it as a resume
+COMBINED_NAME = "all_parsed.json" #combined output of every parsed resume
+RESUME_EXTENSIONS = (".pdf", ".docx", ".txt")
 
-os.makedirs(OUTPUT_DIR, exist_ok=True) #make output directory if it doesn't exist
+# Bump whenever parse_resume output changes so the manifest forces a re-parse
+PARSER_VERSION = "5"
 
-def parse_resume(file_path: str) -> Dict[str, Any]:
+@instrument.timed("parse_resume", per_document=True)
+def parse_resume(file_path: str, content_hash: Optional[str] = None, max_pages: Optional[int] = MAX_PAGES,
+                 max_chars: Optional[int] = MAX_CHARS, cache_dir: Optional[str] = TEXT_CACHE_DIR) -> Dict[str, Any]:
     """Extract structured data from a resume file."""
     try:
-        text = read_text_from_file(file_path) #read text from the resume file
-        text = normalize_text(text) #normalize the text
-
-        data = {
-            "file_name": os.path.basename(file_path), #just the file name, not full path
-            "name": guess_name(text), #guess the name from the text
-            "contacts": extract_contacts(text), #extract contacts from the text
-            "years_experience": extract_years_experience(text), #extract years of experience from the text
-            "skills": extract_skills(text), #extract skills from the text
-            "raw_text": text[:2000]  # keep only first 2k chars to avoid huge JSON
-        }
+        text = read_text_from_file(file_path, max_pages=max_pages, max_chars=max_chars,
+                                   cache_dir=cache_dir, content_hash=content_hash) #budgeted, cached text extraction
+        doc = Document(text) #normalize the text once
+
+        data = {"file_name": os.path.basename(file_path)} #just the file name, not full path
+        data.update(extract_fields(doc)) #name, contacts, years_experience, skills, education, certifications
+        data["raw_text"] = doc.text[:2000]  # keep only first 2k chars to avoid huge JSON
         return data
     except Exception as e:
+        instrument.count("parse_resume.errors")
         return {"file_name": os.path.basename(file_path), "error": str(e)}
 
-def main():
-    resumes = [f for f in os.listdir(INPUT_DIR) if f.lower().endswith((".pdf", ".docx", ".txt"))] #list of resume files in the input directory
-    all_parsed = [] #list to store all parsed resumes
+def _parse_and_drain(parse, path: str, content_hash: str): # pool worker: hand back its instrumentation too
+    return parse(path, content_hash), instrument.drain()
+
+def parsed_output_path(output_dir: str, file_name: str) -> str:
+    return os.path.join(output_dir, f"{os.path.splitext(file_name)[0]}.json") #Taking the file name without extension and adding .json
+
+def load_manifest(output_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Load the manifest mapping resume file name -> {sha256, parser_version, size, mtime_ns}."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("files", {})
+    except (ValueError, OSError):
+        return {} #corrupt manifest -> treat everything as new
+
+def save_manifest(output_dir: str, entries: Dict[str, Dict[str, Any]]) -> None:
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"parser_version": PARSER_VERSION, "files": entries}, f)
+    os.replace(tmp_path, path) #atomic swap so a crash never leaves a half-written manifest
+
+def load_combined(output_dir: str) -> Dict[str, Dict[str, Any]]:
+    """Previous combined output keyed by file name (empty if missing)."""
+    path = os.path.join(output_dir, COMBINED_NAME)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return {r.get("file_name"): r for r in json.load(f)}
+    except (ValueError, OSError):
+        return {}
+
+def manifest_entry(content_hash: str, st: os.stat_result) -> Dict[str, Any]:
+    """Manifest record of a successfully parsed file; size and mtime let the next run skip hashing it."""
+    return {"sha256": content_hash, "parser_version": PARSER_VERSION, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def plan_changes(input_dir: str, manifest: Dict[str, Dict[str, Any]]):
+    """Compare the resume folder against the manifest.
 
-    for resume in resumes:
-        path = os.path.join(INPUT_DIR, resume) #full path to the resume file
-        parsed = parse_resume(path) #parse the resume
+    Returns (to_parse, unchanged, deleted, hashes, stats) where hashes maps every
+    current file name to its content hash and stats to its os.stat result. Files
+    whose size and mtime match the manifest keep the recorded hash instead of
+    being read again.
+    """
+    resumes = sorted(f for f in os.listdir(input_dir) if f.lower().endswith(RESUME_EXTENSIONS)) #list of resume files in the input directory
+    stats = {name: os.stat(os.path.join(input_dir, name)) for name in resumes}
 
+    to_parse, unchanged, hashes = [], [], {}
+    for name in resumes:
+        entry = manifest.get(name)
+        st = stats[name]
+        if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            hashes[name] = entry["sha256"]
+        else:
+            hashes[name] = file_sha256(os.path.join(input_dir, name))
+        if entry and entry.get("sha256") == hashes[name] and entry.get("parser_version") == PARSER_VERSION:
+            unchanged.append(name)
+        else:
+            to_parse.append(name)
+    deleted = sorted(set(manifest) - set(resumes))
+    return to_parse, unchanged, deleted, hashes, stats
+
+def parse_resumes_batch(input_dir: str = INPUT_DIR, output_dir: str = OUTPUT_DIR,
+                        workers: Optional[int] = None, incremental: bool = True,
+                        max_pages: Optional[int] = MAX_PAGES, max_chars: Optional[int] = MAX_CHARS,
+                        cache_dir: Optional[str] = TEXT_CACHE_DIR) -> List[Dict[str, Any]]:
+    """Parse every resume in input_dir, skipping files whose content hash and parser
+    version match the manifest. Changed files are parsed in a process pool because
+    PDF layout is CPU-bound. Returns all parsed records, unchanged ones included.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    recorded = load_manifest(output_dir)
+    manifest = recorded if incremental else {}
+    to_parse, unchanged, deleted, hashes, stats = plan_changes(input_dir, manifest)
+    combined = load_combined(output_dir)
+    # Outputs of removed resumes go even on a full re-parse; the combined file also lists failed parses the manifest skips
+    deleted = sorted((set(deleted) | set(recorded) | set(combined)) - set(hashes))
+
+    # Unchanged files must already have their output; otherwise parse them again
+    for name in list(unchanged):
+        if name not in combined and not os.path.exists(parsed_output_path(output_dir, name)):
+            unchanged.remove(name)
+            to_parse.append(name)
+
+    paths = [os.path.join(input_dir, name) for name in to_parse]
+    content_hashes = [hashes[name] for name in to_parse]
+    parse = partial(parse_resume, max_pages=max_pages, max_chars=max_chars, cache_dir=cache_dir)
+    if len(paths) > 1 and workers != 1 and instrument.is_enabled():
+        with ProcessPoolExecutor(max_workers=workers, initializer=instrument.worker_init,
+                                 initargs=(True, instrument.STATE.slowest)) as pool:
+            parsed_list = []
+            for parsed, counters in pool.map(partial(_parse_and_drain, parse), paths, content_hashes):
+                parsed_list.append(parsed)
+                instrument.merge(counters)
+    elif len(paths) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed_list = list(pool.map(parse, paths, content_hashes, chunksize=max(1, len(paths) // 64)))
+    else:
+        parsed_list = [parse(p, h) for p, h in zip(paths, content_hashes)]
+
+    for name, parsed in zip(to_parse, parsed_list):
         # Save individual JSON
-        out_path = os.path.join(OUTPUT_DIR, f"{os.path.splitext(resume)[0]}.json") #Taking the file name without extension and adding .json
-        with open(out_path, "w", encoding="utf-8") as f:
+        with open(parsed_output_path(output_dir, name), "w", encoding="utf-8") as f:
             json.dump(parsed, f, indent=2)
+        combined[name] = parsed
+        if "error" in parsed: #left out of the manifest so the next run retries it
+            manifest.pop(name, None)
+        else:
+            manifest[name] = manifest_entry(hashes[name], stats[name])
+        print(f"Parsed: {name}")
+
+    # Drop output of resumes that were removed from the intake folder
+    for name in deleted:
+        out_path = parsed_output_path(output_dir, name)
+        if os.path.exists(out_path):
+            os.remove(out_path)
+        combined.pop(name, None)
+        manifest.pop(name, None)
+        print(f"Removed: {name}")
 
-        all_parsed.append(parsed)
-        print(f"Parsed: {resume}")
+    for name in unchanged:
+        manifest[name] = manifest_entry(hashes[name], stats[name]) #adds size/mtime to entries from older manifests
+        if name not in combined: #combined file lost or out of date, recover from the per-resume JSON
+            with open(parsed_output_path(output_dir, name), "r", encoding="utf-8") as f:
+                combined[name] = json.load(f)
+
+    all_parsed = [combined[name] for name in sorted(hashes)]
+    combined_path = os.path.join(output_dir, COMBINED_NAME)
+    if to_parse or deleted or set(combined) != set(hashes):
+        # Save combined JSON
+        with open(combined_path, "w", encoding="utf-8") as f:
+            json.dump(all_parsed, f, indent=2)
+    save_manifest(output_dir, manifest)
+
+    print(f"Parsing complete. {len(to_parse)} parsed, {len(unchanged)} unchanged, {len(deleted)} removed.")
+    return all_parsed
+
+def reprofile_parse(path: str) -> Dict[str, Any]: # uncached, so the profile shows the real extraction cost
+    return parse_resume(path, cache_dir=None)
+
+def main():
+    import argparse
 
-    # Save combined JSON
-    combined_path = os.path.join(OUTPUT_DIR, "all_parsed.json")
-    with open(combined_path, "w", encoding="utf-8") as f:
-        json.dump(all_parsed, f, indent=2)
+    parser = argparse.ArgumentParser(description="Parse resumes into structured JSON.")
+    parser.add_argument("--resume_dir", type=str, default=INPUT_DIR, help="Directory containing resume files.")
+    parser.add_argument("--output_dir", type=str, default=OUTPUT_DIR, help="Directory to write parsed JSON files.")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count, 1 = serial).")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and re-parse every resume.")
+    parser.add_argument("--max_pages", type=int, default=MAX_PAGES, help="PDF pages laid out per resume (0 = all).")
+    parser.add_argument("--max_chars", type=int, default=MAX_CHARS, help="Characters extracted per resume (0 = all).")
+    parser.add_argument("--text_cache", type=str, default=TEXT_CACHE_DIR, help="Extracted-text cache directory ('' disables).")
+    instrument.add_profile_arguments(parser)
+    args = parser.parse_args()
+    if args.profile is not None:
+        instrument.enable(slowest=args.profile)
 
-    print(f"Parsing complete. {len(all_parsed)} resumes processed.")
-    print(f"Results saved in: {OUTPUT_DIR}")
+    all_parsed = parse_resumes_batch(args.resume_dir, args.output_dir, workers=args.workers, incremental=not args.full,
+                                     max_pages=args.max_pages or None, max_chars=args.max_chars or None,
+                                     cache_dir=args.text_cache or None)
+    print(f"{len(all_parsed)} resumes in corpus.")
+    print(f"Results saved in: {args.output_dir}")
+    if args.profile is not None:
+        instrument.finish("parse_resume", args.profile_dir, reprofile=reprofile_parse)
 
 if __name__ == "__main__":
     main()
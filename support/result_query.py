@@ -0,0 +1,256 @@
+import os
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+QUERY_DB = os.path.join("data", "results.sqlite") #indexed copy of the ranked results for the dashboard
+DB_VERSION = "2" #bump when SCHEMA changes so existing databases are rebuilt
+
+SORT_COLUMNS = ("score", "similarity", "years_experience")
+SCORE_COLUMNS = ("similarity", "required_overlap", "preferred_overlap", "experience_fit") #scoring.COMPONENTS
+CANDIDATE_COLUMNS = ("file_name", "name", "email", "phone", "score") + SCORE_COLUMNS + ("years_experience",)
+
+SCHEMA = """
+CREATE TABLE candidates (
+    id INTEGER PRIMARY KEY,
+    file_name TEXT UNIQUE,
+    name TEXT,
+    email TEXT,
+    phone TEXT,
+    score REAL NOT NULL,
+    similarity REAL NOT NULL,
+    required_overlap REAL NOT NULL,
+    preferred_overlap REAL NOT NULL,
+    experience_fit REAL NOT NULL,
+    years_experience REAL NOT NULL
+);
+CREATE TABLE candidate_skills (
+    candidate INTEGER NOT NULL,
+    skill TEXT NOT NULL,
+    PRIMARY KEY (candidate, skill)
+) WITHOUT ROWID;
+CREATE TABLE explanations (
+    candidate INTEGER PRIMARY KEY,
+    data TEXT NOT NULL
+);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Created after the bulk insert, which is faster than maintaining them row by row
+INDEXES = """
+CREATE INDEX idx_candidates_score ON candidates (score, id);
+CREATE INDEX idx_candidates_similarity ON candidates (similarity, id);
+CREATE INDEX idx_candidates_years ON candidates (years_experience, id);
+"""
+
+
+def _clean(value):
+    if isinstance(value, float) and value != value: #NaN from pandas
+        return None
+    return value
+
+
+def _explanation(r: Dict[str, Any]) -> Optional[str]:
+    """Compact JSON of a row's explanation columns (explain.py), or None if the run has none."""
+    terms = r.get("top_terms")
+    if terms is None or isinstance(terms, float): #absent, or NaN from a batch run
+        return None
+    delta = _clean(r.get("experience_delta"))
+    return json.dumps({
+        "terms": [[t, round(float(w), 4)] for t, w in zip(list(terms), list(r.get("term_weights")))],
+        "matched": list(r.get("matched_skills")),
+        "missing": list(r.get("missing_skills")),
+        "experience_delta": None if delta is None else float(delta),
+    }, separators=(",", ":"))
+
+
+def build_result_db(results: Iterable[Dict[str, Any]], skills_by_file: Dict[str, List[str]],
+                    db_path: str = QUERY_DB, source_version: str = "") -> None:
+    """Write ranked results and their skills into a fresh SQLite file.
+
+    The file is built next to db_path and swapped in atomically so a running
+    dashboard never sees a half-built database.
+    """
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        rows, skill_rows, explanation_rows = [], [], []
+        for i, r in enumerate(results):
+            file_name = r.get("file_name")
+            similarity = float(_clean(r.get("similarity")) or 0.0)
+            rows.append((i, file_name, _clean(r.get("name")), _clean(r.get("email")), _clean(r.get("phone")),
+                         float(_clean(r.get("score")) or similarity), similarity,
+                         *(float(_clean(r.get(c)) or 0.0) for c in SCORE_COLUMNS[1:]), #null for text-only runs
+                         float(_clean(r.get("years_experience")) or 0.0)))
+            skill_rows.extend((i, skill) for skill in set(skills_by_file.get(file_name, [])))
+            explanation = _explanation(r)
+            if explanation is not None:
+                explanation_rows.append((i, explanation))
+        conn.executemany(f"INSERT INTO candidates VALUES ({', '.join('?' * (len(CANDIDATE_COLUMNS) + 1))})", rows)
+        conn.executemany("INSERT INTO candidate_skills VALUES (?, ?)", skill_rows)
+        conn.executemany("INSERT INTO explanations VALUES (?, ?)", explanation_rows)
+        conn.executescript(INDEXES)
+        conn.execute("INSERT INTO meta VALUES ('source_version', ?)", (source_version,))
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+def db_source_version(db_path: str = QUERY_DB) -> Optional[str]:
+    if not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(db_path)
+    try:
+        row = conn.execute("SELECT value FROM meta WHERE key = 'source_version'").fetchone()
+        return row[0] if row else None
+    except sqlite3.DatabaseError:
+        return None
+    finally:
+        conn.close()
+
+
+def ensure_result_db(results_dir: str, features_dir: str, db_path: str = QUERY_DB) -> bool:
+    """Rebuild db_path from the latest full run in the result store if a newer one exists
+    (or the features it is joined with changed); top-k and batch runs are skipped.
+
+    Only file_name, the score columns and the explanations are read from the run; contact
+    details, years of experience and skills come from the feature store, so no parsed
+    resume (raw text included) is loaded. Returns True if a rebuild happened.
+    """
+    from explain import EXPLANATION_COLUMNS
+    from result_store import latest_full_run, read_results, run_columns
+    from feature_store import META_FILE, feature_store_exists, load_feature_store
+
+    run_id = latest_full_run(results_dir) #top-k and batch runs would truncate the list or mix JDs
+    if run_id is None:
+        return False
+    version = ":".join([DB_VERSION, run_id] + [str(os.stat(p).st_mtime_ns) if os.path.exists(p) else "-"
+                                   for p in (os.path.join(features_dir, META_FILE),)])
+    if db_source_version(db_path) == version:
+        return False
+
+    stored = set(run_columns(run_id, results_dir))
+    columns = ("file_name", "score") + SCORE_COLUMNS + tuple(c for c in EXPLANATION_COLUMNS if c in stored)
+    frame = read_results(results_dir, columns=columns, run_id=run_id)
+    skills_by_file = {}
+    if feature_store_exists(features_dir):
+        import pandas as pd
+
+        store = load_feature_store(features_dir)
+        metadata = pd.DataFrame({column: store.metadata[column]
+                                 for column in ("file_name", "name", "email", "phone", "years_experience")})
+        frame = frame.merge(metadata.drop_duplicates("file_name"), on="file_name", how="left")
+        for name in frame["file_name"].tolist(): #CSR row slices, only for the resumes in the run
+            row = store.row(name)
+            if row is not None:
+                skills_by_file[name] = store.skills_of(row)
+    build_result_db(frame.to_dict(orient="records"), skills_by_file, db_path, source_version=version)
+    return True
+
+
+class ResultQuery:
+    """Filtered, sorted, paginated reads over the results database.
+
+    Pages use keyset pagination: each page returns a cursor (last sort value, id)
+    and the next page seeks past it through the sort index, so fetching page 1000
+    costs the same as page 1 regardless of how many candidates there are.
+    """
+
+    def __init__(self, db_path: str = QUERY_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def has_components(self) -> bool:
+        """False for runs ranked on text similarity alone, where re-weighting has nothing to mix."""
+        return self.conn.execute("SELECT EXISTS (SELECT 1 FROM candidates WHERE score != similarity "
+                                 "OR required_overlap != 0 OR experience_fit != 0)").fetchone()[0] == 1
+
+    @staticmethod
+    def score_expression(weights: Optional[Dict[str, float]]) -> str:
+        """SQL for the candidate score: the stored column, or the components re-weighted on the fly."""
+        if weights is None:
+            return "c.score"
+        total = sum(max(0.0, float(weights.get(c, 0.0))) for c in SCORE_COLUMNS) or 1.0
+        terms = [f"{max(0.0, float(weights.get(c, 0.0))) / total!r} * c.{c}" for c in SCORE_COLUMNS]
+        return f"({' + '.join(terms)})"
+
+    def _where(self, score_sql: str, min_score: Optional[float], max_score: Optional[float], min_years: Optional[float],
+               max_years: Optional[float], required_skills: Iterable[str]) -> Tuple[List[str], List[Any]]:
+        clauses, params = [], []
+        for column, op, value in ((score_sql, ">=", min_score), (score_sql, "<=", max_score),
+                                  ("c.years_experience", ">=", min_years), ("c.years_experience", "<=", max_years)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(value)
+        for skill in sorted(set(required_skills)):
+            # Primary-key lookup per visited candidate, so the sort index still drives the scan
+            clauses.append("EXISTS (SELECT 1 FROM candidate_skills s WHERE s.candidate = c.id AND s.skill = ?)")
+            params.append(skill)
+        return clauses, params
+
+    def page(self, min_score: Optional[float] = None, max_score: Optional[float] = None,
+             min_years: Optional[float] = None, max_years: Optional[float] = None,
+             required_skills: Iterable[str] = (), sort_by: str = "score", descending: bool = True,
+             page_size: int = 25, cursor: Optional[Tuple[float, int]] = None,
+             weights: Optional[Dict[str, float]] = None):
+        """One page of candidates plus the cursor for the next page (None on the last page).
+
+        weights re-weights the stored components instead of using the precomputed
+        score. That ordering cannot use the score index, so SQLite evaluates the
+        weighted sum for every matching row; this takes milliseconds even for
+        100k candidates.
+        """
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"sort_by must be one of {SORT_COLUMNS}")
+        score_sql = self.score_expression(weights)
+        sort_sql = score_sql if sort_by == "score" else f"c.{sort_by}"
+        clauses, params = self._where(score_sql, min_score, max_score, min_years, max_years, required_skills)
+        op, direction = ("<", "DESC") if descending else (">", "ASC")
+        if cursor is not None:
+            clauses.append(f"({sort_sql}, c.id) {op} (?, ?)")
+            params.extend(cursor)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        columns = ", ".join(f"{score_sql} AS score" if col == "score" else f"c.{col}" for col in CANDIDATE_COLUMNS)
+        sql = (f"SELECT c.id, {columns} FROM candidates c {where} "
+               f"ORDER BY {sort_sql} {direction}, c.id {direction} LIMIT ?")
+        rows = self.conn.execute(sql, params + [page_size + 1]).fetchall()
+
+        has_next = len(rows) > page_size
+        rows = [dict(r) for r in rows[:page_size]]
+        next_cursor = (rows[-1][sort_by], rows[-1]["id"]) if has_next else None
+        return rows, next_cursor
+
+    def skill_counts(self, min_score: Optional[float] = None, max_score: Optional[float] = None,
+                     min_years: Optional[float] = None, max_years: Optional[float] = None,
+                     required_skills: Iterable[str] = (), weights: Optional[Dict[str, float]] = None) -> List[Tuple[str, int]]:
+        """(skill, candidates having it) over every candidate matching the filters, most common first.
+
+        Aggregated in SQL, so the counts cover the whole filtered set rather than one page.
+        """
+        clauses, params = self._where(self.score_expression(weights), min_score, max_score, min_years, max_years,
+                                      required_skills)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        sql = (f"SELECT s.skill, COUNT(*) AS n FROM candidates c JOIN candidate_skills s ON s.candidate = c.id "
+               f"{where} GROUP BY s.skill ORDER BY n DESC, s.skill")
+        return [(skill, n) for skill, n in self.conn.execute(sql, params)]
+
+    def explanation(self, file_name: str) -> Optional[Dict[str, Any]]:
+        """Precomputed explanation of a candidate's score: two primary-key lookups, nothing recomputed."""
+        row = self.conn.execute("SELECT e.data FROM candidates c JOIN explanations e ON e.candidate = c.id "
+                                "WHERE c.file_name = ?", (file_name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def all_skills(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT DISTINCT skill FROM candidate_skills ORDER BY skill")]
+
@@ -0,0 +1,169 @@
+import os
+import json
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from explain import EXPLANATION_COLUMNS
+from scoring import BUCKETS, BUCKET_THRESHOLDS, COMPONENTS, bucketize_array
+
+RESULTS_DIR = os.path.join("data", "results") #one Parquet file per ranking run
+
+RESULT_COLUMNS = ("run_id", "jd_id", "file_name", "rank", "score") + COMPONENTS + ("bucket",) + EXPLANATION_COLUMNS
+RUN_METADATA_KEY = b"resume_screen" #Parquet schema metadata: scoring config and JD profile of the run
+RUN_MODES = ("full", "top_k", "batch") #every resume against one JD, only the best k of them, several JDs in one run
+
+
+def new_run_id() -> str:
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000) # one clock read, so the id cannot straddle a second
+    return time.strftime("%Y%m%dT%H%M%S", time.gmtime(seconds)) + f"{nanos:09d}" # sortable, unique per run
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("run_id", pa.string()),
+        ("jd_id", pa.dictionary(pa.int32(), pa.string())),
+        ("file_name", pa.string()),
+        ("rank", pa.int32()),
+        ("score", pa.float32()),
+        *((name, pa.float32()) for name in COMPONENTS), #null for runs ranked on text similarity alone
+        ("bucket", pa.dictionary(pa.int8(), pa.string())),
+        # Per-candidate explanations (explain.py); null for runs without them
+        ("top_terms", pa.list_(pa.string())),
+        ("term_weights", pa.list_(pa.float32())),
+        ("matched_skills", pa.list_(pa.string())),
+        ("missing_skills", pa.list_(pa.string())),
+        ("experience_delta", pa.float32()),
+    ])
+
+
+def write_run(file_names: Sequence[str], scores: np.ndarray, jd_ids=None, ranks: Optional[np.ndarray] = None,
+              results_dir: str = RESULTS_DIR, run_id: Optional[str] = None,
+              components: Optional[Dict[str, np.ndarray]] = None, thresholds: Sequence[float] = BUCKET_THRESHOLDS,
+              metadata: Optional[Dict[str, Any]] = None, explanations: Optional[Dict[str, list]] = None) -> str:
+    """Append one ranking run as a Parquet file and return its run id.
+
+    jd_ids is a single id for the whole run or one id per row. ranks default to
+    1..n in the given order, so pass rows already sorted best first. Without
+    components the scores are taken to be text similarity. explanations holds
+    one list per EXPLANATION_COLUMNS name, aligned with the rows. metadata (e.g.
+    the scoring config) is stored in the file's schema; see run_metadata.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    run_id = run_id or new_run_id()
+    n = len(file_names)
+    scores = np.asarray(scores, dtype=np.float32)
+    if jd_ids is None or isinstance(jd_ids, str):
+        jd_col = pa.DictionaryArray.from_arrays(pa.array(np.zeros(n, dtype=np.int32)), pa.array([jd_ids or "default"]))
+    else:
+        jd_col = pa.array(list(jd_ids), type=pa.string()).dictionary_encode().cast(pa.dictionary(pa.int32(), pa.string()))
+    bucket_col = pa.DictionaryArray.from_arrays(pa.array(bucketize_array(scores, thresholds)), pa.array(list(BUCKETS)))
+    components = components if components is not None else {"similarity": scores}
+    component_cols = {name: pa.array(np.asarray(components[name], dtype=np.float32)) if name in components
+                      else pa.nulls(n, pa.float32()) for name in COMPONENTS}
+    schema = _schema()
+    explanation_cols = {name: pa.array(explanations[name], type=schema.field(name).type) if explanations
+                        else pa.nulls(n, schema.field(name).type) for name in EXPLANATION_COLUMNS}
+
+    table = pa.table({
+        "run_id": pa.array([run_id] * n, type=pa.string()),
+        "jd_id": jd_col,
+        "file_name": pa.array(list(file_names), type=pa.string()),
+        "rank": pa.array(np.arange(1, n + 1, dtype=np.int32) if ranks is None else np.asarray(ranks, dtype=np.int32)),
+        "score": pa.array(scores),
+        **component_cols,
+        "bucket": bucket_col,
+        **explanation_cols,
+    }, schema=schema)
+    if metadata:
+        table = table.replace_schema_metadata({RUN_METADATA_KEY: json.dumps(metadata)})
+
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"run-{run_id}.parquet")
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path) # readers only ever see complete files
+    return run_id
+
+
+def list_runs(results_dir: str = RESULTS_DIR) -> List[str]:
+    if not os.path.isdir(results_dir):
+        return []
+    return sorted(name[len("run-"):-len(".parquet")] for name in os.listdir(results_dir)
+                  if name.startswith("run-") and name.endswith(".parquet"))
+
+
+def run_path(run_id: str, results_dir: str = RESULTS_DIR) -> str:
+    return os.path.join(results_dir, f"run-{run_id}.parquet")
+
+
+def latest_run(results_dir: str = RESULTS_DIR) -> Optional[str]:
+    runs = list_runs(results_dir)
+    return runs[-1] if runs else None
+
+
+def latest_full_run(results_dir: str = RESULTS_DIR) -> Optional[str]:
+    """Newest run that ranks every resume against a single JD, skipping top-k and batch runs.
+
+    Runs written before the mode was recorded count as full.
+    """
+    for run_id in reversed(list_runs(results_dir)):
+        if run_metadata(run_id, results_dir).get("mode", "full") == "full":
+            return run_id
+    return None
+
+
+def run_columns(run_id: Optional[str] = None, results_dir: str = RESULTS_DIR) -> List[str]:
+    """Columns stored in a run (default: the latest); runs written by older versions have fewer."""
+    import pyarrow.parquet as pq
+
+    run_id = run_id or latest_run(results_dir)
+    return pq.read_schema(run_path(run_id, results_dir)).names if run_id else []
+
+
+def run_metadata(run_id: Optional[str] = None, results_dir: str = RESULTS_DIR) -> Dict[str, Any]:
+    """Metadata stored with a run (default: the latest), without reading any rows."""
+    import pyarrow.parquet as pq
+
+    run_id = run_id or latest_run(results_dir)
+    if run_id is None:
+        return {}
+    meta = pq.read_schema(run_path(run_id, results_dir)).metadata or {}
+    return json.loads(meta[RUN_METADATA_KEY]) if RUN_METADATA_KEY in meta else {}
+
+
+def read_results(results_dir: str = RESULTS_DIR, columns: Optional[Sequence[str]] = None,
+                 run_id: Optional[str] = None, jd_id: Optional[str] = None):
+    """Read one run (default: the latest) as a DataFrame, loading only the requested columns."""
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    run_id = run_id or latest_run(results_dir)
+    if run_id is None:
+        return pd.DataFrame(columns=list(columns or RESULT_COLUMNS))
+    filters = [("jd_id", "=", jd_id)] if jd_id is not None else None
+    table = pq.read_table(run_path(run_id, results_dir), columns=list(columns) if columns else None, filters=filters)
+    return table.to_pandas()
+
+
+def read_all_runs(results_dir: str = RESULTS_DIR, columns: Optional[Sequence[str]] = None):
+    """Every run in the store concatenated, e.g. to compare scores over time."""
+    import pandas as pd
+
+    frames = [read_results(results_dir, columns, run_id) for run_id in list_runs(results_dir)]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=list(columns or RESULT_COLUMNS))
+
+
+def prune_runs(keep: int, results_dir: str = RESULTS_DIR) -> List[str]:
+    """Delete all but the newest keep runs and the latest full run; returns the removed run ids."""
+    runs = list_runs(results_dir)
+    full = latest_full_run(results_dir) #the dashboard's run survives a burst of top-k or batch runs
+    removed = [run_id for run_id in (runs[:-keep] if keep > 0 else runs) if run_id != full]
+    for run_id in removed:
+        os.remove(run_path(run_id, results_dir))
+    return removed
@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+from typing import Dict, Any, List, Optional
+import numpy as np
+from scipy import sparse
+
+INDEX_DIR = os.path.join("data", "index") #directory where the fitted TF-IDF index is stored
+
+VECTORIZER_FILE = "vectorizer.pkl"
+MATRIX_FILE = "resumes.npz"
+KEYS_FILE = "keys.json"
+
+# Bump when resume_document or the vectorizer settings change so saved indexes are refit
+INDEX_VERSION = 2
+
+_WARM: Dict[str, tuple] = {} #index dir -> (file stats, loaded index); only filled by keep_warm (the warm server)
+
+
+def resume_document(record: Dict[str, Any]) -> str:
+    """Text of a parsed resume that gets vectorized: the resume text plus its skills.
+
+    Keys, contact details and JSON punctuation are left out so they do not add
+    vocabulary that every resume shares.
+    """
+    skills = record.get("skills") or []
+    return f"{record.get('raw_text') or ''} {' '.join(skills)}"
+
+
+def document_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def vectorizer_signature(vectorizer) -> str:
+    """Changes when the vectorizer is refit; rows transformed by another fit do not match it."""
+    return hashlib.sha1(np.asarray(vectorizer.idf_, dtype=np.float64).tobytes()).hexdigest()
+
+
+def _write_replace(path: str, write) -> None:
+    """Write through write(file) to a tmp file beside path, then swap it in."""
+    with open(path + ".tmp", "wb") as f:
+        write(f)
+    os.replace(path + ".tmp", path)
+
+
+class ResumeIndex:
+    """Fitted TF-IDF vectorizer plus the L2-normalised sparse resume matrix.
+
+    Rows are keyed by file_name. Because TfidfVectorizer normalises rows, cosine
+    similarity against a job description is a single sparse matrix-vector product.
+    Resumes added after the fit are transformed with the existing vocabulary and
+    IDF weights; call build() again when the corpus has drifted far enough that
+    a refit is worth it.
+    """
+
+    def __init__(self, vectorizer, matrix, file_names: List[str], doc_hashes: List[str],
+                 source_stamp: Optional[str] = None):
+        self.vectorizer = vectorizer
+        self.matrix = sparse.csr_matrix(matrix)
+        self.file_names = list(file_names)
+        self.doc_hashes = list(doc_hashes)
+        self.source_stamp = source_stamp #state of the parsed resumes the index was last synced with, if known
+        self._positions = {name: i for i, name in enumerate(self.file_names)}
+
+    def __len__(self) -> int:
+        return len(self.file_names)
+
+    @classmethod
+    def build(cls, records: List[Dict[str, Any]]) -> "ResumeIndex":
+        """Fit the vectorizer on the resume corpus and vectorize every resume."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        docs = [resume_document(r) for r in records]
+        vectorizer = TfidfVectorizer(dtype=np.float32)
+        matrix = vectorizer.fit_transform(docs)
+        return cls(vectorizer, matrix, [r.get("file_name") for r in records], [document_hash(d) for d in docs])
+
+    def sync(self, records: List[Dict[str, Any]]) -> bool:
+        """Bring the index in line with records without refitting.
+
+        New and changed resumes are transformed with the fitted vectorizer, resumes
+        missing from records are dropped. Returns True if anything changed.
+        """
+        present = {r.get("file_name") for r in records}
+        removed = self.remove([name for name in self.file_names if name not in present])
+        return self.upsert(records) > 0 or removed > 0
+
+    def upsert(self, records: List[Dict[str, Any]]) -> int:
+        """Add new resumes and replace changed ones; cost scales with len(records), not the corpus."""
+        docs = {r.get("file_name"): resume_document(r) for r in records}
+        hashes = {name: document_hash(doc) for name, doc in docs.items()}
+        changed = [name for name in docs
+                   if self.position(name) is None or self.doc_hashes[self.position(name)] != hashes[name]]
+        if not changed:
+            return 0
+
+        self.remove(changed)
+        new_rows = self.vectorizer.transform([docs[name] for name in changed]).astype(np.float32)
+        self.matrix = sparse.vstack([self.matrix, new_rows], format="csr")
+        self.file_names += changed
+        self.doc_hashes += [hashes[name] for name in changed]
+        self._positions.update((name, len(self.file_names) - len(changed) + i) for i, name in enumerate(changed))
+        return len(changed)
+
+    def remove(self, file_names: List[str]) -> int:
+        """Drop the given resumes from the index. Returns how many were present."""
+        drop = {self._positions[name] for name in file_names if name in self._positions}
+        if not drop:
+            return 0
+        keep = [i for i in range(len(self.file_names)) if i not in drop]
+        self.matrix = self.matrix[keep]
+        self.file_names = [self.file_names[i] for i in keep]
+        self.doc_hashes = [self.doc_hashes[i] for i in keep]
+        self._positions = {name: i for i, name in enumerate(self.file_names)}
+        return len(drop)
+
+    def transform_query(self, jd_text: str):
+        return self.vectorizer.transform([jd_text])
+
+    def query(self, jd_text: str) -> np.ndarray:
+        """Cosine similarity of jd_text against every indexed resume."""
+        q = self.transform_query(jd_text)
+        return np.asarray((self.matrix @ q.T).todense()).ravel()
+
+    def query_batch(self, jd_texts: List[str]):
+        """Sparse N x M cosine similarity matrix for N job descriptions."""
+        q = self.vectorizer.transform(jd_texts)
+        return (q @ self.matrix.T).tocsr()
+
+    def position(self, file_name: str) -> Optional[int]:
+        return self._positions.get(file_name)
+
+    def save(self, index_dir: str = INDEX_DIR) -> None:
+        """Swap each file in with os.replace, keys.json last; the pickle is only rewritten after a refit.
+
+        keys.json records the vectorizer signature and matrix shape, so load can tell
+        when it read files from two different saves.
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        vec_sig = vectorizer_signature(self.vectorizer)
+        if _read_keys(index_dir).get("vectorizer") != vec_sig or not os.path.exists(os.path.join(index_dir, VECTORIZER_FILE)):
+            _write_replace(os.path.join(index_dir, VECTORIZER_FILE),
+                           lambda f: pickle.dump(self.vectorizer, f, protocol=pickle.HIGHEST_PROTOCOL))
+        _write_replace(os.path.join(index_dir, MATRIX_FILE), lambda f: sparse.save_npz(f, self.matrix, compressed=False))
+        keys = {"version": INDEX_VERSION, "vectorizer": vec_sig, "shape": list(self.matrix.shape),
+                "source_stamp": self.source_stamp, "file_names": self.file_names, "doc_hashes": self.doc_hashes}
+        _write_replace(os.path.join(index_dir, KEYS_FILE), lambda f: f.write(json.dumps(keys).encode("utf-8")))
+
+    @classmethod
+    def load(cls, index_dir: str = INDEX_DIR, attempts: int = 5) -> "ResumeIndex":
+        warm = _WARM.get(os.path.abspath(index_dir))
+        if warm is not None and warm[0] == _index_stats(index_dir):
+            # upsert/remove replace the matrix rather than edit it, so sharing it is safe
+            index = warm[1]
+            return cls(index.vectorizer, index.matrix, index.file_names, index.doc_hashes, index.source_stamp)
+        for attempt in range(attempts):
+            keys = _read_keys(index_dir)
+            with open(os.path.join(index_dir, VECTORIZER_FILE), "rb") as f:
+                vectorizer = pickle.load(f)
+            matrix = sparse.load_npz(os.path.join(index_dir, MATRIX_FILE))
+            if keys == _read_keys(index_dir) and list(matrix.shape) == keys.get("shape", list(matrix.shape)) \
+                    and keys.get("vectorizer", "") in ("", vectorizer_signature(vectorizer)):
+                return cls(vectorizer, matrix, keys["file_names"], keys["doc_hashes"], keys.get("source_stamp"))
+            time.sleep(0.05 * (attempt + 1)) #a save was swapping files in while we read them
+        raise ValueError(f"The index in {index_dir} kept changing while it was loaded")
+
+    @staticmethod
+    def exists(index_dir: str = INDEX_DIR) -> bool:
+        """True if a complete index written by the current INDEX_VERSION is on disk."""
+        if not all(os.path.exists(os.path.join(index_dir, name))
+                   for name in (VECTORIZER_FILE, MATRIX_FILE, KEYS_FILE)):
+            return False
+        try:
+            with open(os.path.join(index_dir, KEYS_FILE), "r", encoding="utf-8") as f:
+                return json.load(f).get("version") == INDEX_VERSION
+        except (ValueError, OSError):
+            return False
+
+
+def _read_keys(index_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(index_dir, KEYS_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _index_stats(index_dir: str) -> tuple:
+    try:
+        return tuple((st.st_size, st.st_mtime_ns) for st in
+                     (os.stat(os.path.join(index_dir, name)) for name in (VECTORIZER_FILE, MATRIX_FILE, KEYS_FILE)))
+    except OSError:
+        return ()
+
+
+def keep_warm(index_dir: str = INDEX_DIR) -> bool:
+    """Hold the saved index in memory so later loads in this process (and in processes
+    forked from it) skip unpickling; a load after the files change reads them again."""
+    if not ResumeIndex.exists(index_dir):
+        return False
+    stats = _index_stats(index_dir)
+    _WARM.pop(os.path.abspath(index_dir), None)
+    _WARM[os.path.abspath(index_dir)] = (stats, ResumeIndex.load(index_dir))
+    return True
+
+
+def load_vectorizer(index_dir: str = INDEX_DIR):
+    """Only the fitted vectorizer of a saved index (the resume matrix is not read)."""
+    warm = _WARM.get(os.path.abspath(index_dir))
+    if warm is not None and warm[0] == _index_stats(index_dir):
+        return warm[1].vectorizer
+    with open(os.path.join(index_dir, VECTORIZER_FILE), "rb") as f:
+        return pickle.load(f)
+
+
+def load_or_build_index(records: List[Dict[str, Any]], index_dir: str = INDEX_DIR,
+                        rebuild: bool = False, source_stamp: Optional[str] = None) -> ResumeIndex:
+    """Load the persisted index and sync it with records, or fit a new one.
+
+    source_stamp identifies the state of the records (see match_and_rank.parsed_dir_stamp);
+    it is saved with the index so a later caller can skip reading the records at all.
+    """
+    if not rebuild and ResumeIndex.exists(index_dir):
+        index = ResumeIndex.load(index_dir)
+        changed = index.sync(records)
+        if changed or (source_stamp is not None and index.source_stamp != source_stamp):
+            index.source_stamp = source_stamp
+            index.save(index_dir)
+        return index
+
+    index = ResumeIndex.build(records)
+    index.source_stamp = source_stamp
+    index.save(index_dir)
+    return index
@@ -0,0 +1,139 @@
+import re
+import json
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Per-candidate signals, in the column order of the components matrix
+COMPONENTS = ("similarity", "required_overlap", "preferred_overlap", "experience_fit")
+DEFAULT_WEIGHTS = {"similarity": 0.6, "required_overlap": 0.25, "preferred_overlap": 0.05, "experience_fit": 0.1}
+
+BUCKETS = ("Irrelevant", "Moderate", "Highly Relevant")
+BUCKET_THRESHOLDS = (0.45, 0.65) #score >= 0.45 is Moderate, >= 0.65 Highly Relevant
+
+# JD section headers; lines under other known headers count as neither required nor preferred
+REQUIRED_HEADERS = {"requirements", "required", "required skills", "must have", "must-have", "qualifications",
+                    "minimum qualifications", "basic qualifications"}
+PREFERRED_HEADERS = {"preferred", "preferred qualifications", "preferred skills", "nice to have", "nice-to-have",
+                     "good to have", "bonus", "bonus points"}
+OTHER_HEADERS = {"responsibilities", "about the role", "about us", "benefits", "what you will do", "role"}
+PREFERRED_HINT_RE = re.compile(r"\b(?:a plus|is a plus|are a plus|preferred|nice to have|bonus)\b", re.I)
+MIN_YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:years|yrs)", re.I)
+
+
+def bucketize_array(scores: np.ndarray, thresholds: Sequence[float] = BUCKET_THRESHOLDS) -> np.ndarray:
+    """Bucket code per score (index into BUCKETS), vectorized."""
+    return np.searchsorted(np.asarray(thresholds, dtype=np.float64), scores, side="right").astype(np.int8)
+
+
+class JobProfile:
+    """What a job description asks for: required and preferred skills, minimum years."""
+
+    def __init__(self, required: List[str], preferred: List[str], min_years: Optional[float] = None):
+        self.required = required
+        self.preferred = preferred
+        self.min_years = min_years
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"required": self.required, "preferred": self.preferred, "min_years": self.min_years}
+
+
+def extract_job_profile(jd_text: str, matcher=None) -> JobProfile:
+    """Split the JD's skills into required (Requirements-style sections) and preferred
+    (Preferred sections, "... is a plus" lines, and skills mentioned anywhere else).
+
+    A JD without recognisable sections treats every skill it mentions as required.
+    """
+    from utils import get_skill_matcher
+
+    matcher = matcher or get_skill_matcher()
+    required_lines, preferred_lines, other_lines = [], [], []
+    section, saw_header = None, False
+    for line in jd_text.splitlines():
+        key = line.strip().rstrip(":").strip().lower()
+        if key in REQUIRED_HEADERS or key in PREFERRED_HEADERS or key in OTHER_HEADERS:
+            section = "required" if key in REQUIRED_HEADERS else "preferred" if key in PREFERRED_HEADERS else None
+            saw_header = saw_header or section is not None
+            continue
+        if section == "required" and not PREFERRED_HINT_RE.search(line):
+            required_lines.append(line)
+        elif section == "preferred" or PREFERRED_HINT_RE.search(line):
+            preferred_lines.append(line)
+        else:
+            other_lines.append(line)
+    if not saw_header:
+        required_lines, other_lines = required_lines + other_lines, []
+
+    required = sorted(matcher.match("\n".join(required_lines)))
+    preferred = sorted(set(matcher.match("\n".join(preferred_lines + other_lines))) - set(required))
+    years = MIN_YEARS_RE.search("\n".join(required_lines)) or MIN_YEARS_RE.search(jd_text)
+    return JobProfile(required, preferred, float(years.group(1)) if years else None)
+
+
+class ScoringConfig:
+    """Component weights and bucket thresholds, optionally loaded from a JSON file like
+    {"weights": {"similarity": 0.5, ...}, "thresholds": [0.45, 0.65]}."""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, thresholds: Sequence[float] = BUCKET_THRESHOLDS):
+        unknown = set(weights or {}) - set(COMPONENTS)
+        if unknown:
+            raise ValueError(f"Unknown scoring components {sorted(unknown)}; expected {COMPONENTS}")
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.thresholds = tuple(float(t) for t in thresholds)
+
+    @property
+    def weight_vector(self) -> np.ndarray:
+        return weight_vector(self.weights)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"weights": self.weights, "thresholds": list(self.thresholds)}
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "ScoringConfig":
+        if not path:
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("weights"), data.get("thresholds", BUCKET_THRESHOLDS))
+
+
+def weight_vector(weights: Dict[str, float]) -> np.ndarray:
+    """Weights in COMPONENTS order, normalised to sum to 1 so scores stay in [0, 1]."""
+    w = np.array([max(0.0, float(weights.get(c, 0.0))) for c in COMPONENTS], dtype=np.float32)
+    total = w.sum()
+    return w / total if total > 0 else np.eye(len(COMPONENTS), dtype=np.float32)[0]
+
+
+def align_rows(store, file_names: Sequence[str]) -> np.ndarray:
+    """Feature store row of each file name, -1 where the store has no such resume."""
+    return np.fromiter((-1 if (r := store.row(name)) is None else r for name in file_names),
+                       dtype=np.int64, count=len(file_names))
+
+
+def score_components(similarity: np.ndarray, file_names: Sequence[str], store, profile: JobProfile) -> np.ndarray:
+    """Candidates x COMPONENTS matrix (float32), each column in [0, 1].
+
+    Skill overlaps are one sparse mat-vec over the whole feature store each;
+    candidates missing from the store get zero skill and experience signals.
+    """
+    n = len(file_names)
+    out = np.zeros((n, len(COMPONENTS)), dtype=np.float32)
+    out[:, 0] = similarity
+    if store is None or n == 0:
+        return out
+    rows = align_rows(store, file_names)
+    known = rows >= 0
+    for col, skills in ((1, profile.required), (2, profile.preferred)):
+        if skills:
+            overlap = store.skill_overlap(skills) / len(skills)
+            out[known, col] = overlap[rows[known]]
+        else:
+            out[known, col] = 1.0 #nothing asked for, nothing missing
+    years = np.asarray(store.years_experience, dtype=np.float32)[rows[known]]
+    out[known, 3] = 1.0 if not profile.min_years else np.clip(years / profile.min_years, 0.0, 1.0)
+    return out
+
+
+def combine(components: np.ndarray, weights: Dict[str, float]) -> np.ndarray:
+    """Final scores: one (candidates x 4) @ (4,) product, cheap enough to redo on every re-weighting."""
+    return (components @ weight_vector(weights)).astype(np.float32)
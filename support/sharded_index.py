@@ -0,0 +1,245 @@
+import os
+import json
+import time
+import heapq
+import shutil
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from resume_index import vectorizer_signature
+
+SHARD_DIR = "shards" #sub-directory of the resume index
+SHARD_MANIFEST = "shards.json"
+SHARD_SIZE = 50000 #rows per shard
+
+_SHARD_CACHE: Dict[str, Tuple[str, Any, List[str]]] = {} #per worker process: shard path -> (signature, matrix, names)
+
+
+def _shard_signature(vec_sig: str, file_names: List[str], doc_hashes: List[str]) -> str:
+    """Changes with the rows a shard holds or the vectorizer they were transformed with."""
+    h = hashlib.sha1(vec_sig.encode("ascii"))
+    for name, doc_hash in zip(file_names, doc_hashes):
+        h.update(f"{name}:{doc_hash}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+def write_shard(path: str, matrix, file_names: List[str]) -> None:
+    """Raw CSR arrays as .npy so workers can memory-map them; written beside and swapped in."""
+    tmp_path = path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    for name in ("data", "indices", "indptr"):
+        np.save(os.path.join(tmp_path, f"{name}.npy"), getattr(matrix, name))
+    with open(os.path.join(tmp_path, "keys.json"), "w", encoding="utf-8") as f:
+        json.dump({"file_names": file_names, "n_features": matrix.shape[1]}, f)
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+
+def load_shard(path: str, mmap: bool = True):
+    mode = "r" if mmap else None
+    data, indices, indptr = (np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+                             for name in ("data", "indices", "indptr"))
+    with open(os.path.join(path, "keys.json"), "r", encoding="utf-8") as f:
+        keys = json.load(f)
+    matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, keys["n_features"]), copy=False)
+    return matrix, keys["file_names"]
+
+
+def shard_top_k(path: str, signature: str, q, k: int) -> List[Tuple[float, str]]:
+    """Runs in a worker: score one shard against the sparse (1 x features) query and keep its k best."""
+    cached = _SHARD_CACHE.get(path)
+    if cached is None or cached[0] != signature: #shard rewritten since this worker last loaded it
+        matrix, names = load_shard(path)
+        cached = _SHARD_CACHE[path] = (signature, matrix, names)
+    _, matrix, names = cached
+    if matrix.shape[0] == 0:
+        return []
+    scores = (matrix @ q.T).toarray().ravel()
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    return [(float(scores[i]), names[i]) for i in top]
+
+
+class ShardedIndex:
+    """The ResumeIndex matrix split into row shards scored in parallel.
+
+    Each shard is a directory of memory-mappable CSR arrays. Shards are keyed by
+    the (file name, document hash) pairs they hold, so a sync only rewrites shards
+    whose rows changed: appended resumes fill the last shard and then open new
+    ones, and a removal rewrites just the shard that held the resume. A query is
+    transformed once, every worker returns its shard's local top k, and a heap
+    merge keeps the global top k. The query travels to each shard task in sparse
+    form (a JD has a few dozen non-zero terms), not as a dense vocabulary-length array.
+
+    Use it as a context manager (or call close()) so the worker pool is shut down.
+    """
+
+    def __init__(self, index_dir: str, vectorizer, shards: List[Dict[str, Any]], workers: Optional[int] = None):
+        self.index_dir = index_dir
+        self.vectorizer = vectorizer
+        self.shards = shards #[{"name", "signature", "file_names", "doc_hashes"}]
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def __enter__(self) -> "ShardedIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(len(s["file_names"]) for s in self.shards)
+
+    @property
+    def shard_dir(self) -> str:
+        return os.path.join(self.index_dir, SHARD_DIR)
+
+    def shard_path(self, shard: Dict[str, Any]) -> str:
+        return os.path.join(self.shard_dir, shard["name"])
+
+    # ---------- building ----------
+    @classmethod
+    def sync(cls, index, index_dir: str, shard_size: int = SHARD_SIZE, workers: Optional[int] = None) -> "ShardedIndex":
+        """Bring the on-disk shards in line with a ResumeIndex, rewriting only shards that changed."""
+        shard_dir = os.path.join(index_dir, SHARD_DIR)
+        manifest_path = os.path.join(shard_dir, SHARD_MANIFEST)
+        vec_sig = vectorizer_signature(index.vectorizer)
+        shards: List[Dict[str, Any]] = []
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("vectorizer") == vec_sig and manifest.get("shard_size") == shard_size:
+                shards = manifest["shards"]
+
+        current = {name: (row, doc_hash) for row, (name, doc_hash)
+                   in enumerate(zip(index.file_names, index.doc_hashes))}
+        placed, dirty = set(), set()
+        for shard in shards: #drop rows that were removed or changed since the shard was written
+            keep = [j for j, (name, doc_hash) in enumerate(zip(shard["file_names"], shard["doc_hashes"]))
+                    if current.get(name, (None, None))[1] == doc_hash]
+            if len(keep) < len(shard["file_names"]):
+                shard["file_names"] = [shard["file_names"][j] for j in keep]
+                shard["doc_hashes"] = [shard["doc_hashes"][j] for j in keep]
+                dirty.add(shard["name"])
+            placed.update(shard["file_names"])
+
+        pending = [name for name in index.file_names if name not in placed] #new or changed, in index order
+        while pending:
+            if not shards or len(shards[-1]["file_names"]) >= shard_size:
+                shards.append({"name": f"shard-{len(shards):05d}", "file_names": [], "doc_hashes": []})
+            last = shards[-1]
+            take, pending = pending[:shard_size - len(last["file_names"])], pending[shard_size - len(last["file_names"]):]
+            last["file_names"] += take
+            last["doc_hashes"] += [current[name][1] for name in take]
+            dirty.add(last["name"])
+
+        os.makedirs(shard_dir, exist_ok=True)
+        for shard in shards:
+            if shard["name"] in dirty or not os.path.isdir(os.path.join(shard_dir, shard["name"])):
+                rows = [current[name][0] for name in shard["file_names"]]
+                write_shard(os.path.join(shard_dir, shard["name"]), index.matrix[rows], shard["file_names"])
+            shard["signature"] = _shard_signature(vec_sig, shard["file_names"], shard["doc_hashes"]) #a refit must evict warm workers' copies
+
+        tmp_path = manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"vectorizer": vec_sig, "shard_size": shard_size, "shards": shards}, f)
+        os.replace(tmp_path, manifest_path)
+        if dirty:
+            print(f"Rewrote {len(dirty)} of {len(shards)} shards")
+        return cls(index_dir, index.vectorizer, shards, workers)
+
+    # ---------- querying ----------
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers) #kept warm: workers keep their shards mapped
+        return self._pool
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def query_vector(self, jd_text: str):
+        return sparse.csr_matrix(self.vectorizer.transform([jd_text]), dtype=np.float32)
+
+    def search_vector(self, q, k: int) -> List[Tuple[float, str]]:
+        """Global top k (score, file name), best first, for a sparse 1 x features query."""
+        args = [(self.shard_path(s), s["signature"]) for s in self.shards if s["file_names"]]
+        if self.workers == 1:
+            partials = [shard_top_k(path, sig, q, k) for path, sig in args]
+        else:
+            partials = self._executor().map(shard_top_k, *zip(*args), [q] * len(args), [k] * len(args))
+        return heapq.nlargest(k, (hit for part in partials for hit in part)) #k-way merge of the local top-k lists
+
+    def search(self, jd_text: str, k: int) -> List[Tuple[float, str]]:
+        return self.search_vector(self.query_vector(jd_text), k)
+
+
+def benchmark_scaling(sharded: ShardedIndex, queries, k: int = 50,
+                      worker_counts=(1, 2, 4, 8, 16, 32)) -> List[Dict[str, Any]]:
+    """Query latency and speedup over one worker for each worker count (queries: sparse CSR rows)."""
+    queries = sparse.csr_matrix(queries, dtype=np.float32)
+    report, base = [], None
+    for workers in worker_counts:
+        sharded.close()
+        sharded.workers = workers
+        sharded.search_vector(queries[0], k) #warm-up: start workers and map their shards
+        start = time.perf_counter()
+        for i in range(queries.shape[0]):
+            sharded.search_vector(queries[i], k)
+        ms = (time.perf_counter() - start) * 1000 / queries.shape[0]
+        base = base or ms
+        report.append({"workers": workers, "ms_per_query": ms, "speedup": base / ms})
+    sharded.close()
+    return report
+
+
+def synthetic_index(n_rows: int, n_features: int = 50000, nnz_per_row: int = 150, seed: int = 0):
+    """A ResumeIndex-shaped stand-in (random L2-normalised rows) for scaling runs without a real corpus."""
+    from types import SimpleNamespace
+    from sklearn.preprocessing import normalize
+
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, n_features, size=n_rows * nnz_per_row).astype(np.int32)
+    data = rng.random(n_rows * nnz_per_row, dtype=np.float32)
+    indptr = np.arange(0, n_rows * nnz_per_row + 1, nnz_per_row, dtype=np.int64)
+    matrix = normalize(sparse.csr_matrix((data, indices, indptr), shape=(n_rows, n_features)))
+    names = [f"synthetic_{i:08d}" for i in range(n_rows)]
+    vectorizer = SimpleNamespace(idf_=np.full(n_features, float(seed), dtype=np.float64))
+    return SimpleNamespace(vectorizer=vectorizer, matrix=matrix, file_names=names, doc_hashes=["0"] * n_rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    from resume_index import INDEX_DIR, ResumeIndex
+
+    parser = argparse.ArgumentParser(description="Shard the resume index and measure ranking speed from 1 to N workers.")
+    parser.add_argument("--index_dir", type=str, default=INDEX_DIR, help="Directory of the persisted TF-IDF resume index.")
+    parser.add_argument("--shard_size", type=int, default=SHARD_SIZE, help="Resumes per shard.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Worker counts to measure.")
+    parser.add_argument("--synthetic", type=int, help="Benchmark a random index with this many rows instead of the real one.")
+    parser.add_argument("--n_queries", type=int, default=20)
+    parser.add_argument("--top_k", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        index = synthetic_index(args.synthetic)
+        index_dir = os.path.join(args.index_dir, "synthetic")
+    elif ResumeIndex.exists(args.index_dir):
+        index, index_dir = ResumeIndex.load(args.index_dir), args.index_dir
+    else:
+        print("No resume index found. Run match_and_rank.py first, or pass --synthetic N.")
+        exit(1)
+
+    start = time.perf_counter()
+    with ShardedIndex.sync(index, index_dir, shard_size=args.shard_size) as sharded:
+        print(f"{len(sharded)} resumes in {len(sharded.shards)} shards ({time.perf_counter() - start:.1f}s to sync)")
+        rng = np.random.default_rng(0)
+        rows = rng.choice(index.matrix.shape[0], min(args.n_queries, index.matrix.shape[0]), replace=False)
+        report = benchmark_scaling(sharded, index.matrix[rows], args.top_k, args.workers) #resumes as queries
+    print(json.dumps({"n_resumes": len(sharded), "n_shards": len(sharded.shards), "cpu_count": os.cpu_count(),
+                      "k": args.top_k, "results": report}, indent=2))
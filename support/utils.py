@@ -1,7 +1,14 @@
 import re
 import os
-from typing import List, Dict, Any
+import json
+import hashlib
+from collections import deque
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple, Callable, Union
+from instrument import count, timed
 
+# Import attempts are cached so a failed or slow import happens once per process, not per file
+@lru_cache(maxsize=None)
 def try_import_pdf(): #Try to import pdfminer.six
     try:
         from pdfminer.high_level import extract_text as pdf_extract_text
@@ -9,6 +16,16 @@ def try_import_pdf(): #Try to import pdfminer.six
     except Exception:
         return None
 
+@lru_cache(maxsize=None)
+def try_import_pdf_pages(): #pdfminer's lazy page iterator, to stop layout once the budget is spent
+    try:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        return extract_pages, LTTextContainer
+    except Exception:
+        return None
+
+@lru_cache(maxsize=None)
 def try_import_docx(): #Try to import python-docx
     try:
         import docx
@@ -36,7 +53,7 @@ whom why why's will with won't would wouldn't y you you'd you'll you're you've y
 
 # -------------------- SKILLS --------------------
 SALESFORCE_SKILLS = [
-    "salesforce", "apex", "visualforce", "soql", "sosl", "lwc", "lightning", "lightning web components",
+    "salesforce", "apex", "visualforce", "soql", "sosl", "lightning", "lightning web components",
     "triggers", "flows", "process builder", "sales cloud", "service cloud", "marketing cloud",
     "community cloud", "experience cloud", "cpq", "field service", "einstein", "integration", "mulesoft",
     "heroku", "rest api", "soap api", "oauth", "salesforce admin", "platform developer", "ci/cd",
@@ -45,27 +62,240 @@ SALESFORCE_SKILLS = [
     "objects", "fields", "page layouts", "record types", "approval process"
 ]
 
+# Alternative spellings -> canonical skill (keys and values lowercase)
+SKILL_ALIASES = {
+    "lwc": "lightning web components",
+    "lightning web component": "lightning web components",
+    "sfdc": "salesforce",
+    "vf": "visualforce",
+    "visualforce pages": "visualforce",
+    "apex triggers": "triggers",
+    "workflows": "workflow",
+    "integrations": "integration",
+    "flow builder": "flows",
+    "salesforce flows": "flows",
+    "experience builder": "experience cloud",
+    "salesforce cpq": "cpq",
+    "rest apis": "rest api",
+    "restful api": "rest api",
+    "soap apis": "soap api",
+    "ci cd": "ci/cd",
+    "continuous integration": "ci/cd",
+    "salesforce dx": "sfdx",
+    "sf cli": "sfdx",
+    "dataloader": "data loader",
+    "apex test classes": "test classes",
+    "permission set": "permission sets",
+    "validation rule": "validation rules",
+    "record type": "record types",
+    "page layout": "page layouts",
+    "approval processes": "approval process",
+    "platform developer i": "platform developer",
+    "platform developer ii": "platform developer",
+    "pd1": "platform developer",
+    "pd2": "platform developer",
+}
+
+
+# -------------------- SKILL MATCHER --------------------
+class SkillMatcher:
+    """Aho-Corasick automaton over skill names and aliases.
+
+    One pass over the lowercased text finds every occurrence of every pattern;
+    a hit only counts if it sits on word boundaries, so "git" does not match
+    inside "digital". Each pattern maps to its canonical skill.
+    """
+
+    def __init__(self, patterns: Dict[str, str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, str]]] = [[]] # (pattern length, canonical skill) ending at each state
+        for surface, canonical in patterns.items():
+            surface = " ".join(surface.lower().split())
+            if surface:
+                self._add(surface, canonical)
+        self._link()
+
+    def _add(self, pattern: str, canonical: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), canonical))
+
+    def _link(self) -> None: # breadth-first failure links, merging outputs of suffix states
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str, lowered: bool = False) -> List[Tuple[str, int, int]]:
+        """All word-bounded matches as (canonical skill, start, end) in text order.
+
+        Pass lowered=True if text is already lowercase to skip the copy.
+        """
+        t = text if lowered else text.lower()
+        n = len(t)
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = []
+        state = 0
+        for i, ch in enumerate(t):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                end = i + 1
+                if end < n and t[end].isalnum():
+                    continue
+                for length, canonical in out[state]:
+                    start = end - length
+                    if start == 0 or not t[start - 1].isalnum():
+                        hits.append((canonical, start, end))
+        return hits
+
+    def match(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """Canonical skill -> {"count": occurrences, "positions": [(start, end), ...]}."""
+        result: Dict[str, Dict[str, Any]] = {}
+        for canonical, start, end in self.find(text):
+            entry = result.setdefault(canonical, {"count": 0, "positions": []})
+            entry["count"] += 1
+            entry["positions"].append((start, end))
+        return result
+
+
+def load_skill_taxonomy(path: str) -> Dict[str, str]:
+    """Load a JSON taxonomy {"canonical skill": ["alias", ...]} as pattern -> canonical."""
+    with open(path, "r", encoding="utf-8") as f:
+        taxonomy = json.load(f)
+    patterns = {}
+    for canonical, aliases in taxonomy.items():
+        canonical = canonical.lower()
+        patterns[canonical] = canonical
+        for alias in aliases or []:
+            patterns[alias.lower()] = canonical
+    return patterns
+
+
+@lru_cache(maxsize=None)
+def get_skill_matcher(taxonomy_path: Optional[str] = None) -> SkillMatcher:
+    """Build the skill matcher once per process (per taxonomy file)."""
+    if taxonomy_path:
+        patterns = load_skill_taxonomy(taxonomy_path)
+    else:
+        patterns = {skill: skill for skill in SALESFORCE_SKILLS}
+        patterns.update(SKILL_ALIASES)
+    return SkillMatcher(patterns)
+
 
 # -------------------- HELPERS --------------------
-def read_text_from_file(path: str) -> str:
+# Extraction budget: resumes rarely carry useful content past the first pages, and
+# only the first few thousand characters are kept, so PDF layout stops early.
+MAX_PAGES = 5
+MAX_CHARS = 20000
+TEXT_CACHE_DIR = os.path.join("data", "cache", "text") #extracted PDF/DOCX text keyed by content hash
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """Content hash of a file, read in chunks so large PDFs are not loaded at once."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_pdf(path: str, max_pages: Optional[int], max_chars: Optional[int]) -> str:
+    pages_api = try_import_pdf_pages()
+    if pages_api is None:
+        raise ImportError("pdfminer.six is not installed. Install requirements.txt")
+    extract_pages, LTTextContainer = pages_api
+    parts, total = [], 0
+    for page in extract_pages(path, maxpages=max_pages or 0): # pages are laid out lazily, one at a time
+        for element in page:
+            if isinstance(element, LTTextContainer):
+                text = element.get_text()
+                parts.append(text)
+                total += len(text)
+        parts.append("\f")
+        if max_chars and total >= max_chars:
+            break
+    return "".join(parts)
+
+
+def _read_docx(path: str, max_chars: Optional[int]) -> str:
+    docx = try_import_docx()
+    if docx is None:
+        raise ImportError("python-docx is not installed. Install requirements.txt")
+    doc = docx.Document(path) # Extract text from DOCX
+    parts, total = [], 0
+    for p in doc.paragraphs:
+        parts.append(p.text)
+        total += len(p.text) + 1
+        if max_chars and total >= max_chars:
+            break
+    return "\n".join(parts)
+
+
+@timed()
+def read_text_from_file(path: str, max_pages: Optional[int] = MAX_PAGES, max_chars: Optional[int] = MAX_CHARS,
+                        cache_dir: Optional[str] = TEXT_CACHE_DIR, content_hash: Optional[str] = None) -> str:
+    """Plain text of a resume, at most max_pages (PDF) / about max_chars long.
+
+    PDF and DOCX text is cached under cache_dir keyed by content hash and budget,
+    so re-parsing after parser changes skips decoding. Pass content_hash if it is
+    already known; cache_dir=None disables the cache.
+    """
     path_lower = path.lower()
-    if path_lower.endswith(".txt"):
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read()
-    elif path_lower.endswith(".pdf"):
-        pdf_reader = try_import_pdf()
-        if pdf_reader is None:
-            raise ImportError("pdfminer.six is not installed. Install requirements.txt")
-        return pdf_reader(path) # Extract text from PDF
-    elif path_lower.endswith(".docx"):
-        docx = try_import_docx()
-        if docx is None:
-            raise ImportError("python-docx is not installed. Install requirements.txt")
-        doc = docx.Document(path) # Extract text from DOCX
-        return "\n".join(p.text for p in doc.paragraphs) 
+    if not path_lower.endswith((".pdf", ".docx")):
+        with open(path, "r", encoding="utf-8", errors="ignore") as f: # .txt, and plain-text fallback for anything else
+            return f.read(max_chars) if max_chars else f.read()
+
+    cache_path = None
+    if cache_dir:
+        key = content_hash or file_sha256(path)
+        cache_path = os.path.join(cache_dir, key[:2], f"{key}-p{max_pages or 0}-c{max_chars or 0}.txt")
+        if os.path.exists(cache_path):
+            count("text_cache.hit")
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return f.read()
+        count("text_cache.miss")
+
+    if path_lower.endswith(".pdf"):
+        text = _read_pdf(path, max_pages, max_chars) # Extract text from PDF
     else:
-        with open(path, "r", encoding="utf-8", errors="ignore") as f:
-            return f.read() # Fallback to plain text
+        text = _read_docx(path, max_chars)
+    if max_chars:
+        text = text[:max_chars]
+
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp" # pool workers may race on the same file
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, cache_path)
+    return text
+
+
+def peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError: # not available on Windows
+        return None
+    import sys
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024 # bytes on macOS, KiB on Linux
 
 
 def normalize_text(text: str) -> str: # Clean and normalize text
@@ -80,20 +310,109 @@ def tokenize(text: str) -> List[str]:
 
 
 # -------------------- EXTRACTION --------------------
-def extract_contacts(text: str) -> Dict[str, Any]:
-    cleaned = re.sub(r"(Email|E-mail|Mail|Phone|Mobile)[:\s]+", " ", text, flags=re.I) # Remove common prefixes , re.I for case insensitive
+# One scan over the normalized text finds emails, years of experience and phone
+# numbers together. Years come before phones so "5 years" is never read as part
+# of a number run, and a phone match may not swallow a trailing "N years" or end
+# inside a digit run (which would leave "2 years" of "12 years").
+SCAN_RE = re.compile(
+    rf"(?P<email>{EMAIL_RE.pattern})"
+    r"|(?P<years>\d+(?:\.\d+)?)\s*\+?\s*years?"
+    rf"|(?P<phone>{PHONE_RE.pattern})(?!\d)(?!\s*\+?\s*years?)",
+    re.I,
+)
+LINE_RE = re.compile(r"\r?\n|\\n") # real newlines, plus literal "\n" left in some exported resumes
+SECTION_HEADERS = {
+    "summary", "profile", "profile summary", "experience", "work experience", "professional experience",
+    "skills", "technical skills", "education", "certifications", "certificates", "projects", "achievements",
+}
+DEGREE_RE = re.compile(
+    r"\b(?:b\.?\s?tech|m\.?\s?tech|b\.?\s?e|m\.?\s?e|b\.?\s?sc|m\.?\s?sc|bca|mca|mba|ph\.?\s?d|"
+    r"bachelor(?:'s)?|master(?:'s)?|diploma)\b\.?",
+    re.I,
+)
+CERTIFICATION_RE = re.compile(r"\b(?:certified|certification|platform developer|salesforce admin)\b", re.I)
 
-    emails = EMAIL_RE.findall(cleaned)
-    phones = PHONE_RE.findall(cleaned)
 
-    return {
-        "email": emails[0].strip() if emails else None,
-        "phone": phones[0].strip() if phones else None,
-    }
+class Document:
+    """A resume's text and the views extractors share, each computed at most once.
 
+    Lines come from the raw text (before whitespace is collapsed) so line-based
+    extractors such as the name still see the layout. Literal "\\n" sequences are
+    turned into whitespace first, so the "n" is not read as part of the next word.
+    """
 
-def guess_name(text: str) -> str: 
-    lines = text.split("\n")
+    __slots__ = ("raw", "text", "_lower", "_lines", "_scan", "_skill_hits")
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        self.text = normalize_text(LINE_RE.sub("\n", raw))
+        self._lower = self._lines = self._scan = self._skill_hits = None
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def lines(self) -> List[str]:
+        if self._lines is None:
+            self._lines = [line.strip() for line in LINE_RE.split(self.raw) if line.strip()]
+        return self._lines
+
+    @property
+    def scan(self) -> Dict[str, List[str]]:
+        """Values of every SCAN_RE group, in text order, from a single finditer pass."""
+        if self._scan is None:
+            found: Dict[str, List[str]] = {"email": [], "years": [], "phone": []}
+            for m in SCAN_RE.finditer(self.text):
+                found[m.lastgroup].append(m.group(m.lastgroup))
+            self._scan = found
+        return self._scan
+
+    @property
+    def skill_hits(self) -> List[Tuple[str, int, int]]:
+        if self._skill_hits is None:
+            self._skill_hits = get_skill_matcher().find(self.lower, lowered=True)
+        return self._skill_hits
+
+    def section(self, *headers: str) -> List[str]:
+        """Lines under the first matching section header, up to the next header."""
+        out, inside = [], False
+        for line in self.lines:
+            key = line.rstrip(":").lower()
+            if key in SECTION_HEADERS:
+                if inside:
+                    break
+                inside = key in headers
+                continue
+            if inside:
+                out.append(line.lstrip("-•* ").strip())
+        return out
+
+
+# Field name -> extractor(Document). Extractors run in registration order.
+FIELD_EXTRACTORS: Dict[str, Callable[[Document], Any]] = {}
+
+
+def register_extractor(field: str):
+    """Register a Document -> value function as the extractor for field."""
+    def decorator(fn: Callable[[Document], Any]) -> Callable[[Document], Any]:
+        fn = timed(f"extract.{field}")(fn)
+        FIELD_EXTRACTORS[field] = fn
+        return fn
+    return decorator
+
+
+def extract_fields(doc: Union[str, Document], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Run the registered extractors (or just fields) over one shared Document."""
+    if not isinstance(doc, Document):
+        doc = Document(doc)
+    names = fields if fields is not None else list(FIELD_EXTRACTORS)
+    return {name: FIELD_EXTRACTORS[name](doc) for name in names}
+
+
+def _name_from_lines(lines: List[str]) -> Optional[str]:
     bad_headers = {"resume", "curriculum vitae", "cv", "profile", "summary"} # Common non-name headers
     for line in lines:
         line = line.strip()
@@ -103,26 +422,68 @@ def guess_name(text: str) -> str:
         if all(c.isalpha() or c.isspace() or c in "-.'" for c in line): #This prevents names with numbers or special characters
             tokens = line.split()
             if 1 <= len(tokens) <= 4 and all(len(t) >= 1 for t in tokens):
-                if line.lower() not in bad_headers:
+                if line.lower() not in bad_headers and line.lower().rstrip(":") not in SECTION_HEADERS:
                     return line
     return None
 
 
+@register_extractor("name")
+def _extract_name(doc: Document) -> Optional[str]:
+    return _name_from_lines(doc.lines)
+
+
+@register_extractor("contacts")
+def _extract_contacts(doc: Document) -> Dict[str, Any]:
+    emails, phones = doc.scan["email"], doc.scan["phone"]
+    return {
+        "email": emails[0].strip() if emails else None,
+        "phone": phones[0].strip() if phones else None,
+    }
+
+
+@register_extractor("years_experience")
+def _extract_years_experience(doc: Document) -> Optional[float]:
+    vals = doc.scan["years"]
+    return max(float(v) for v in vals) if vals else None
+
+
+@register_extractor("skills")
+def _extract_skills(doc: Document) -> List[str]:
+    found = {} # canonical skills in order of first appearance
+    for skill, _, _ in doc.skill_hits:
+        found.setdefault(skill, None)
+    return list(found)
+
+
+@register_extractor("education")
+def _extract_education(doc: Document) -> List[str]:
+    entries = doc.section("education")
+    if not entries: # no Education header: fall back to lines naming a degree
+        entries = [line for line in doc.lines if DEGREE_RE.search(line) and len(line) <= 200]
+    return entries
+
+
+@register_extractor("certifications")
+def _extract_certifications(doc: Document) -> List[str]:
+    entries = doc.section("certifications", "certificates")
+    if not entries:
+        entries = [line.lstrip("-•* ").strip() for line in doc.lines
+                   if CERTIFICATION_RE.search(line) and len(line) <= 120]
+    return entries
+
+
+# Single-field helpers, kept for callers that need just one value
+def extract_contacts(text: str) -> Dict[str, Any]:
+    return _extract_contacts(Document(text))
+
+
+def guess_name(text: str) -> str: 
+    return _name_from_lines(LINE_RE.split(text))
+
+
 def extract_years_experience(text: str) -> float: # Extract years of experience, like 2 years, 3.5 years, 5+ years
-    matches = re.findall(r"(\d+(?:\.\d+)?)\s*\+?\s*years?", text, flags=re.I)
-    if matches:
-        try:
-            vals = [float(m) for m in matches]
-            return max(vals)
-        except Exception:
-            return None
-    return None
+    return _extract_years_experience(Document(text))
 
 
 def extract_skills(text: str) -> List[str]:
-    found = set()
-    t = text.lower()
-    for skill in SALESFORCE_SKILLS:
-        if skill in t:
-            found.add(skill)
-    return list(found)
+    return _extract_skills(Document(text))
@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import time
+import glob
+import select
+import signal
+import socket
+import struct
+import tempfile
+from typing import Callable, Dict, List, Optional
+
+SOURCE_DIRS = (os.path.dirname(os.path.abspath(__file__)), os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEADER = struct.Struct("!I") #length prefix of a request, and the exit code sent back
+ACK = b"A" #the server took the request; before this the client may still run the command itself
+INTERRUPT = b"I"
+
+
+def runtime_dir() -> str:
+    """Per-user directory for the socket: $XDG_RUNTIME_DIR, else a private one under the temp dir."""
+    xdg = os.environ.get("XDG_RUNTIME_DIR")
+    if xdg and os.path.isdir(xdg):
+        return xdg
+    return os.path.join(tempfile.gettempdir(), f"resume-screen-{os.getuid() if hasattr(os, 'getuid') else 0}")
+
+
+SOCKET_PATH = os.path.join(runtime_dir(), "resume-screen.sock") #one server per user, whatever the working directory
+
+Runner = Callable[[List[str]], int] #argv without the program name -> exit code
+
+
+def supported() -> bool:
+    """The warm server forks per request and passes file descriptors over a Unix socket."""
+    return hasattr(os, "fork") and hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+
+def preload(index_dir: Optional[str] = None) -> List[str]:
+    """Import the heavy libraries and load the shared models once; requests are forked from here."""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    import scipy.sparse  # noqa: F401
+    import sklearn.feature_extraction.text  # noqa: F401
+    import sklearn.metrics.pairwise  # noqa: F401
+    import feature_extraction, ingest_daemon, match_and_rank, parse_resume, result_query, result_store  # noqa: F401,E401
+    from utils import get_skill_matcher, try_import_docx, try_import_pdf, try_import_pdf_pages
+    from resume_index import INDEX_DIR, keep_warm
+
+    loaded = ["numpy", "pandas", "scipy", "sklearn", "pipeline modules"]
+    try:
+        import pyarrow.parquet  # noqa: F401
+        loaded.append("pyarrow")
+    except ImportError:
+        pass
+    try_import_pdf(), try_import_pdf_pages(), try_import_docx()
+    get_skill_matcher()
+    loaded.append("skill matcher")
+    if keep_warm(index_dir or INDEX_DIR):
+        loaded.append(f"resume index ({index_dir or INDEX_DIR})")
+    return loaded
+
+
+def _source_stamp() -> Dict[str, int]:
+    """mtimes of the project's own .py files; a change means the warm modules are stale."""
+    return {path: os.stat(path).st_mtime_ns for d in SOURCE_DIRS for path in glob.glob(os.path.join(d, "*.py"))}
+
+
+def _recv_exact(sock: socket.socket, n: int) -> bytes:
+    data = b""
+    while len(data) < n:
+        chunk = sock.recv(n - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _run_forwarded(run: Runner, request: Dict, fds: List[int]) -> int:
+    """In the forked runner: adopt the client's stdio, cwd and environment, then run the command."""
+    for target, fd in enumerate(fds[:3]):
+        os.dup2(fd, target)
+        os.close(fd)
+    sys.stdin = open(0, "r", closefd=False)
+    sys.stdout = open(1, "w", buffering=1, closefd=False)
+    sys.stderr = open(2, "w", buffering=1, closefd=False)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    try: #the runner leaves through os._exit, so commands clean up in finally blocks, not atexit
+        code = run(request["argv"])
+    except KeyboardInterrupt:
+        code = 130
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return code
+
+
+def _handle(conn: socket.socket, run: Runner, request: Dict, fds: List[int]) -> int:
+    """In the forked handler: start the runner, relay Ctrl-C from the client, report its exit code."""
+    runner = os.fork()
+    if runner == 0:
+        conn.close()
+        os._exit(_run_forwarded(run, request, fds))
+    for fd in fds:
+        os.close(fd)
+    conn.sendall(ACK)
+    # A pidfd (Linux 5.3+) becomes readable when the runner exits; elsewhere poll for it
+    exited = [os.pidfd_open(runner)] if hasattr(os, "pidfd_open") else []
+    timeout = None if exited else 0.05
+    watching = True
+    while True:
+        readable = select.select([conn] * watching + exited, [], [], timeout)[0]
+        if conn in readable:
+            watching = bool(conn.recv(16)) #stop watching once the client has gone away
+            os.kill(runner, signal.SIGINT) #Ctrl-C in the client, or the client exited
+        pid, status = os.waitpid(runner, os.WNOHANG)
+        if pid:
+            code = os.waitstatus_to_exitcode(status)
+            code = 128 - code if code < 0 else code #killed by a signal, as a shell reports it
+            try:
+                conn.sendall(HEADER.pack(code & 0xFF))
+            except OSError:
+                pass
+            return code
+
+
+def serve(run: Runner, socket_path: str = SOCKET_PATH, index_dir: Optional[str] = None) -> None:
+    """Keep libraries and models loaded and run each client request in a forked copy of this process.
+
+    Each request runs with the client's stdin/stdout/stderr, working directory and
+    environment, so output goes straight to the client's terminal. When any of the
+    project's source files change the server restarts itself, and the request that
+    noticed is handed back so the client runs it locally.
+    """
+    if not supported():
+        print("⚠️ The warm server needs fork() and Unix sockets; run commands directly instead.")
+        exit(1)
+    if ping(socket_path):
+        print(f"A warm server is already listening on {socket_path}")
+        return
+
+    start = time.perf_counter()
+    loaded = preload(index_dir)
+    stamp = _source_stamp()
+    socket_dir = os.path.dirname(socket_path) or "."
+    os.makedirs(socket_dir, mode=0o700, exist_ok=True)
+    if os.stat(socket_dir).st_uid != os.getuid():
+        print(f"⚠️ {socket_dir} belongs to another user; pass --socket with a path in a directory you own.")
+        exit(1)
+    if os.path.exists(socket_path):
+        os.remove(socket_path) #left behind by a server that did not shut down cleanly
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(socket_path)
+    listener.listen(16)
+    listener.settimeout(1.0)
+    print(f"Warm server listening on {socket_path} ({time.perf_counter() - start:.1f}s to load {', '.join(loaded)})")
+
+    try:
+        while True:
+            while True: #reap finished handlers
+                try:
+                    if os.waitpid(-1, os.WNOHANG)[0] == 0:
+                        break
+                except ChildProcessError:
+                    break
+            try:
+                conn, _ = listener.accept()
+            except socket.timeout:
+                continue
+            conn.settimeout(None)
+            try:
+                header, fds, _, _ = socket.recv_fds(conn, HEADER.size, 3)
+                request = json.loads(_recv_exact(conn, HEADER.unpack(header)[0]))
+            except (OSError, ValueError, struct.error):
+                conn.close()
+                continue
+            if request.get("command") in ("ping", "stop"):
+                for fd in fds:
+                    os.close(fd)
+                conn.sendall(ACK)
+                conn.close()
+                if request["command"] == "stop":
+                    print("Warm server stopped.")
+                    return
+                continue
+            if _source_stamp() != stamp:
+                print("Source files changed, restarting the warm server")
+                for fd in fds: #received descriptors are inheritable; the new server must not hold the client's pipes
+                    os.close(fd)
+                conn.close() #no ACK: the client runs this request itself
+                listener.close()
+                os.remove(socket_path)
+                sys.stdout.flush()
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if os.fork() == 0:
+                listener.close()
+                try:
+                    os._exit(_handle(conn, run, request, fds))
+                except BaseException:
+                    os._exit(1)
+            conn.close()
+            for fd in fds:
+                os.close(fd)
+    except KeyboardInterrupt:
+        print("Warm server stopped.")
+    finally:
+        listener.close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def _connect(socket_path: str) -> Optional[socket.socket]:
+    if not supported() or not os.path.exists(socket_path):
+        return None
+    if os.stat(socket_path).st_uid != os.getuid(): #the request carries our environment and terminal
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError: #stale socket file, nobody listening
+        sock.close()
+        return None
+    return sock
+
+
+def _send(sock: socket.socket, request: Dict, fds: List[int]) -> bool:
+    payload = json.dumps(request).encode("utf-8")
+    try:
+        socket.send_fds(sock, [HEADER.pack(len(payload))], fds)
+        sock.sendall(payload)
+        return _recv_exact(sock, 1) == ACK
+    except OSError:
+        return False
+
+
+def ping(socket_path: str = SOCKET_PATH) -> bool:
+    sock = _connect(socket_path)
+    if sock is None:
+        return False
+    with sock:
+        return _send(sock, {"command": "ping"}, [])
+
+
+def stop(socket_path: str = SOCKET_PATH) -> bool:
+    sock = _connect(socket_path)
+    if sock is None:
+        return False
+    with sock:
+        return _send(sock, {"command": "stop"}, [])
+
+
+def request(argv: List[str], socket_path: str = SOCKET_PATH) -> Optional[int]:
+    """Run argv on the warm server and return its exit code, or None if no server took it."""
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    with sock:
+        if not _send(sock, {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}, [0, 1, 2]):
+            return None
+        while True:
+            try:
+                data = _recv_exact(sock, HEADER.size)
+                break
+            except KeyboardInterrupt:
+                sock.sendall(INTERRUPT) #forwarded to the command as SIGINT
+        return HEADER.unpack(data)[0] if len(data) == HEADER.size else 1
@@ -0,0 +1,6 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "support")) # pipeline modules live in support/ and import each other flat
+sys.path.insert(0, ROOT)
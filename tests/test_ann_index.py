@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from ann_index import IVFIndex, benchmark_recall, exact_top_k, load_or_build_ivf
+from sharded_index import synthetic_index
+
+
+@pytest.fixture(scope="module")
+def index():
+    return synthetic_index(400, n_features=2000, nnz_per_row=40)
+
+
+def test_probing_every_list_is_exact(index):
+    ivf = IVFIndex.build(index.matrix, n_lists=8)
+    q = index.matrix[7]
+    rows, scores = ivf.search(index.matrix, q, 10, nprobe=8)
+    exact_rows, exact_scores = exact_top_k(index.matrix, q, 10)
+    assert rows[0] == 7
+    assert np.allclose(scores, exact_scores)
+    assert set(rows) == set(exact_rows)
+
+
+def test_projection_is_sparse(index):
+    ivf = IVFIndex.build(index.matrix, n_lists=8, dim=64)
+    assert sparse.issparse(ivf.projection)
+    assert ivf.projection.shape == (2000, 64)
+    assert ivf.projection.nnz < 2000 * 64 / 10
+
+
+def test_recall_report(index):
+    ivf = IVFIndex.build(index.matrix, n_lists=8)
+    report = benchmark_recall(index.matrix, ivf, index.matrix[:20], k=10, nprobe_values=(1, 8, 16))
+    assert [r["nprobe"] for r in report] == [1, 8] #nprobe above n_lists is not measured
+    assert report[-1]["recall"] == 1.0
+    assert report[0]["fraction_scored"] < report[-1]["fraction_scored"]
+
+
+def test_empty_index_returns_no_rows():
+    matrix = sparse.csr_matrix((0, 50), dtype=np.float32)
+    ivf = IVFIndex.build(matrix)
+    assert ivf.n_lists == 0
+    q = sparse.csr_matrix(np.ones((1, 50), dtype=np.float32))
+    rows, scores = ivf.search(matrix, q, 10, nprobe=8)
+    assert len(rows) == 0 and len(scores) == 0
+    assert len(exact_top_k(matrix, q, 10)[0]) == 0
+
+
+def test_k_and_nprobe_are_clamped(index):
+    ivf = IVFIndex.build(index.matrix[:5], n_lists=2)
+    rows, _ = ivf.search(index.matrix[:5], index.matrix[0], k=50, nprobe=10)
+    assert sorted(rows.tolist()) == [0, 1, 2, 3, 4]
+    assert len(ivf.search(index.matrix[:5], index.matrix[0], k=0)[0]) == 0
+
+
+def test_saved_ivf_is_reused_until_the_rows_change(index, tmp_path):
+    ivf = load_or_build_ivf(index, str(tmp_path))
+    again = load_or_build_ivf(index, str(tmp_path))
+    assert again.signature == ivf.signature
+    assert (again.projection != ivf.projection).nnz == 0
+    assert np.array_equal(again.search(index.matrix, index.matrix[3], 5)[0], ivf.search(index.matrix, index.matrix[3], 5)[0])
+
+    changed = SimpleNamespace(**vars(index))
+    changed.doc_hashes = ["1"] + index.doc_hashes[1:]
+    assert load_or_build_ivf(changed, str(tmp_path)).signature != ivf.signature
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from benchmark import compare, generate_corpus, run_benchmark, synthetic_resume, write_pdf
+from parse_resume import parse_resume
+
+
+def test_synthetic_resumes_are_deterministic_and_parseable(tmp_path):
+    assert synthetic_resume(3, seed=1) == synthetic_resume(3, seed=1)
+    assert synthetic_resume(3, seed=1) != synthetic_resume(4, seed=1)
+
+    paths = generate_corpus(str(tmp_path), 6, mix=(1, 0, 0), workers=1)
+    assert [os.path.basename(p) for p in paths] == [f"resume_{i:07d}.txt" for i in range(6)]
+    record = parse_resume(paths[0], cache_dir=None)
+    lines = synthetic_resume(0)
+    assert record["name"] == lines[0]
+    assert record["contacts"]["email"] in lines[1]
+    assert record["skills"]
+
+
+def test_identical_corpus_request_reuses_the_files(tmp_path, monkeypatch):
+    import benchmark
+
+    generate_corpus(str(tmp_path), 4, mix=(1, 0, 0), workers=1)
+    monkeypatch.setattr(benchmark, "_write_range", None) #any write attempt would fail
+    assert len(generate_corpus(str(tmp_path), 4, mix=(1, 0, 0), workers=1)) == 4
+
+
+def test_minimal_pdf_writer(tmp_path):
+    path = tmp_path / "r.pdf"
+    write_pdf(str(path), ["Asha Rao", "Apex (5 years)"])
+    data = path.read_bytes()
+    assert data.startswith(b"%PDF") and b"Apex \\(5 years\\)" in data
+
+
+def test_run_benchmark_reports_every_stage(tmp_path):
+    paths = generate_corpus(str(tmp_path), 8, mix=(1, 0, 0), workers=1)
+    report = run_benchmark(paths, "Apex developer with SOQL")
+    assert [s["stage"] for s in report] == ["parse_resume", "build_feature_vector", "compute_similarity", "join_with_features"]
+    assert report[0]["docs"] == 8 and report[0]["p50_ms"] is not None
+    assert report[2]["p50_ms"] is None #whole-corpus stages report throughput only
+
+
+def test_compare_flags_throughput_regressions():
+    baseline = {"runs": [{"n": 100, "stages": [{"stage": "parse_resume", "docs_per_sec": 100.0}]}]}
+    current = {"runs": [{"n": 100, "stages": [{"stage": "parse_resume", "docs_per_sec": 80.0}]}]}
+    assert compare(current, baseline)[0].startswith("⚠️ parse_resume")
+    current["runs"][0]["stages"][0]["docs_per_sec"] = 95.0
+    assert not compare(current, baseline)[0].startswith("⚠️")
+
+
+def test_stage_memory_is_not_the_process_high_water_mark():
+    import numpy as np
+    from benchmark import _reset_peak_rss, stage_memory
+    from instrument import current_rss_mb
+
+    if not _reset_peak_rss():
+        pytest.skip("the RSS high-water mark cannot be reset on this platform")
+    big = np.ones(200 * 1024 * 1024 // 8) #200 MB touched and freed before the stage
+    earlier_peak = current_rss_mb()
+    del big
+    with stage_memory() as mem:
+        small = np.ones(20 * 1024 * 1024 // 8)
+    assert mem.result["rss_delta_mb"] > 10
+    assert mem.result["stage_peak_rss_mb"] < earlier_peak - 100
+    del small
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from conftest import ROOT  # noqa: E402
+from run_pipeline import build_pipeline  # noqa: E402
+
+DASHBOARD = os.path.join(ROOT, "support", "dashboard_streamlit.py")
+RESUMES = {
+    "a.txt": "Asha Rao\nasha@example.com\n6 years Apex, SOQL, Triggers and Flows",
+    "b.txt": "Ben Cole\nben@example.com\n2 years Lightning Web Components and Apex",
+    "c.txt": "Cy Das\ncy@example.com\n4 years Reports, Dashboards, Flows",
+}
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """A ranked corpus under tmp_path/data, laid out where the dashboard looks for it."""
+    import streamlit as st
+
+    st.cache_data.clear() #caches are per process and keyed by relative paths
+    st.cache_resource.clear()
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data/resumes")
+    for name, text in RESUMES.items():
+        with open(os.path.join("data/resumes", name), "w", encoding="utf-8") as f:
+            f.write(text)
+    with open("data/job_description.txt", "w", encoding="utf-8") as f:
+        f.write("Requirements:\n- Apex\n- SOQL\n3+ years\nPreferred:\n- Flows")
+    config = {"resume_dir": "data/resumes", "parsed_dir": "data/parsed", "features_dir": "data/features",
+              "index_dir": "data/index", "job_description": "data/job_description.txt",
+              "results_dir": "data/results", "scoring_config": None, "workers": 1}
+    build_pipeline(config).run()
+    return tmp_path
+
+
+def run_dashboard():
+    app = AppTest.from_file(DASHBOARD, default_timeout=60)
+    app.run()
+    assert not app.exception
+    return app
+
+
+def test_reruns_reuse_the_cached_query_layer(workspace, monkeypatch):
+    import result_query
+
+    opened = []
+
+    class CountingQuery(result_query.ResultQuery):
+        def __init__(self, *args, **kwargs):
+            opened.append(args)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(result_query, "ResultQuery", CountingQuery)
+    app = run_dashboard()
+    app.sidebar.slider[0].set_value((0.0, 1.0)).run() #a widget change reruns the whole script
+    assert not app.exception
+    assert len(opened) == 1
+
+
+def test_first_page_lists_the_ranked_candidates(workspace):
+    app = run_dashboard()
+    app.sidebar.slider[0].set_value((0.0, 1.0)).run()
+    table = app.dataframe[0].value
+    assert sorted(table["file"]) == ["a.json", "b.json", "c.json"]
+    assert list(table["score"]) == sorted(table["score"], reverse=True)
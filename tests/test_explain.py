@@ -0,0 +1,39 @@
+import numpy as np
+from scipy import sparse
+
+from explain import explain_candidates, top_term_contributions
+from feature_store import build_feature_store
+from match_and_rank import rank_hybrid
+from resume_index import ResumeIndex
+from scoring import JobProfile
+
+
+def test_top_terms_are_ordered_per_row():
+    matrix = sparse.csr_matrix(np.array([[0.5, 0.1, 0.8, 0.0], [0.0, 0.9, 0.0, 0.3], [0.0, 0.0, 0.0, 0.0]]))
+    q = sparse.csr_matrix(np.array([[1.0, 1.0, 0.5, 1.0]]))
+    offsets, ids, weights = top_term_contributions(matrix, q, k=2)
+    assert offsets.tolist() == [0, 2, 4, 4] #the empty row keeps its (empty) span
+    assert ids.tolist() == [0, 2, 1, 3]
+    assert np.allclose(weights, [0.5, 0.4, 0.9, 0.3])
+
+    exclude = np.array([True, False, False, False])
+    offsets, ids, _ = top_term_contributions(matrix, q, k=2, exclude=exclude)
+    assert ids[offsets[0]:offsets[1]].tolist() == [2, 1]
+    assert q.toarray()[0, 0] == 1.0 #the caller's query is untouched
+
+
+def test_stop_words_are_not_shown_but_still_score():
+    parsed = [{"file_name": "a.txt", "raw_text": "experience with the apex and soql for the team", "skills": ["apex", "soql"]},
+              {"file_name": "b.txt", "raw_text": "marketing and events", "skills": []}]
+    jd = "experience with the apex and soql for the team"
+    index = ResumeIndex.build(parsed)
+    q = index.transform_query(jd)
+    explained = explain_candidates(index.matrix, q, index.vectorizer.get_feature_names_out(), index.file_names,
+                                   None, JobProfile([], []))
+    assert set(explained["top_terms"][0]) <= {"experience", "apex", "soql", "team"}
+    assert "apex" in explained["top_terms"][0]
+    assert explained["top_terms"][1] == [] #"and" is its only shared term
+
+    rows = rank_hybrid(jd, index, build_feature_store(parsed))
+    assert rows[1]["similarity"] > 0 #the stop word still counts towards the score
+    assert np.isclose(rows[0]["similarity"], (index.matrix @ q.T).toarray()[0, 0])
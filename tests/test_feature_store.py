@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+
+from feature_store import build_feature_store, feature_store_exists, load_feature_store, save_feature_store
+
+PARSED = [
+    {"file_name": "a.txt", "name": "Asha Rao", "contacts": {"email": "asha@example.com"}, "years_experience": 5,
+     "skills": ["apex", "soql", "triggers"]},
+    {"file_name": "b.txt", "name": None, "contacts": {}, "years_experience": None,
+     "skills": ["lightning web components", "apex"]},
+    {"file_name": "c.txt", "skills": ["flows", "custom skill"]},
+]
+
+
+def test_skills_are_one_sparse_row_per_resume():
+    store = build_feature_store(PARSED)
+    assert len(store) == 3
+    assert store.skills.nnz == 7
+    assert store.skills_of(0) == ["apex", "soql", "triggers"]
+    assert "custom skill" in store.vocabulary #found in a resume but not in the default vocabulary
+    assert store.years_experience.tolist() == [5, 0, 0]
+
+
+def test_skill_queries():
+    store = build_feature_store(PARSED)
+    assert store.skill_overlap(["apex", "soql", "unknown"]).tolist() == [2, 1, 0]
+    assert store.filter(["apex"]).tolist() == [0, 1]
+    assert store.filter(["apex"], min_years=1).tolist() == [0]
+    assert store.filter(["unknown"]).tolist() == []
+    assert store.skill_counts(np.array([0, 1])) == {"apex": 2, "soql": 1, "triggers": 1, "lightning web components": 1}
+    assert store.row("c.txt") == 2
+
+
+def test_save_and_memory_mapped_load(tmp_path):
+    store = build_feature_store(PARSED)
+    save_feature_store(store, str(tmp_path))
+    assert feature_store_exists(str(tmp_path))
+    loaded = load_feature_store(str(tmp_path))
+    assert not loaded.skills.indices.flags.owndata #a view of the mapped file, not a copy
+    assert (loaded.skills != store.skills).nnz == 0
+    assert loaded.vocabulary == store.vocabulary
+    assert loaded.file_names.tolist() == ["a.txt", "b.txt", "c.txt"]
+    assert loaded.metadata["email"].tolist() == ["asha@example.com", "", ""]
+
+
+def test_saving_over_a_mapped_store_leaves_it_intact(tmp_path):
+    save_feature_store(build_feature_store(PARSED), str(tmp_path))
+    mapped = load_feature_store(str(tmp_path))
+    save_feature_store(build_feature_store(PARSED[:1]), str(tmp_path)) #files are replaced, not rewritten in place
+    assert mapped.file_names.tolist() == ["a.txt", "b.txt", "c.txt"]
+    assert mapped.skills_of(1) == ["apex", "lightning web components"]
+    assert len(load_feature_store(str(tmp_path))) == 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_store_json_always_names_arrays_of_the_same_save(tmp_path):
+    import json
+
+    save_feature_store(build_feature_store(PARSED), str(tmp_path))
+    before = (tmp_path / "store.json").read_text() #what a reader saw just before the next save
+    save_feature_store(build_feature_store(PARSED[:1]), str(tmp_path))
+    after = (tmp_path / "store.json").read_text()
+    assert json.loads(after)["generation"] != json.loads(before)["generation"]
+    (tmp_path / "store.json").write_text(before)
+    assert len(load_feature_store(str(tmp_path))) == 3 #the previous generation is still complete
+    (tmp_path / "store.json").write_text(after)
+
+    save_feature_store(build_feature_store(PARSED[:2]), str(tmp_path))
+    assert len([n for n in os.listdir(tmp_path) if n.startswith("gen-")]) == 2 #current and previous only
+    assert len(load_feature_store(str(tmp_path))) == 2
+
+
+def test_loads_stores_saved_before_generations(tmp_path):
+    import json
+
+    save_feature_store(build_feature_store(PARSED), str(tmp_path))
+    meta = json.loads((tmp_path / "store.json").read_text())
+    gen_dir = tmp_path / meta.pop("generation")
+    for name in os.listdir(gen_dir): #flat layout: arrays beside store.json
+        os.replace(gen_dir / name, tmp_path / name)
+    (tmp_path / "store.json").write_text(json.dumps(meta))
+    assert load_feature_store(str(tmp_path)).file_names.tolist() == ["a.txt", "b.txt", "c.txt"]
+
+    save_feature_store(build_feature_store(PARSED[:1]), str(tmp_path)) #moves it to the new layout
+    assert not [n for n in os.listdir(tmp_path) if n.endswith(".npy")]
+
+
+def test_upsert_and_remove_rows():
+    store = build_feature_store(PARSED[:2])
+    assert store.upsert([{"file_name": "a.txt", "skills": ["flows"], "years_experience": 6},
+                         {"file_name": "d.txt", "skills": ["brand new skill", "apex"]}]) == 2
+    assert store.file_names.tolist() == ["b.txt", "a.txt", "d.txt"]
+    assert store.skills_of(1) == ["flows"]
+    assert store.skills_of(2) == ["apex", "brand new skill"]
+    assert store.years_experience.tolist() == [0, 6, 0]
+    assert store.filter(["apex"]).tolist() == [0, 2]
+
+    assert store.remove(["b.txt", "missing.txt"]) == 1
+    assert store.file_names.tolist() == ["a.txt", "d.txt"]
+    assert store.row("d.txt") == 1
+    assert store.skill_counts() == {"flows": 1, "apex": 1, "brand new skill": 1}
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+import feature_store
+from ingest_daemon import IngestDaemon, _hash_and_parse
+from parse_resume import load_manifest
+from result_store import list_runs, read_results
+
+RESUMES = {
+    "a.txt": "Asha Rao\n6 years Apex, SOQL and Triggers",
+    "b.txt": "Ben Cole\n2 years Lightning Web Components",
+}
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path) #the text cache and other defaults are relative to the working directory
+    (tmp_path / "resumes").mkdir()
+    for name, text in RESUMES.items():
+        (tmp_path / "resumes" / name).write_text(text)
+    (tmp_path / "jd.txt").write_text("Requirements:\n- Apex\n- SOQL\n3+ years")
+    return IngestDaemon(str(tmp_path / "resumes"), str(tmp_path / "parsed"), str(tmp_path / "features"),
+                        str(tmp_path / "index"), str(tmp_path / "jd.txt"), str(tmp_path / "results"),
+                        workers=1, poll_interval=0.05, batch_wait=0.05, publish_interval=0.2)
+
+
+def upsert(daemon, name, text):
+    path = os.path.join(daemon.resume_dir, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    entry, record, _ = _hash_and_parse(path)
+    return ("upsert", name, entry, record)
+
+
+def test_batches_update_in_memory_state_and_publish_later(daemon, monkeypatch):
+    daemon.catch_up()
+    assert len(list_runs(daemon.results_dir)) == 1
+
+    built = []
+    build = feature_store.build_feature_store
+    monkeypatch.setattr(feature_store, "build_feature_store", lambda rows, *a: built.append(len(rows)) or build(rows, *a))
+    daemon.commit([upsert(daemon, "c.txt", "Cy Das\n4 years Apex and Flows"), ("delete", "b.txt", None, None)])
+    assert built == [1] #only the batch is vectorized
+    assert daemon.index.file_names == ["a.txt", "c.txt"]
+    assert daemon.store.file_names.tolist() == ["a.txt", "c.txt"]
+    assert len(list_runs(daemon.results_dir)) == 1 #nothing re-ranked until publish
+    assert daemon.dirty and daemon.publish_due() is not None
+
+    daemon.publish()
+    assert not daemon.dirty
+    assert sorted(read_results(daemon.results_dir)["file_name"]) == ["a.txt", "c.txt"]
+    assert set(load_manifest(daemon.parsed_dir)) == {"a.txt", "c.txt"}
+    with open(os.path.join(daemon.parsed_dir, "all_parsed.json"), encoding="utf-8") as f:
+        assert [r["file_name"] for r in json.load(f)] == ["a.txt", "c.txt"]
+
+
+def test_failed_parses_are_dropped_and_not_recorded(daemon):
+    daemon.catch_up()
+    daemon.commit([("upsert", "b.txt", {"sha256": "x"}, {"file_name": "b.txt", "error": "boom"})])
+    daemon.publish()
+    assert daemon.index.file_names == ["a.txt"]
+    assert "b.txt" not in load_manifest(daemon.parsed_dir)
+
+
+def test_watching_picks_up_a_new_resume(daemon):
+    async def scenario():
+        task = asyncio.create_task(daemon.run())
+        try:
+            await asyncio.sleep(0.3)
+            with open(os.path.join(daemon.resume_dir, "c.txt"), "w", encoding="utf-8") as f:
+                f.write("Cy Das\n4 years Apex and Flows")
+            for _ in range(200):
+                await asyncio.sleep(0.05)
+                if "c.txt" in set(read_results(daemon.results_dir)["file_name"]):
+                    return True
+            return False
+        finally:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    assert asyncio.run(scenario())
+
+
+def test_an_unreadable_file_does_not_stop_the_worker(daemon, capsys):
+    from concurrent.futures import ThreadPoolExecutor
+
+    daemon.manifest = {}
+    os.mkdir(os.path.join(daemon.resume_dir, "folder.txt")) #hashing raises IsADirectoryError
+
+    async def scenario():
+        queue, done = asyncio.Queue(), asyncio.Queue()
+        with ThreadPoolExecutor(1) as pool:
+            worker = asyncio.create_task(daemon.parse_worker(queue, done, pool))
+            await queue.put(("upsert", "folder.txt"))
+            await queue.put(("upsert", "a.txt"))
+            await queue.join()
+            worker.cancel()
+            await asyncio.gather(worker, return_exceptions=True)
+        return [item[1] for item in (done.get_nowait() for _ in range(done.qsize()))]
+
+    assert asyncio.run(scenario()) == ["a.txt"]
+    assert "Skipped folder.txt: IsADirectoryError" in capsys.readouterr().out
+
+
+def test_publish_rescores_only_changed_resumes(daemon, monkeypatch):
+    import match_and_rank
+    from match_and_rank import rank_hybrid, read_job_description
+
+    daemon.catch_up()
+    scored = []
+    monkeypatch.setattr(match_and_rank, "rank_hybrid",
+                        lambda *a, rows=None, **k: scored.append(len(rows)) or rank_hybrid(*a, rows=rows, **k))
+    daemon.commit([upsert(daemon, "c.txt", "Cy Das\n4 years Apex and Flows")])
+    daemon.publish()
+    assert scored == [1]
+
+    full = rank_hybrid(read_job_description(daemon.job_description), daemon.index, daemon.store, *daemon.score_config)
+    frame = read_results(daemon.results_dir, columns=["file_name", "score"])
+    expected = sorted(full, key=lambda r: r["score"], reverse=True)
+    assert frame["file_name"].tolist() == [r["file_name"] for r in expected]
+    assert frame["score"].tolist() == pytest.approx([r["score"] for r in expected])
+
+    with open(daemon.job_description, "a", encoding="utf-8") as f:
+        f.write("\nNice to have: Flows")
+    daemon.publish()
+    assert scored == [1, 3] #a new JD re-scores everything
+
+
+def test_publish_backs_off_with_its_own_duration(daemon):
+    daemon.catch_up()
+    daemon.dirty, daemon.publish_seconds = True, 1.0
+    assert daemon.publish_due() > daemon.publish_interval #4 x 1s beats the 0.2s interval
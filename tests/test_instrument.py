@@ -0,0 +1,75 @@
+import pytest
+
+import instrument
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    was_enabled, slowest = instrument.STATE.enabled, instrument.STATE.slowest
+    instrument.STATE.reset()
+    yield
+    instrument.STATE.reset()
+    instrument.STATE.enabled, instrument.STATE.slowest = was_enabled, slowest
+
+
+def test_disabled_instrumentation_records_nothing():
+    instrument.disable()
+
+    @instrument.timed("stage")
+    def stage(x):
+        return x + 1
+
+    assert stage(1) == 2
+    instrument.count("docs")
+    with instrument.span("block"):
+        pass
+    assert instrument.export()["timers"] == {} and instrument.export()["counters"] == {}
+
+
+def test_nested_spans_build_timers_and_stacks(tmp_path):
+    instrument.enable()
+
+    @instrument.timed(per_document=True)
+    def parse(path):
+        with instrument.span("extract"):
+            return path
+
+    with instrument.span("run"):
+        for path in ["a.pdf", "b.pdf", "c.pdf"]:
+            parse(path)
+    instrument.count("docs", 3)
+
+    data = instrument.export()
+    assert data["timers"]["parse"]["calls"] == 3 and data["timers"]["run"]["calls"] == 1
+    assert set(data["stacks"]) == {"run", "run;parse", "run;parse;extract"}
+    assert data["counters"] == {"docs": 3}
+    assert sorted(d["document"] for d in data["slowest_documents"]) == ["a.pdf", "b.pdf", "c.pdf"]
+
+    out = tmp_path / "p.collapsed"
+    instrument.dump_collapsed(str(out))
+    for line in out.read_text().splitlines():
+        key, micros = line.rsplit(" ", 1)
+        assert key in data["stacks"] and int(micros) >= 0
+
+
+def test_slowest_documents_keeps_the_top_n():
+    instrument.enable(slowest=2)
+    for doc, secs in [("a", 0.1), ("b", 0.5), ("c", 0.3), ("d", 0.05)]:
+        instrument.record_document(doc, secs)
+    assert instrument.slowest_documents() == [(0.5, "b"), (0.3, "c")]
+
+
+def test_drain_and_merge_combine_worker_data():
+    instrument.enable()
+    with instrument.span("parse"):
+        pass
+    instrument.count("docs", 2)
+    worker = instrument.drain()
+    assert instrument.export()["timers"] == {} #drain clears
+
+    instrument.count("docs", 1)
+    instrument.merge(worker)
+    instrument.merge(worker)
+    data = instrument.export()
+    assert data["counters"] == {"docs": 5}
+    assert data["timers"]["parse"]["calls"] == 2
@@ -0,0 +1,97 @@
+import numpy as np
+
+from match_and_rank import rank_batch, top_k_rows
+from resume_index import ResumeIndex
+
+
+def corpus(n=30):
+    words = ["apex", "soql", "flows", "lightning", "reports", "heroku", "mulesoft", "jira", "git", "cpq"]
+    rng = np.random.default_rng(0)
+    return [{"file_name": f"r{i:02d}.txt", "raw_text": " ".join(rng.choice(words, 12)), "skills": []}
+            for i in range(n)]
+
+
+def test_top_k_rows_orders_each_row():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.3, 0.2, 0.8, 0.1]])
+    idx, vals = top_k_rows(scores, 2)
+    assert idx.tolist() == [[1, 3], [2, 0]]
+    assert np.allclose(vals, [[0.9, 0.7], [0.8, 0.3]])
+    assert top_k_rows(scores, 10)[0].shape == (2, 4) #k is capped at the number of resumes
+
+
+def test_rank_batch_matches_one_query_per_jd():
+    index = ResumeIndex.build(corpus())
+    jds = ["apex soql triggers", "lightning reports", "heroku mulesoft git"]
+    columns = rank_batch(jds, index, top_k=5, chunk_size=2) #chunk boundary inside the batch
+    assert columns["jd"].tolist() == [0] * 5 + [1] * 5 + [2] * 5
+    assert columns["rank"].tolist() == [1, 2, 3, 4, 5] * 3
+    for j, jd in enumerate(jds):
+        expected = np.sort(index.query(jd))[::-1][:5]
+        assert np.allclose(columns["similarity"][columns["jd"] == j], expected, atol=1e-6)
+
+
+def test_rank_batch_without_jds():
+    columns = rank_batch([], ResumeIndex.build(corpus(3)))
+    assert all(len(col) == 0 for col in columns.values())
+
+
+def test_join_with_features_keys_on_file_name(capsys):
+    import pandas as pd
+    from match_and_rank import join_with_features
+
+    sim = [{"file_name": "a.txt", "similarity": 0.2}, {"file_name": "b.txt", "similarity": 0.9},
+           {"file_name": "x.txt", "similarity": 0.5}]
+    features = pd.DataFrame({"file_name": ["b.txt", "a.txt", "a.txt", "c.txt"], "name": ["Ben", "Asha", "dup", "Cy"],
+                             "years_experience": [2.0, 5.0, 1.0, 3.0]})
+    ranked = join_with_features(sim, features)
+    assert [r["file_name"] for r in ranked] == ["b.txt", "x.txt", "a.txt"]
+    assert ranked[2]["name"] == "Asha" #first of the duplicate rows
+    assert ranked[1]["name"] is None and ranked[1]["years_experience"] is None #no NaN in the output
+    out = capsys.readouterr().out
+    assert "1 duplicate file_name" in out
+    assert "1 resumes without features: x.txt" in out
+    assert "1 resumes with features but no score: c.txt" in out
+
+
+def test_join_with_features_without_a_csv(tmp_path):
+    from match_and_rank import join_with_features
+
+    ranked = join_with_features([{"file_name": "a.txt", "score": 0.1}, {"file_name": "b.txt", "score": 0.3}],
+                                str(tmp_path / "missing.csv"))
+    assert [r["file_name"] for r in ranked] == ["b.txt", "a.txt"]
+
+
+def write_parsed(parsed_dir, records):
+    import json
+
+    parsed_dir.mkdir()
+    for r in records:
+        (parsed_dir / f"{r['file_name'][:-4]}.json").write_text(json.dumps(r))
+    (parsed_dir / "all_parsed.json").write_text(json.dumps(records)) #aggregate, skipped by the loader
+    (parsed_dir / "zz_failed.json").write_text(json.dumps({"file_name": "zz_failed.pdf", "error": "boom"}))
+
+
+def test_stream_similarity_with_a_fitted_vocabulary(tmp_path):
+    from match_and_rank import stream_similarity
+
+    records = corpus(25)
+    write_parsed(tmp_path / "parsed", records)
+    index = ResumeIndex.build(records)
+    names, scores = stream_similarity("apex soql flows", str(tmp_path / "parsed"), index.vectorizer, chunk_size=4)
+    assert names == index.file_names
+    assert np.allclose(scores, index.query("apex soql flows"), atol=1e-6)
+
+
+def test_stream_similarity_hashing_matches_a_corpus_fit(tmp_path):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from match_and_rank import stream_similarity
+    from resume_index import resume_document
+
+    records = corpus(25)
+    write_parsed(tmp_path / "parsed", records)
+    names, scores = stream_similarity("apex soql salesforce", str(tmp_path / "parsed"), chunk_size=7)
+    vectorizer = TfidfVectorizer().fit([resume_document(r) for r in records])
+    expected = (vectorizer.transform([resume_document(r) for r in records])
+                @ vectorizer.transform(["apex soql salesforce"]).T).toarray().ravel()
+    assert len(names) == 25
+    assert np.allclose(scores, expected, atol=1e-5)
@@ -0,0 +1,90 @@
+import os
+
+import pytest
+
+import parse_resume as pr
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.fixture
+def dirs(tmp_path):
+    resumes, parsed = tmp_path / "resumes", tmp_path / "parsed"
+    resumes.mkdir()
+    write(resumes / "a.txt", "Asha Rao\nasha@example.com\n5 years Apex, SOQL")
+    write(resumes / "b.txt", "Ben Cole\nben@example.com\n2 years Lightning Web Components")
+    return str(resumes), str(parsed)
+
+
+def parse(dirs):
+    return pr.parse_resumes_batch(dirs[0], dirs[1], workers=1, cache_dir=None)
+
+
+def test_second_run_reuses_manifest_without_hashing(dirs, monkeypatch):
+    first = parse(dirs)
+    assert [r["file_name"] for r in first] == ["a.txt", "b.txt"]
+    assert set(pr.load_manifest(dirs[1])) == {"a.txt", "b.txt"}
+
+    def no_hashing(path):
+        raise AssertionError(f"{path} was hashed although its size and mtime are unchanged")
+
+    monkeypatch.setattr(pr, "file_sha256", no_hashing)
+    monkeypatch.setattr(pr, "parse_resume", lambda *a, **k: pytest.fail("unchanged resume re-parsed"))
+    assert parse(dirs) == first
+
+
+def test_changed_and_deleted_files(dirs):
+    parse(dirs)
+    write(os.path.join(dirs[0], "a.txt"), "Asha Rao\nasha@example.com\n7 years Apex, SOQL, Visualforce")
+    os.remove(os.path.join(dirs[0], "b.txt"))
+
+    records = parse(dirs)
+    assert [r["file_name"] for r in records] == ["a.txt"]
+    assert records[0]["years_experience"] == 7
+    assert "visualforce" in records[0]["skills"]
+    assert set(pr.load_manifest(dirs[1])) == {"a.txt"}
+    assert not os.path.exists(pr.parsed_output_path(dirs[1], "b.txt"))
+
+
+def test_error_records_are_retried(dirs, monkeypatch):
+    read = pr.read_text_from_file
+
+    def flaky(path, **kwargs):
+        if path.endswith("b.txt"):
+            raise ImportError("pdfminer.six is not installed")
+        return read(path, **kwargs)
+
+    monkeypatch.setattr(pr, "read_text_from_file", flaky)
+    records = parse(dirs)
+    assert "error" in records[1]
+    assert set(pr.load_manifest(dirs[1])) == {"a.txt"}
+
+    monkeypatch.setattr(pr, "read_text_from_file", read)
+    records = parse(dirs)
+    assert "error" not in records[1]
+    assert set(pr.load_manifest(dirs[1])) == {"a.txt", "b.txt"}
+
+
+def test_full_reparse_still_removes_deleted_resumes(dirs, monkeypatch):
+    read = pr.read_text_from_file
+
+    def flaky(path, **kwargs):
+        if path.endswith("b.txt"):
+            raise OSError("locked")
+        return read(path, **kwargs)
+
+    write(os.path.join(dirs[0], "c.txt"), "Cy Das\n3 years Flows")
+    monkeypatch.setattr(pr, "read_text_from_file", flaky)
+    parse(dirs) #b.txt fails, so only the combined output lists it
+    assert set(pr.load_manifest(dirs[1])) == {"a.txt", "c.txt"}
+    monkeypatch.setattr(pr, "read_text_from_file", read)
+    os.remove(os.path.join(dirs[0], "b.txt"))
+    os.remove(os.path.join(dirs[0], "c.txt"))
+
+    records = pr.parse_resumes_batch(dirs[0], dirs[1], workers=1, incremental=False, cache_dir=None)
+    assert [r["file_name"] for r in records] == ["a.txt"]
+    assert sorted(f for f in os.listdir(dirs[1]) if f.endswith(".json")) == ["a.json", "all_parsed.json"]
+    assert set(pr.load_manifest(dirs[1])) == {"a.txt"}
@@ -0,0 +1,100 @@
+import pytest
+
+from result_query import ResultQuery, build_result_db
+
+
+@pytest.fixture
+def query(tmp_path):
+    results = [{"file_name": f"r{i:02d}.txt", "score": s, "similarity": s, "required_overlap": 1.0 - s,
+                "preferred_overlap": 0.0, "experience_fit": 0.5, "years_experience": float(i % 5)}
+               for i, s in enumerate([0.9, 0.8, 0.8, 0.7, 0.6, 0.5, 0.4, 0.3, 0.2, 0.1])]
+    skills = {f"r{i:02d}.txt": ["apex"] + (["soql"] if i % 2 == 0 else []) for i in range(10)}
+    db = str(tmp_path / "results.sqlite")
+    build_result_db(results, skills, db)
+    q = ResultQuery(db)
+    yield q
+    q.close()
+
+
+def all_pages(query, **kwargs):
+    names, cursor = [], None
+    while True:
+        rows, cursor = query.page(cursor=cursor, **kwargs)
+        names += [r["file_name"] for r in rows]
+        if cursor is None:
+            return names
+
+
+def test_keyset_pages_cover_every_row_once_in_order(query):
+    rows, cursor = query.page(page_size=3)
+    assert [r["file_name"] for r in rows] == ["r00.txt", "r02.txt", "r01.txt"] #ties broken by id, descending
+    assert cursor == (0.8, 1)
+    assert all_pages(query, page_size=3) == [f"r{i:02d}.txt" for i in (0, 2, 1, 3, 4, 5, 6, 7, 8, 9)]
+    assert all_pages(query, page_size=4, descending=False)[:2] == ["r09.txt", "r08.txt"]
+
+
+def test_filters(query):
+    assert all_pages(query, min_score=0.5, max_score=0.8, page_size=2) == ["r02.txt", "r01.txt", "r03.txt", "r04.txt", "r05.txt"]
+    assert all_pages(query, required_skills=["soql"], min_years=3) == ["r04.txt", "r08.txt"]
+    assert all_pages(query, required_skills=["missing"]) == []
+    with pytest.raises(ValueError):
+        query.page(sort_by="name")
+
+
+def test_reweighting_changes_the_order(query):
+    rows, _ = query.page(page_size=1, weights={"required_overlap": 1.0})
+    assert rows[0]["file_name"] == "r09.txt"
+    assert rows[0]["score"] == pytest.approx(0.9)
+
+
+def test_skill_counts_cover_the_filtered_set_not_a_page(query):
+    assert query.skill_counts() == [("apex", 10), ("soql", 5)]
+    assert query.skill_counts(min_score=0.6) == [("apex", 5), ("soql", 3)]
+    assert query.skill_counts(required_skills=["soql"]) == [("apex", 5), ("soql", 5)]
+
+
+def test_all_skills_and_missing_explanation(query):
+    assert query.all_skills() == ["apex", "soql"]
+    assert query.explanation("r00.txt") is None
+
+
+def test_result_db_takes_contacts_and_skills_from_the_feature_store(tmp_path):
+    import numpy as np
+    from feature_store import build_feature_store, save_feature_store
+    from result_query import ensure_result_db
+    from result_store import write_run
+
+    parsed = [{"file_name": "a.txt", "name": "Asha Rao", "years_experience": 5, "skills": ["apex", "soql"]},
+              {"file_name": "b.txt", "name": "Ben Cole", "years_experience": 2, "skills": ["flows"]}]
+    save_feature_store(build_feature_store(parsed), str(tmp_path / "features"))
+    write_run(["b.txt", "a.txt"], np.array([0.9, 0.4]), "jd", results_dir=str(tmp_path / "results"))
+    db = str(tmp_path / "results.sqlite")
+
+    assert ensure_result_db(str(tmp_path / "results"), str(tmp_path / "features"), db) #no parsed output needed
+    assert not ensure_result_db(str(tmp_path / "results"), str(tmp_path / "features"), db)
+    q = ResultQuery(db)
+    try:
+        rows, _ = q.page(required_skills=["soql"])
+        assert [(r["file_name"], r["name"], r["years_experience"]) for r in rows] == [("a.txt", "Asha Rao", 5.0)]
+        assert q.all_skills() == ["apex", "flows", "soql"]
+    finally:
+        q.close()
+
+
+def test_result_db_ignores_top_k_runs(tmp_path):
+    import numpy as np
+    from result_query import ensure_result_db
+    from result_store import write_run
+
+    results, db = str(tmp_path / "results"), str(tmp_path / "results.sqlite")
+    write_run(["a.txt", "b.txt", "c.txt"], np.array([0.9, 0.5, 0.1]), "jd", results_dir=results,
+              run_id="20240101T000000000000000", metadata={"jd_id": "jd", "mode": "full"})
+    assert ensure_result_db(results, str(tmp_path / "features"), db)
+    write_run(["a.txt"], np.array([0.9]), "jd", results_dir=results, run_id="20240102T000000000000000",
+              metadata={"jd_id": "jd", "mode": "top_k"})
+    assert not ensure_result_db(results, str(tmp_path / "features"), db) #still the full run
+    q = ResultQuery(db)
+    try:
+        assert [r["file_name"] for r in q.page()[0]] == ["a.txt", "b.txt", "c.txt"]
+    finally:
+        q.close()
@@ -0,0 +1,61 @@
+import numpy as np
+
+import result_store
+from result_store import (latest_full_run, latest_run, list_runs, new_run_id, prune_runs, read_all_runs, read_results, run_columns,
+                          run_metadata, write_run)
+
+
+def test_run_ids_sort_in_time_order(monkeypatch):
+    clock = iter([1_700_000_000_999_999_999, 1_700_000_001_000_000_001])
+    monkeypatch.setattr(result_store.time, "time_ns", lambda: next(clock))
+    first, second = new_run_id(), new_run_id()
+    assert first == "20231114T221320999999999"
+    assert first < second
+
+
+def test_write_and_read_back_columns(tmp_path):
+    results = str(tmp_path)
+    run_id = write_run(["a.txt", "b.txt"], np.array([0.7, 0.5]), "jd1", results_dir=results,
+                       components={"similarity": np.array([0.8, 0.4])}, metadata={"scoring": {"w": 1}})
+    assert latest_run(results) == run_id
+    frame = read_results(results, columns=["file_name", "rank", "score", "bucket", "similarity", "required_overlap"])
+    assert frame["file_name"].tolist() == ["a.txt", "b.txt"]
+    assert frame["rank"].tolist() == [1, 2]
+    assert frame["bucket"].astype(str).tolist() == ["Highly Relevant", "Moderate"]
+    assert frame["required_overlap"].isna().all() #components the run did not compute are null
+    assert run_metadata(run_id, results) == {"scoring": {"w": 1}}
+    assert "top_terms" in run_columns(run_id, results)
+
+
+def test_batch_runs_filter_by_jd(tmp_path):
+    results = str(tmp_path)
+    write_run(["a.txt", "b.txt", "a.txt"], np.array([0.9, 0.3, 0.2]), ["jd1", "jd1", "jd2"],
+              ranks=np.array([1, 2, 1]), results_dir=results)
+    assert read_results(results, jd_id="jd2")["file_name"].tolist() == ["a.txt"]
+
+
+def test_prune_keeps_the_newest_runs(tmp_path):
+    results = str(tmp_path)
+    ids = [write_run(["a.txt"], np.array([0.5]), "jd", results_dir=results, run_id=f"2024010{i}T000000000000000")
+           for i in range(1, 5)]
+    assert list_runs(results) == ids
+    assert len(read_all_runs(results, columns=["run_id"])) == 4
+    assert prune_runs(2, results) == ids[:2]
+    assert list_runs(results) == ids[2:]
+    assert read_results(str(tmp_path / "empty"), columns=["file_name"]).empty
+
+
+def test_latest_full_run_skips_top_k_and_batch_runs(tmp_path):
+    results = str(tmp_path)
+    legacy = write_run(["a.txt"], np.array([0.5]), "jd", results_dir=results, run_id="20240101T000000000000000")
+    assert latest_full_run(results) == legacy #runs without a recorded mode count as full
+    full = write_run(["a.txt", "b.txt"], np.array([0.6, 0.2]), "jd", results_dir=results, run_id="20240102T000000000000000",
+                     metadata={"jd_id": "jd", "mode": "full"})
+    write_run(["a.txt"], np.array([0.6]), "jd", results_dir=results, run_id="20240103T000000000000000",
+              metadata={"jd_id": "jd", "mode": "top_k"})
+    write_run(["a.txt", "a.txt"], np.array([0.6, 0.3]), ["jd", "jd2"], results_dir=results,
+              run_id="20240104T000000000000000", metadata={"jd_id": None, "mode": "batch"})
+    assert latest_run(results) != full
+    assert latest_full_run(results) == full
+    assert prune_runs(1, results) == [legacy, "20240103T000000000000000"] #the dashboard's run is kept
+    assert latest_full_run(results) == full
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from resume_index import ResumeIndex, load_or_build_index
+
+
+def record(name, text, skills=()):
+    return {"file_name": name, "raw_text": text, "skills": list(skills)}
+
+
+RECORDS = [
+    record("a.txt", "Apex developer building triggers and batch jobs", ["apex", "triggers"]),
+    record("b.txt", "Lightning web components and JavaScript front end", ["lightning web components"]),
+    record("c.txt", "Salesforce administrator: flows, reports, dashboards", ["flows", "reports"]),
+]
+
+
+def test_query_is_cosine_similarity_against_the_fitted_vocabulary():
+    index = ResumeIndex.build(RECORDS)
+    scores = index.query("Apex triggers")
+    assert scores.shape == (3,)
+    assert np.argmax(scores) == 0
+    assert np.allclose(scores, index.matrix @ index.transform_query("Apex triggers").toarray().ravel())
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = ResumeIndex.build(RECORDS)
+    index.save(str(tmp_path))
+    assert ResumeIndex.exists(str(tmp_path))
+    loaded = ResumeIndex.load(str(tmp_path))
+    assert loaded.file_names == index.file_names
+    assert np.allclose(loaded.query("flows and reports"), index.query("flows and reports"))
+
+
+def test_upsert_transforms_new_and_changed_rows_only():
+    index = ResumeIndex.build(RECORDS)
+    vocabulary = dict(index.vectorizer.vocabulary_)
+    assert index.upsert(RECORDS) == 0
+
+    changed = record("a.txt", "Visualforce pages and SOQL", ["visualforce", "soql"])
+    assert index.upsert([changed, record("d.txt", "Apex triggers", ["apex"])]) == 2
+    assert index.vectorizer.vocabulary_ == vocabulary #no refit
+    assert index.file_names == ["b.txt", "c.txt", "a.txt", "d.txt"]
+    assert index.position("d.txt") == 3
+    assert index.file_names[int(np.argmax(index.query("apex triggers")))] == "d.txt"
+
+
+def test_sync_drops_missing_resumes(tmp_path):
+    index = load_or_build_index(RECORDS, str(tmp_path))
+    synced = load_or_build_index(RECORDS[1:], str(tmp_path))
+    assert synced.file_names == ["b.txt", "c.txt"]
+    assert synced.matrix.shape[0] == 2
+    assert ResumeIndex.load(str(tmp_path)).file_names == ["b.txt", "c.txt"]
+    assert synced.remove(["missing.txt"]) == 0
+    assert index.sync(RECORDS) is False
+
+
+@pytest.mark.parametrize("rebuild", [True, False])
+def test_load_or_build_index(tmp_path, rebuild):
+    load_or_build_index(RECORDS, str(tmp_path))
+    index = load_or_build_index(RECORDS, str(tmp_path), rebuild=rebuild)
+    assert index.file_names == ["a.txt", "b.txt", "c.txt"]
+
+
+def test_save_swaps_files_in_and_keeps_an_unchanged_vectorizer(tmp_path):
+    import os
+
+    index = ResumeIndex.build(RECORDS)
+    index.save(str(tmp_path))
+    pickle_mtime = os.stat(tmp_path / "vectorizer.pkl").st_mtime_ns
+    index.upsert([record("d.txt", "Apex and flows")]) #same fit, new rows
+    index.save(str(tmp_path))
+    assert os.stat(tmp_path / "vectorizer.pkl").st_mtime_ns == pickle_mtime
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+    assert ResumeIndex.load(str(tmp_path)).file_names == ["a.txt", "b.txt", "c.txt", "d.txt"]
+
+
+def test_load_refuses_files_from_two_different_saves(tmp_path):
+    ResumeIndex.build(RECORDS).save(str(tmp_path / "old"))
+    ResumeIndex.build(RECORDS[:2]).save(str(tmp_path))
+    (tmp_path / "keys.json").write_bytes((tmp_path / "old" / "keys.json").read_bytes()) #keys of another save
+    with pytest.raises(ValueError):
+        ResumeIndex.load(str(tmp_path), attempts=1)
+
+
+def test_unchanged_parsed_dir_skips_reading_resumes(tmp_path, monkeypatch):
+    import json
+
+    import match_and_rank
+
+    parsed = tmp_path / "parsed"
+    parsed.mkdir()
+    for r in RECORDS:
+        (parsed / r["file_name"].replace(".txt", ".json")).write_text(json.dumps(r))
+    index_dir = str(tmp_path / "index")
+    assert len(match_and_rank.load_index_for(str(parsed), index_dir)) == 3
+
+    monkeypatch.setattr(match_and_rank, "load_parsed_texts", lambda d: pytest.fail("resumes were read again"))
+    assert len(match_and_rank.load_index_for(str(parsed), index_dir)) == 3
+
+    monkeypatch.undo()
+    (parsed / "d.json").write_text(json.dumps(record("d.txt", "Apex and flows")))
+    assert match_and_rank.load_index_for(str(parsed), index_dir).file_names[-1] == "d.txt"
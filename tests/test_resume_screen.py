@@ -0,0 +1,40 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+import resume_screen
+import warm_server
+
+
+def test_socket_path_does_not_depend_on_the_working_directory(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+    fallback = importlib.reload(warm_server).SOCKET_PATH
+    assert os.path.isabs(fallback) and not fallback.startswith(str(tmp_path))
+
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    assert importlib.reload(warm_server).SOCKET_PATH == os.path.join(str(tmp_path), "resume-screen.sock")
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    importlib.reload(warm_server)
+
+
+def test_no_server_means_the_command_runs_locally(tmp_path):
+    assert warm_server.request(["match", "--help"], str(tmp_path / "missing.sock")) is None
+    assert not warm_server.ping(str(tmp_path / "missing.sock"))
+
+
+def test_usage_and_unknown_command(capsys):
+    assert resume_screen.main([]) == 0
+    out = capsys.readouterr().out
+    assert out.startswith("usage: resume-screen") and all(name in out for name in resume_screen.COMMANDS)
+    assert resume_screen.main(["--cold", "nope"]) == 2
+    assert "Unknown command: nope" in capsys.readouterr().out
+
+
+def test_cli_entry_point_exits_with_the_command_code(monkeypatch):
+    monkeypatch.setattr(sys, "argv", ["resume-screen", "--cold", "match", "--help"])
+    with pytest.raises(SystemExit) as exc:
+        resume_screen.cli()
+    assert exc.value.code == 0
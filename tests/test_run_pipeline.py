@@ -0,0 +1,66 @@
+import os
+
+from run_pipeline import Pipeline, Stage, build_pipeline
+
+
+def toy_pipeline(tmp_path, calls, source="v1"):
+    out = tmp_path / "out.txt"
+
+    def run_a(cfg):
+        calls.append("a")
+        return cfg["source"]
+
+    def run_b(cfg, a):
+        calls.append("b")
+        out.write_text(a)
+        return a.upper()
+
+    stages = [
+        Stage("a", [], lambda cfg: cfg["source"], run_a, lambda cfg: cfg["source"], lambda cfg: []),
+        Stage("b", ["a"], lambda cfg: "b", run_b, lambda cfg: out.read_text().upper(), lambda cfg: [str(out)]),
+    ]
+    return Pipeline(stages, {"source": source}, state_file=str(tmp_path / "state.json"))
+
+
+def test_unchanged_stages_are_skipped(tmp_path):
+    calls = []
+    toy_pipeline(tmp_path, calls).run()
+    assert calls == ["a", "b"]
+
+    pipeline = toy_pipeline(tmp_path, calls)
+    pipeline.run()
+    assert calls == ["a", "b"]
+    assert [r["status"] for r in pipeline.report] == ["skipped", "skipped"]
+    assert pipeline.value("b") == "V1" #loaded from the artifact on demand
+
+
+def test_changed_input_reruns_downstream_stages(tmp_path):
+    calls = []
+    toy_pipeline(tmp_path, calls).run()
+    toy_pipeline(tmp_path, calls, source="v2").run()
+    assert calls == ["a", "b", "a", "b"]
+
+    os.remove(tmp_path / "out.txt") #missing artifact forces its stage to run
+    toy_pipeline(tmp_path, calls, source="v2").run()
+    assert calls[-1:] == ["b"]
+
+
+def test_failed_parses_are_not_indexed(tmp_path, monkeypatch):
+    from resume_index import ResumeIndex
+
+    monkeypatch.chdir(tmp_path)
+    resumes = tmp_path / "resumes"
+    resumes.mkdir()
+    (resumes / "a.txt").write_text("Asha Rao\n5 years Apex, SOQL and Flows")
+    (resumes / "b.txt").write_text("Ben Cole\n3 years Lightning Web Components")
+    (resumes / "broken.pdf").write_bytes(b"not a pdf")
+    (tmp_path / "jd.txt").write_text("Requirements:\n- Apex\n- SOQL\n3+ years")
+    config = {"resume_dir": str(resumes), "parsed_dir": str(tmp_path / "parsed"),
+              "features_dir": str(tmp_path / "features"), "index_dir": str(tmp_path / "index"),
+              "job_description": str(tmp_path / "jd.txt"), "results_dir": str(tmp_path / "results"),
+              "scoring_config": None, "workers": 1}
+
+    values = build_pipeline(config).run()
+    assert any("error" in r for r in values["parse"])
+    assert ResumeIndex.load(config["index_dir"]).file_names == ["a.txt", "b.txt"]
+    assert [r["file_name"] for r in values["match"]] == ["a.txt", "b.txt"]
@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+import pytest
+
+from feature_store import build_feature_store
+from match_and_rank import rank_hybrid
+from resume_index import ResumeIndex
+from scoring import BUCKETS, ScoringConfig, bucketize_array, combine, extract_job_profile
+
+JD = """Salesforce Developer
+Requirements:
+- 4+ years with Apex and SOQL
+Preferred:
+- Lightning Web Components
+- Experience with Jira is a plus
+"""
+
+PARSED = [
+    {"file_name": "full.txt", "raw_text": "apex soql developer lightning web components", "years_experience": 6,
+     "skills": ["apex", "soql", "lightning web components"]},
+    {"file_name": "junior.txt", "raw_text": "apex soql developer", "years_experience": 1, "skills": ["apex", "soql"]},
+    {"file_name": "none.txt", "raw_text": "marketing campaigns and events", "years_experience": 8, "skills": []},
+]
+
+
+def test_job_profile_splits_required_and_preferred():
+    profile = extract_job_profile(JD)
+    assert profile.required == ["apex", "soql"]
+    assert "lightning web components" in profile.preferred and "jira" in profile.preferred
+    assert profile.min_years == 4.0
+
+
+def test_job_without_sections_requires_every_skill():
+    profile = extract_job_profile("Looking for Apex, SOQL and Jira experience.")
+    assert profile.required == ["apex", "jira", "soql"] and profile.preferred == []
+    assert profile.min_years is None
+
+
+def test_scoring_config_validation_and_load(tmp_path):
+    with pytest.raises(ValueError):
+        ScoringConfig({"charisma": 1.0})
+    path = tmp_path / "scoring.json"
+    path.write_text(json.dumps({"weights": {"similarity": 1.0}, "thresholds": [0.3, 0.8]}))
+    config = ScoringConfig.load(str(path))
+    assert config.weights["similarity"] == 1.0 and config.weights["required_overlap"] == 0.25
+    assert config.thresholds == (0.3, 0.8)
+    assert ScoringConfig.load(None).to_dict() == ScoringConfig().to_dict()
+
+
+def test_combine_normalises_weights_and_buckets():
+    components = np.array([[1.0, 1.0, 1.0, 1.0], [0.5, 0.0, 0.0, 0.0]], dtype=np.float32)
+    scores = combine(components, {"similarity": 2.0, "required_overlap": 2.0, "preferred_overlap": 0, "experience_fit": 0})
+    assert np.allclose(scores, [1.0, 0.25])
+    assert np.allclose(combine(components, {c: 0 for c in ("similarity",)}), components[:, 0]) #all-zero falls back to similarity
+    assert bucketize_array(np.array([0.1, 0.45, 0.64, 0.65, 1.0])).tolist() == [0, 1, 1, 2, 2]
+
+
+def test_rank_hybrid_prefers_the_complete_candidate():
+    index = ResumeIndex.build(PARSED)
+    rows = rank_hybrid(JD, index, build_feature_store(PARSED))
+    ranked = sorted(rows, key=lambda r: -r["score"])
+    assert [r["file_name"] for r in ranked] == ["full.txt", "junior.txt", "none.txt"]
+    full, junior = ranked[0], ranked[1]
+    assert full["required_overlap"] == junior["required_overlap"] == 1.0
+    assert full["experience_fit"] == 1.0 and junior["experience_fit"] == pytest.approx(0.25)
+    assert all(r["bucket"] in BUCKETS for r in rows)
+
+    similarity_only = rank_hybrid(JD, index, build_feature_store(PARSED), ScoringConfig({
+        "similarity": 1.0, "required_overlap": 0, "preferred_overlap": 0, "experience_fit": 0}))
+    assert [r["score"] for r in similarity_only] == pytest.approx([r["similarity"] for r in rows])
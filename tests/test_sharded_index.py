@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from sharded_index import ShardedIndex, synthetic_index
+
+
+def exact_top_k(index, q, k):
+    scores = (index.matrix @ q.T).toarray().ravel()
+    order = np.argsort(-scores, kind="stable")[:k]
+    return scores[order]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return synthetic_index(120, n_features=400, nnz_per_row=20)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_sharded_search_matches_exact_top_k(index, tmp_path, workers):
+    with ShardedIndex.sync(index, str(tmp_path), shard_size=25, workers=workers) as sharded:
+        assert len(sharded) == 120 and len(sharded.shards) == 5
+        for row in (0, 57, 119):
+            q = index.matrix[row]
+            hits = sharded.search_vector(q, 10)
+            assert hits[0][1] == index.file_names[row]
+            assert np.allclose([score for score, _ in hits], exact_top_k(index, q, 10), atol=1e-5)
+    assert sharded._pool is None #the context manager shut the pool down
+
+
+def test_sync_rewrites_only_changed_shards(index, tmp_path, capsys):
+    ShardedIndex.sync(index, str(tmp_path), shard_size=50)
+    assert "Rewrote 3 of 3 shards" in capsys.readouterr().out
+    ShardedIndex.sync(index, str(tmp_path), shard_size=50)
+    assert "Rewrote" not in capsys.readouterr().out
+
+    changed = synthetic_index(120, n_features=400, nnz_per_row=20)
+    changed.doc_hashes = list(index.doc_hashes)
+    changed.doc_hashes[70] = "1" #one resume re-parsed
+    sharded = ShardedIndex.sync(changed, str(tmp_path), shard_size=50)
+    assert "Rewrote 2 of 3 shards" in capsys.readouterr().out #its old shard, and the last one it moved to
+    assert sorted(n for s in sharded.shards for n in s["file_names"]) == sorted(index.file_names)
+
+
+def test_a_refit_changes_every_shard_signature(index, tmp_path):
+    with ShardedIndex.sync(index, str(tmp_path), shard_size=50, workers=1) as sharded:
+        sharded.search_vector(index.matrix[3], 1) #caches the old shards in this process
+    before = [s["signature"] for s in sharded.shards]
+    refit = synthetic_index(120, n_features=400, nnz_per_row=20, seed=1) #same names and doc hashes, new vocabulary
+    after = [s["signature"] for s in ShardedIndex.sync(refit, str(tmp_path), shard_size=50).shards]
+    assert len(before) == len(after) and not set(before) & set(after)
+
+    with ShardedIndex.sync(refit, str(tmp_path), shard_size=50, workers=1) as sharded:
+        hits = sharded.search_vector(refit.matrix[3], 1) #the cached old-vocabulary shards are reloaded
+    assert hits[0][1] == refit.file_names[3]
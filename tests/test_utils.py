@@ -0,0 +1,114 @@
+from utils import SkillMatcher, extract_skills, guess_name
+
+
+def test_skills_need_word_boundaries():
+    assert extract_skills("Digital marketing, gitlab") == []
+    assert extract_skills("Used Git daily") == ["git"]
+
+
+def test_aliases_map_to_canonical_skills():
+    assert extract_skills("Built LWC and SFDC integrations") == ["lightning web components", "salesforce", "integration"]
+
+
+def test_longest_and_nested_patterns_are_all_reported():
+    assert extract_skills("Lightning Web Components") == ["lightning", "lightning web components"]
+
+
+def test_literal_newlines_do_not_glue_onto_skills():
+    assert extract_skills("\\nJira\\nApex") == ["jira", "apex"]
+    assert extract_skills("Skills\\n- SOQL\\n- Flows") == ["soql", "flows"]
+
+
+def test_guess_name_splits_on_literal_newlines():
+    assert guess_name("Resume\\nAsha Rao\\nasha@example.com") == "Asha Rao"
+    assert guess_name("Asha Rao\nasha@example.com") == "Asha Rao"
+
+
+def test_matcher_positions():
+    matcher = SkillMatcher({"rest api": "rest api", "apex": "apex"})
+    assert matcher.match("Apex and REST API, apex") == {
+        "apex": {"count": 2, "positions": [(0, 4), (19, 23)]},
+        "rest api": {"count": 1, "positions": [(9, 17)]},
+    }
+
+
+SAMPLE = """Asha Rao
+Email: asha.rao@example.com | Phone: +91-98765 43210
+Profile Summary
+Salesforce developer with 6.5 years of experience, 3 years on Apex.
+Education
+- B.Tech in Computer Science
+Certifications
+- Platform Developer I
+- Salesforce Admin
+Skills
+- Apex, SOQL
+"""
+
+
+def test_extract_fields_in_one_pass():
+    from utils import extract_fields
+
+    fields = extract_fields(SAMPLE)
+    assert list(fields) == ["name", "contacts", "years_experience", "skills", "education", "certifications"]
+    assert fields["name"] == "Asha Rao"
+    assert fields["contacts"] == {"email": "asha.rao@example.com", "phone": "+91-98765 43210"}
+    assert fields["years_experience"] == 6.5
+    assert fields["education"] == ["B.Tech in Computer Science"]
+    assert fields["certifications"] == ["Platform Developer I", "Salesforce Admin"]
+    assert extract_fields(SAMPLE, fields=["skills"]) == {"skills": ["salesforce", "apex", "platform developer",
+                                                                    "salesforce admin", "soql"]}
+
+
+def test_phone_does_not_swallow_years():
+    from utils import extract_contacts, extract_years_experience
+
+    text = "Call 98765 43210 12 years"
+    assert extract_years_experience(text) == 12
+    assert extract_contacts(text)["phone"] == "98765 43210"
+
+
+def test_registered_extractors_share_the_document():
+    from utils import FIELD_EXTRACTORS, Document, extract_fields, register_extractor
+
+    @register_extractor("word_count")
+    def _word_count(doc: Document) -> int:
+        return len(doc.text.split())
+
+    try:
+        assert extract_fields("one two\\nthree", fields=["word_count"]) == {"word_count": 3}
+    finally:
+        FIELD_EXTRACTORS.pop("word_count")
+
+
+def test_text_budget_for_plain_text(tmp_path):
+    from utils import read_text_from_file
+
+    path = tmp_path / "r.txt"
+    path.write_text("x" * 100)
+    assert len(read_text_from_file(str(path), max_chars=10)) == 10
+    assert len(read_text_from_file(str(path), max_chars=None)) == 100
+
+
+def test_extracted_text_is_cached_by_content_hash(tmp_path, monkeypatch):
+    import utils
+
+    calls = []
+
+    def fake_docx(path, max_chars):
+        calls.append(path)
+        return open(path, encoding="utf-8").read() * 3
+
+    monkeypatch.setattr(utils, "_read_docx", fake_docx)
+    path, cache = tmp_path / "r.docx", str(tmp_path / "cache")
+    path.write_text("Apex ")
+    assert utils.read_text_from_file(str(path), max_chars=12, cache_dir=cache) == "Apex Apex Ap"
+    assert utils.read_text_from_file(str(path), max_chars=12, cache_dir=cache) == "Apex Apex Ap"
+    assert len(calls) == 1
+
+    utils.read_text_from_file(str(path), max_chars=20, cache_dir=cache) #another budget is another entry
+    path.write_text("SOQL ")
+    assert utils.read_text_from_file(str(path), max_chars=12, cache_dir=cache) == "SOQL SOQL SO"
+    assert len(calls) == 3
+    utils.read_text_from_file(str(path), max_chars=12, cache_dir=None)
+    assert len(calls) == 4